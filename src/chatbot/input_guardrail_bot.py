@@ -1,25 +1,55 @@
+import dataclasses
+from typing import Optional
+
 import torch
 from torch.nn.functional import softmax
-from transformers import (
-    AutoModelForSequenceClassification,
-    AutoTokenizer,
-)
 
+from chatbot.prompt_guard import PromptGuardScores
+from chatbot.prompt_guard_registry import PromptGuardRegistry
 from config.token_usage import format_token_usage
+from config.tracing import current_span, tracer
+from config.usage_ledger import usage_scope
+from config.verdict_cache import VerdictCache, fingerprint
+
+# Prompts with a jailbreak or indirect injection score above this are blocked
+BLOCK_THRESHOLD = 0.9
 
 
 class InputGuardrailsBot:
-    def __init__(self, llm):
-        prompt_injection_model_name = 'meta-llama/Prompt-Guard-86M'
-        self.tokenizer = AutoTokenizer.from_pretrained(prompt_injection_model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(prompt_injection_model_name)
+    def __init__(self, llm, prompt_guard: Optional[PromptGuardRegistry] = None, verdict_cache: Optional[VerdictCache] = None):
+        # The model is loaded on first use (or by the web UI warm-up) and shared by every bot of the process
+        self.prompt_guard = prompt_guard or PromptGuardRegistry.default()
+        # Scores of texts seen before are reused without running the model
+        self.verdict_cache = verdict_cache
         self.llm = llm
         self.system_prompt = ''
 
+    @property
+    def tokenizer(self):
+        return self.prompt_guard.get().tokenizer
+
+    @property
+    def model(self):
+        return self.prompt_guard.get().model
+
+    @property
+    def scorer(self):
+        # Both scores come from one forward pass, batched with concurrent users of the model
+        return self.prompt_guard.get().scorer
+
     def chat(self, user_prompt: str):
-        jailbreak_score = self.get_jailbreak_score(user_prompt)
-        indirect_injection_score = self.get_indirect_injection_score(user_prompt)
-        if jailbreak_score > 0.9 or indirect_injection_score > 0.9:
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__) as span:
+            return self._chat(user_prompt, span)
+
+    def _chat(self, user_prompt: str, span):
+        with tracer.span('guardrail.prompt_guard') as guardrail_span:
+            scores = self.get_scores(user_prompt)
+            jailbreak_score, indirect_injection_score = scores.jailbreak_score, scores.indirect_injection_score
+            guardrail_span.set_attributes(
+                jailbreak_score=jailbreak_score, indirect_injection_score=indirect_injection_score, windows=scores.windows
+            )
+        if jailbreak_score > BLOCK_THRESHOLD or indirect_injection_score > BLOCK_THRESHOLD:
+            span.set_attribute('blocked', 'prompt_guard')
             return f"""
     ⚠️ Security Alert
     {'=' * 40}
@@ -61,14 +91,45 @@ class InputGuardrailsBot:
         inputs = self.tokenizer(text, return_tensors='pt', padding=True, truncation=True, max_length=512)
         inputs = inputs.to(device)
         # Get logits from the model
-        with torch.no_grad():
-            logits = self.model(**inputs).logits
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits.float()
         # Apply temperature scaling
         scaled_logits = logits / temperature
         # Apply softmax to get probabilities
         probabilities = softmax(scaled_logits, dim=-1)
         return probabilities
 
+    def get_scores(self, text, temperature=1.0) -> PromptGuardScores:
+        """
+        Evaluate all Prompt Guard classes of the given text, however long it is.
+
+        Texts longer than the 512 tokens the model reads are scored in overlapping
+        windows, batched into as few forward passes as possible; the highest score
+        of any window counts, and scoring stops once a window is above the block threshold.
+        With a verdict cache, the scores of a text seen before are returned without inference.
+
+        Args:
+            text (str): The input text to evaluate.
+            temperature (float): The temperature for the softmax function. Default is 1.0.
+
+        Returns:
+            PromptGuardScores: The class probabilities, with the jailbreak and indirect injection scores.
+        """
+        if self.verdict_cache is None:
+            return self.scorer.score_windows(text, temperature, block_threshold=BLOCK_THRESHOLD)
+
+        key = self.verdict_cache.make_key('prompt_guard', fingerprint(self.prompt_guard.version, BLOCK_THRESHOLD, temperature), text)
+        cached = self.verdict_cache.get(key)
+        span = current_span()
+        if span is not None:
+            span.set_attribute('cache_hit', cached is not None)
+        if cached is not None:
+            return PromptGuardScores(**cached)
+
+        scores = self.scorer.score_windows(text, temperature, block_threshold=BLOCK_THRESHOLD)
+        self.verdict_cache.put(key, dataclasses.asdict(scores))
+        return scores
+
     def get_jailbreak_score(self, text, temperature=1.0, device='cpu'):
         """
         Evaluate the probability that a given string contains malicious jailbreak or prompt injection.
@@ -82,8 +143,9 @@ class InputGuardrailsBot:
         Returns:
             float: The probability of the text containing malicious content.
         """
-        probabilities = self.get_class_probabilities(text, temperature, device)
-        return probabilities[0, 2].item()
+        if device != self.scorer.device:
+            return self.get_class_probabilities(text, temperature, device)[0, 2].item()
+        return self.get_scores(text, temperature).jailbreak_score
 
     def get_indirect_injection_score(self, text, temperature=1.0, device='cpu'):
         """
@@ -98,5 +160,7 @@ class InputGuardrailsBot:
         Returns:
             float: The combined probability of the text containing malicious or embedded instructions.
         """
-        probabilities = self.get_class_probabilities(text, temperature, device)
-        return (probabilities[0, 1] + probabilities[0, 2]).item()
+        if device != self.scorer.device:
+            probabilities = self.get_class_probabilities(text, temperature, device)
+            return (probabilities[0, 1] + probabilities[0, 2]).item()
+        return self.get_scores(text, temperature).indirect_injection_score
@@ -2,6 +2,8 @@ import asyncio
 import os
 from codeshield.cs import CodeShield
 from config.token_usage import format_token_usage
+from config.tracing import tracer
+from config.usage_ledger import usage_scope
 
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
@@ -12,12 +14,15 @@ class OutputGuardrailsBot:
         self.system_prompt = ''
 
     def chat(self, user_prompt: str):
-        result, usage = self.llm.invoke(self.system_prompt, user_prompt)
-        summary = asyncio.run(self.scan_llm_output(result, usage))
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__):
+            result, usage = self.llm.invoke(self.system_prompt, user_prompt)
+            summary = asyncio.run(self.scan_llm_output(result, usage))
         return summary
 
     async def scan_llm_output(self, llm_output_code, usage):
-        result = await CodeShield.scan_code(llm_output_code)
+        with tracer.span('guardrail.codeshield') as span:
+            result = await CodeShield.scan_code(llm_output_code)
+            span.set_attributes(insecure=result.is_insecure, issues=len(result.issues_found or []))
 
         output = []
         output.append('\n🔍 Security Scan Results:')
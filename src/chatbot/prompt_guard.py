@@ -0,0 +1,237 @@
+"""
+Micro-batched Prompt Guard scoring.
+
+Prompt Guard classifies text as benign, injection or jailbreak. Both
+guardrail scores derive from the same three class probabilities, so one
+forward pass per text is enough. Concurrent callers (one per Gradio user)
+are collected into micro-batches: the first request waits at most max_wait
+seconds for others to join, then the batch is sorted by token length and
+split into buckets of similar length, so short prompts are not padded to the
+length of a long one. Each bucket is a single forward pass.
+
+The model reads at most max_length (512) tokens. score_windows covers longer
+texts with overlapping windows of that size, scored max_batch_size windows
+per batch, and reduces the window probabilities per class (max by default).
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from statistics import fmean, median
+from typing import Callable, Dict, List, Optional, Sequence
+
+import torch
+from torch.nn.functional import softmax
+
+from config.logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# Class indices of meta-llama/Prompt-Guard-86M
+BENIGN, INJECTION, JAILBREAK = 0, 1, 2
+# Padding a short text by a few tokens costs less than an extra forward pass
+BUCKET_SLACK = 16
+# Window reducers of score_windows; only max allows stopping at the first window above the block threshold
+REDUCERS: Dict[str, Callable[[List[float]], float]] = {'max': max, 'mean': fmean, 'median': median}
+
+
+@dataclass(frozen=True)
+class PromptGuardScores:
+    """Class probabilities of one text."""
+
+    benign: float
+    injection: float
+    jailbreak: float
+    # Number of windows the probabilities were reduced from
+    windows: int = 1
+
+    @property
+    def jailbreak_score(self) -> float:
+        """Probability of a malicious jailbreak or prompt injection; for user dialogue."""
+        return self.jailbreak
+
+    @property
+    def indirect_injection_score(self) -> float:
+        """Probability of any embedded instructions, malicious or benign; for third-party content."""
+        return self.injection + self.jailbreak
+
+    def exceeds(self, threshold: float) -> bool:
+        """True if either guardrail score is above threshold."""
+        return self.jailbreak_score > threshold or self.indirect_injection_score > threshold
+
+
+@dataclass
+class _Request:
+    input_ids: List[int]
+    temperature: float
+    future: Future
+
+
+class PromptGuardScorer:
+    """
+    Scores texts with a sequence classification model, batching concurrent requests.
+
+    The scorer is thread-safe; one instance is meant to be shared by every
+    user of a model.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+        max_length: int = 512,
+        bucket_ratio: float = 1.5,
+        window_overlap: int = 64,
+        device: str = 'cpu',
+    ):
+        if not 0 <= window_overlap < max_length // 2:
+            raise ValueError(f'window_overlap must be between 0 and half of max_length ({max_length // 2}), got {window_overlap}')
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_length = max_length
+        # A bucket holds texts up to bucket_ratio times (or BUCKET_SLACK tokens) longer than its shortest one
+        self.bucket_ratio = bucket_ratio
+        # Tokens shared by consecutive windows, so a phrase cut by one window boundary is whole in the next window
+        self.window_overlap = window_overlap
+        self.device = device
+        self.forward_passes = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def score(self, text: str, temperature: float = 1.0) -> PromptGuardScores:
+        """Class probabilities of text, computed in a micro-batch with concurrent callers."""
+        return self.submit(text, temperature).result()
+
+    def submit(self, text: str, temperature: float = 1.0) -> Future:
+        """Queue text for scoring; the Future resolves to its PromptGuardScores."""
+        # Tokenizing in the caller's thread keeps the worker busy with forward passes only
+        return self._enqueue(_Request(self._encode(text), temperature, Future()))
+
+    def score_windows(
+        self, text: str, temperature: float = 1.0, reducer: str = 'max', block_threshold: Optional[float] = None
+    ) -> PromptGuardScores:
+        """
+        Class probabilities of text of any length, scored in overlapping windows of max_length tokens.
+
+        The windows are queued max_batch_size at a time, so a long text costs about
+        windows / max_batch_size forward passes instead of one per window. Each class
+        is reduced over the windows independently. With the max reducer, scoring stops
+        after the first batch in which a window scores above block_threshold, since
+        the remaining windows cannot lower the result.
+        """
+        if reducer not in REDUCERS:
+            raise ValueError(f'Unknown reducer: {reducer}. Expected one of {tuple(REDUCERS)}')
+        windows = self._windows(text)
+        scored: List[PromptGuardScores] = []
+        for start in range(0, len(windows), self.max_batch_size):
+            futures = [
+                self._enqueue(_Request(input_ids, temperature, Future())) for input_ids in windows[start : start + self.max_batch_size]
+            ]
+            scored.extend(future.result() for future in futures)
+            if reducer == 'max' and block_threshold is not None and any(scores.exceeds(block_threshold) for scores in scored):
+                break
+
+        reduce = REDUCERS[reducer]
+        return PromptGuardScores(
+            benign=reduce([scores.benign for scores in scored]),
+            injection=reduce([scores.injection for scores in scored]),
+            jailbreak=reduce([scores.jailbreak for scores in scored]),
+            windows=len(scored),
+        )
+
+    def score_many(self, texts: Sequence[str], temperature: float = 1.0) -> List[PromptGuardScores]:
+        """Score a known list of texts directly in length buckets, without the batching window."""
+        requests = [_Request(self._encode(text), temperature, Future()) for text in texts]
+        for start in range(0, len(requests), self.max_batch_size):
+            self._run_batch(requests[start : start + self.max_batch_size])
+        return [request.future.result() for request in requests]
+
+    def _encode(self, text: str) -> List[int]:
+        return list(self.tokenizer(text, truncation=True, max_length=self.max_length)['input_ids'])
+
+    def _windows(self, text: str) -> List[List[int]]:
+        """Token ids of overlapping windows that together cover the whole text, special tokens included."""
+        input_ids = list(self.tokenizer(text, add_special_tokens=False)['input_ids'])
+        size = self.max_length - len(self._with_special_tokens([]))
+        step = size - self.window_overlap
+        windows = []
+        start = 0
+        while True:
+            windows.append(self._with_special_tokens(input_ids[start : start + size]))
+            if start + size >= len(input_ids):
+                return windows
+            start += step
+
+    def _with_special_tokens(self, input_ids: List[int]) -> List[int]:
+        build = getattr(self.tokenizer, 'build_inputs_with_special_tokens', None)
+        return list(build(input_ids)) if build is not None else list(input_ids)
+
+    def _enqueue(self, request: _Request) -> Future:
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._serve, name='prompt-guard', daemon=True)
+                self._worker.start()
+
+    def _serve(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: List[_Request]):
+        for bucket in self._buckets(batch):
+            try:
+                probabilities = self._forward(bucket)
+            except Exception as e:
+                logger.exception('Prompt Guard forward pass failed')
+                for request in bucket:
+                    request.future.set_exception(e)
+                continue
+            for request, row in zip(bucket, probabilities.tolist()):
+                request.future.set_result(PromptGuardScores(row[BENIGN], row[INJECTION], row[JAILBREAK]))
+
+    def _buckets(self, batch: List[_Request]) -> List[List[_Request]]:
+        buckets: List[List[_Request]] = []
+        for request in sorted(batch, key=lambda request: len(request.input_ids)):
+            shortest = len(buckets[-1][0].input_ids) if buckets else 0
+            if buckets and len(request.input_ids) <= max(self.bucket_ratio * shortest, shortest + BUCKET_SLACK):
+                buckets[-1].append(request)
+            else:
+                buckets.append([request])
+        return buckets
+
+    def _forward(self, bucket: List[_Request]) -> torch.Tensor:
+        """One padded forward pass; returns the temperature-scaled class probabilities per request."""
+        length = max(len(request.input_ids) for request in bucket)
+        pad_id = self.tokenizer.pad_token_id or 0
+        input_ids = torch.full((len(bucket), length), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(bucket), length), dtype=torch.long)
+        for row, request in enumerate(bucket):
+            input_ids[row, : len(request.input_ids)] = torch.tensor(request.input_ids, dtype=torch.long)
+            attention_mask[row, : len(request.input_ids)] = 1
+
+        with torch.inference_mode():
+            logits = self.model(input_ids=input_ids.to(self.device), attention_mask=attention_mask.to(self.device)).logits.float()
+        self.forward_passes += 1
+        temperatures = torch.tensor([request.temperature for request in bucket], dtype=logits.dtype, device=logits.device)
+        return softmax(logits / temperatures.unsqueeze(1), dim=-1).cpu()
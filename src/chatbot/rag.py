@@ -6,6 +6,7 @@ from llama_index.llms.bedrock import Bedrock
 
 from config.llm_config import LLMConfig
 from config.security_config import SecurityConfig
+from config.tracing import tracer
 
 # from llama_index.readers.web import SimpleWebPageReader
 
@@ -68,7 +69,9 @@ class Rag:
         # self.vector_index.storage_context.persist(persist_dir=self.index_folder)
 
     def rag_response(self, query):
-        response = self.query_engine.query(query)
+        with tracer.span('rag.query') as span:
+            response = self.query_engine.query(query)
+            span.set_attribute('source_nodes', len(response.source_nodes))
 
         for i, node_with_score in enumerate(response.source_nodes, 1):
             print(f'\nNode {i}:')
@@ -84,9 +87,15 @@ class Rag:
         llm = self.llm_config.get_bedrock_llm()
         filtered = []
         for doc in local_data:
-            assessment = llm.invoke(SecurityConfig.RAG_INPUT_SENSITIVITY_PROMPT, doc.text)
+            with tracer.span('guardrail.rag_sensitivity') as span:
+                response = llm.invoke(
+                    SecurityConfig.RAG_INPUT_SENSITIVITY_PROMPT, doc.text, inference_params=SecurityConfig.CLASSIFIER_INFERENCE_PARAMS
+                )
+                # Providers answer an empty document with a bare string and no usage
+                assessment = response[0] if isinstance(response, tuple) else response
+                span.set_attribute('verdict', assessment.strip())
             print(f'{assessment} determined for: {doc}')
-            if assessment == 'not_sensitive':
+            if assessment.strip() == 'not_sensitive':
                 filtered.append(doc)
 
         return filtered
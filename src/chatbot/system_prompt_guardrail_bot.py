@@ -1,41 +1,87 @@
 import asyncio
+from typing import Optional
 
+from config.batch import run_batch
 from config.security_config import SecurityConfig
 from config.token_usage import format_token_usage
+from config.tracing import tracer
+from config.usage_ledger import usage_scope
+from config.verdict_cache import VerdictCache, fingerprint
 
 
 class SystemPromptGuardrailBot:
     """Chatbot with parallel guardrail checks for instruction changes and prompt leakage."""
 
     INSTRUCTION_CHANGE_GUARDRAIL_TRIGGERED_MESSAGE = 'INSTRUCTION_CHANGE_GUARDRAIL TRIGGERED'
+    # Only clear verdicts are cached; anything else is asked again next time
+    INSTRUCTION_CHANGE_VERDICTS = ('allowed', 'not_allowed')
 
-    def __init__(self, llm):
+    def __init__(self, llm, verdict_cache: Optional[VerdictCache] = None):
         self.llm = llm
         self.system_prompt = SecurityConfig.get_secure_system_prompt()
+        # Verdicts on prompts seen before are reused without calling the judge model
+        self.verdict_cache = verdict_cache
 
     async def chat(self, user_prompt: str):
-        return self.llm.invoke(self.system_prompt, user_prompt)
+        return await self.llm.ainvoke(self.system_prompt, user_prompt)
 
     async def detect_instruction_change_attempt(self, user_prompt):
-        response, _ = self.llm.invoke(SecurityConfig.INSTRUCTION_CHANGE_GUARDRAIL_PROMPT, user_prompt)
-        return response
+        with tracer.span('guardrail.instruction_change') as span:
+            key = self._instruction_change_cache_key(user_prompt)
+            verdict = self.verdict_cache.get(key) if key is not None else None
+            span.set_attribute('cache_hit', verdict is not None)
+            if verdict is None:
+                response, _ = await self.llm.ainvoke(
+                    SecurityConfig.INSTRUCTION_CHANGE_GUARDRAIL_PROMPT,
+                    user_prompt,
+                    inference_params=SecurityConfig.CLASSIFIER_INFERENCE_PARAMS,
+                )
+                verdict = response.strip()
+                if key is not None and verdict in self.INSTRUCTION_CHANGE_VERDICTS:
+                    self.verdict_cache.put(key, verdict)
+            span.set_attribute('verdict', verdict)
+            return verdict
+
+    def _instruction_change_cache_key(self, user_prompt) -> Optional[str]:
+        if self.verdict_cache is None:
+            return None
+        # The judge model, its prompt and its inference parameters all shape the verdict
+        version = fingerprint(
+            self.llm.name,
+            self.llm.model_id,
+            SecurityConfig.INSTRUCTION_CHANGE_GUARDRAIL_PROMPT,
+            SecurityConfig.CLASSIFIER_INFERENCE_PARAMS,
+        )
+        return self.verdict_cache.make_key('instruction_change', version, user_prompt)
 
     async def execute_chat_with_guardrail(self, user_prompt):
-        guardrail_task = asyncio.create_task(self.detect_instruction_change_attempt(user_prompt))
-        chat_task = asyncio.create_task(self.chat(user_prompt))
-
-        while True:
-            completed_tasks, _ = await asyncio.wait([guardrail_task, chat_task], return_when=asyncio.FIRST_COMPLETED)
-
-            if guardrail_task in completed_tasks:
-                if self._should_block_request(guardrail_task.result()):
-                    chat_task.cancel()
-                    return SecurityConfig.get_blocked_message('instruction_change')
-
-                if chat_task in completed_tasks:
-                    return await self._process_chat_response(chat_task.result())
-            else:
-                await asyncio.sleep(0.1)
+        output, _ = await self._execute_chat_with_guardrail(user_prompt)
+        return output
+
+    def chat_many(self, user_prompts, concurrency: int = 4, ordered: bool = True):
+        """Run the guarded chat for many prompts concurrently, yielding a BatchResult per prompt."""
+        # Each worker thread drives its own event loop, so guardrail and chat still overlap per prompt
+        return run_batch(self._run_chat_with_guardrail, user_prompts, concurrency, ordered)
+
+    def _run_chat_with_guardrail(self, user_prompt):
+        return asyncio.run(self._execute_chat_with_guardrail(user_prompt))
+
+    async def _execute_chat_with_guardrail(self, user_prompt):
+        """Return the guarded output and the chat TokenUsage (None when the guardrail blocked the request)."""
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__) as span:
+            guardrail_task = asyncio.create_task(self.detect_instruction_change_attempt(user_prompt))
+            chat_task = asyncio.create_task(self.chat(user_prompt))
+
+            # Both calls are already in flight; the chat answer is only released once the guardrail passes
+            if self._should_block_request(await guardrail_task):
+                chat_task.cancel()
+                span.set_attribute('blocked', 'instruction_change')
+                return SecurityConfig.get_blocked_message('instruction_change'), None
+
+            chat_result = await chat_task
+            output = await self._process_chat_response(chat_result)
+            span.set_attribute('blocked', 'canary' if self._is_blocked_response(output) else None)
+            return output, chat_result[1]
 
     def _should_block_request(self, guardrail_result):
         return guardrail_result == 'not_allowed'
@@ -58,5 +104,6 @@ class SystemPromptGuardrailBot:
         return chat_response
 
     async def execute_chat_with_sandwich(self, user_prompt):
-        response, usage = await self.chat(user_prompt + SecurityConfig.get_sandwich_bottom())
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__, defense='sandwich'):
+            response, usage = await self.chat(user_prompt + SecurityConfig.get_sandwich_bottom())
         return f'{response}\n\n{format_token_usage(usage)}'
@@ -1,5 +1,8 @@
+from config.batch import run_batch
 from config.security_config import SecurityConfig
-from config.token_usage import format_token_usage
+from config.token_usage import TokenUsage, format_token_usage
+from config.tracing import tracer
+from config.usage_ledger import usage_scope
 
 
 class UnprotectedBot:
@@ -10,7 +13,45 @@ class UnprotectedBot:
         self.system_prompt = SecurityConfig.get_unprotected_system_prompt()
 
     def chat(self, user_prompt: str):
-        result, usage = self.llm.invoke(self.system_prompt, user_prompt)
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__):
+            result, usage = self.llm.invoke(self.system_prompt, user_prompt)
+        return self._format_output(result, usage)
 
-        output = ['\n📝 LLM Response:', '-' * 40, result, '\n' + format_token_usage(usage)]
+    def chat_stream(self, user_prompt: str):
+        """Stream the response, yielding the accumulated output after every text delta."""
+        bot = type(self).__name__
+        # The generator is consumed by the caller: the usage scope and the span are only entered for each step of the stream
+        span = tracer.start_span('bot.chat', bot=bot)
+        try:
+            chunks = self.llm.invoke_stream(self.system_prompt, user_prompt)
+            result = ''
+            while True:
+                with usage_scope(bot=bot), tracer.use_span(span):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                if isinstance(chunk, TokenUsage):
+                    yield self._format_output(result, chunk)
+                else:
+                    result += chunk
+                    yield self._format_output(result)
+        except Exception as e:
+            span.record_error(e)
+            raise
+        finally:
+            tracer.end_span(span)
+
+    def chat_many(self, user_prompts, concurrency: int = 4, ordered: bool = True):
+        """Chat with many prompts concurrently, yielding a BatchResult with the formatted output per prompt."""
+        return run_batch(self._chat_with_usage, user_prompts, concurrency, ordered)
+
+    def _chat_with_usage(self, user_prompt: str):
+        with usage_scope(bot=type(self).__name__), tracer.span('bot.chat', bot=type(self).__name__):
+            result, usage = self.llm.invoke(self.system_prompt, user_prompt)
+        return self._format_output(result, usage), usage
+
+    def _format_output(self, result, usage=None):
+        output = ['\n📝 LLM Response:', '-' * 40, result]
+        if usage is not None:
+            output.append('\n' + format_token_usage(usage))
         return '\n'.join(output)
@@ -1,8 +1,14 @@
 """GenAI security demo web interface with tabbed comparisons of different protection levels."""
 
 import gradio as gr
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from chatbot.prompt_guard_registry import PromptGuardRegistry
+from config.client_registry import ClientRegistry
 from config.llm_config import LLMConfig
+from config.metrics import CONTENT_TYPE, enable_metrics
 from ui.direct_injection_ui import basic_demo
 from ui.input_guardrail_ui import input_guardrail_demo
 from ui.output_guardrail_ui import output_guardrail_demo
@@ -26,5 +32,23 @@ css = """
 }
 """
 
+# Open the Bedrock connection pool in the background before the first user request
+ClientRegistry.default().prewarm(['bedrock-runtime'])
+if config.LLAMA_SECURITY_FAMILY:
+    # Load and warm up Prompt Guard in the background: the UI starts at once, only the input guardrail waits for it
+    PromptGuardRegistry.default().warm_up()
+
 demo = gr.TabbedInterface(demos, demo_names, css=css)
-demo.launch(server_port=7860, share=False)
+
+# Serve the demo from our own app so Prometheus can scrape /metrics on the same port
+metrics_registry = enable_metrics()
+app = FastAPI()
+
+
+@app.get('/metrics')
+def metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
+app = gr.mount_gradio_app(app, demo, path='/')
+uvicorn.run(app, port=7860)
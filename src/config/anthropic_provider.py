@@ -1,5 +1,6 @@
 import anthropic
 from .base_provider import BaseProvider
+from .client_registry import ClientRegistry
 from .token_usage import TokenUsage
 from .tool_adapters import NoOpToolAdapter
 
@@ -7,13 +8,20 @@ from .tool_adapters import NoOpToolAdapter
 class AnthropicProvider(BaseProvider):
     def __init__(self, model_id: str, debug: bool = False):
         super().__init__('Anthropic-Claude', model_id, debug)
-        self.client = anthropic.Anthropic()
+        self.client = ClientRegistry.default().anthropic()
+        # Fixed async client override; by default one is taken from the registry per event loop
+        self._async_client = None
+
+    @property
+    def async_client(self) -> anthropic.AsyncAnthropic:
+        """Async client shared by all providers running on the current event loop."""
+        return self._async_client or ClientRegistry.default().anthropic(async_client=True)
 
     def _create_tool_adapter(self) -> NoOpToolAdapter:
         """Create NoOp tool adapter since Anthropic provider doesn't support tools yet."""
         return NoOpToolAdapter()
 
-    def invoke(self, system_prompt: str, user_prompt: str, tool_handler=None):
+    def _invoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None):
         """Invoke Anthropic model with system and user prompts."""
         if self.is_empty(user_prompt):
             return ' '
@@ -24,22 +32,61 @@ class AnthropicProvider(BaseProvider):
 
         self.trace_invocation_info(user_prompt, self.model_id, messages)
 
-        response = self.client.messages.create(
-            model=self.model_id,
-            system=system_prompt,
-            messages=messages,
-            max_tokens=self.DEFAULT_MAX_TOKENS,
-            temperature=self.DEFAULT_TEMPERATURE,
-            top_p=self.DEFAULT_TOP_P,
-            stop_sequences=self.STOP_SEQUENCES,
-        )
+        response = self.client.messages.create(**self._build_params(system_prompt, messages, inference_params))
+
+        return self._build_result(response)
+
+    async def _ainvoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None):
+        """Invoke Anthropic model with the native async client."""
+        if self.is_empty(user_prompt):
+            return ' '
+
+        self.logger.debug('AnthropicProvider ainvoke...')
+
+        messages = [{'role': 'user', 'content': user_prompt}]
+
+        self.trace_invocation_info(user_prompt, self.model_id, messages)
 
+        response = await self.async_client.messages.create(**self._build_params(system_prompt, messages, inference_params))
+
+        return self._build_result(response)
+
+    def _build_result(self, response):
+        """Extract completion text and token usage from the response."""
         completion_text = response.content[0].text
         self.trace_invocation_result_basic(completion_text, response.usage)
 
         usage = self._extract_token_usage(response)
         return completion_text, usage
 
+    def _stream(self, system_prompt: str, user_prompt: str, inference_params=None):
+        """Stream Anthropic text deltas, with usage taken from the final message."""
+        messages = [{'role': 'user', 'content': user_prompt}]
+
+        self.trace_invocation_info(user_prompt, self.model_id, messages)
+
+        with self.client.messages.stream(**self._build_params(system_prompt, messages, inference_params)) as stream:
+            yield from stream.text_stream
+            final_message = stream.get_final_message()
+
+        yield self._extract_token_usage(final_message)
+
+    def _build_params(self, system_prompt: str, messages: list, inference_params=None) -> dict:
+        """Build the Messages API parameters shared by invoke and stream. Anthropic does not return logprobs."""
+        settings = self.inference_settings(inference_params)
+        system = system_prompt
+        if self.prompt_caching and system_prompt:
+            system = [{'type': 'text', 'text': system_prompt, 'cache_control': {'type': 'ephemeral'}}]
+        return {
+            'model': self.model_id,
+            'system': system,
+            'messages': messages,
+            'max_tokens': settings['max_tokens'],
+            'temperature': settings['temperature'],
+            'top_p': settings['top_p'],
+            'stop_sequences': settings['stop_sequences'],
+        }
+
     def _add_tool_conversation(self, messages, response, formatted_results):
         """No-op implementation since this provider doesn't support tools."""
         pass
@@ -49,4 +96,10 @@ class AnthropicProvider(BaseProvider):
         return None
 
     def _extract_token_usage(self, response):
-        return TokenUsage(input_tokens=response.usage.input_tokens, output_tokens=response.usage.output_tokens)
+        usage = response.usage
+        return TokenUsage(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_tokens=getattr(usage, 'cache_read_input_tokens', None) or 0,
+            cache_write_tokens=getattr(usage, 'cache_creation_input_tokens', None) or 0,
+        )
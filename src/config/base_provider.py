@@ -1,8 +1,21 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Union
 
+from .batch import BatchResult, run_batch
+from .inference_params import InferenceParams
 from .logger_config import setup_logger
-from .tool_system import ToolAdapter, ToolHandler, ToolSpec, ToolResult
+from .rate_limiter import RateLimiter
+from .resilience import ResilientCaller
+from .response_cache import ResponseCache
+from .token_estimator import ContextGuard, TokenEstimator
+from .token_usage import TokenUsage
+from .tool_executor import ToolExecutor, get_default_tool_executor
+from .tool_loop import COMPLETED, ToolLoop, ToolLoopLimits
+from .tool_system import ToolAdapter, ToolHandler, ToolResult, ToolSpec
+from .tracing import Span, tracer
+from .usage_ledger import UsageLedger
 
 
 class BaseProvider(ABC):
@@ -21,6 +34,17 @@ class BaseProvider(ABC):
         self.logger = setup_logger(__name__, debug)
         self.tools = tools or []
         self.tool_adapter = self._create_tool_adapter()
+        self.response_cache: Optional[ResponseCache] = None
+        self.rate_limiter: Optional[RateLimiter] = None
+        self.resilience: Optional[ResilientCaller] = None
+        self.usage_ledger: Optional[UsageLedger] = None
+        self.token_estimator = TokenEstimator.for_model(model_id)
+        # Pre-flight check of the request size against the model context window, when configured
+        self.context_guard: Optional[ContextGuard] = None
+        self.tool_executor: ToolExecutor = get_default_tool_executor()
+        self.tool_loop_limits = ToolLoopLimits()
+        # Mark the static prefix (system prompt, tools) as cacheable on providers that support prompt caching
+        self.prompt_caching = False
         self.logger.debug('%s initialized', self.__class__.__name__)
 
     @staticmethod
@@ -28,9 +52,324 @@ class BaseProvider(ABC):
         """Check if string is empty or whitespace only."""
         return s.strip() == ''
 
+    def invoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Invoke the provider with system and user prompts, serving repeated requests from the response cache."""
+        with tracer.span('llm.invoke', provider=self.name, model=self.model_id) as span:
+            user_prompt = self._guard_context(system_prompt, user_prompt, inference_params)
+            cache_key = self._response_cache_key(system_prompt, user_prompt, tool_handler, kwargs, inference_params)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                self._trace_result(span, cached, cache_hit=True)
+                self._record_usage(cached)
+                return cached
+
+            self._check_budget()
+            estimated_tokens = self._acquire_rate_limit(system_prompt, user_prompt)
+            start = time.perf_counter()
+            result = self._call_resilient(
+                lambda: self._invoke(system_prompt, user_prompt, tool_handler, inference_params=inference_params, **kwargs),
+                tool_handler,
+                kwargs,
+                estimated_tokens,
+            )
+            self._record_usage(result, time.perf_counter() - start)
+            self._settle_rate_limit(estimated_tokens, self._usage_of(result))
+
+            self._cache_response(cache_key, result)
+            self._trace_result(span, result, cache_hit=False)
+            return result
+
+    async def ainvoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Invoke the provider without blocking the event loop, sharing the response cache with invoke."""
+        with tracer.span('llm.ainvoke', provider=self.name, model=self.model_id) as span:
+            user_prompt = self._guard_context(system_prompt, user_prompt, inference_params)
+            cache_key = self._response_cache_key(system_prompt, user_prompt, tool_handler, kwargs, inference_params)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                self._trace_result(span, cached, cache_hit=True)
+                self._record_usage(cached)
+                return cached
+
+            self._check_budget()
+            estimated_tokens = await asyncio.to_thread(self._acquire_rate_limit, system_prompt, user_prompt)
+            start = time.perf_counter()
+            result = await self._acall_resilient(
+                lambda: self._ainvoke(system_prompt, user_prompt, tool_handler, inference_params=inference_params, **kwargs),
+                tool_handler,
+                kwargs,
+                estimated_tokens,
+            )
+            self._record_usage(result, time.perf_counter() - start)
+            self._settle_rate_limit(estimated_tokens, self._usage_of(result))
+
+            self._cache_response(cache_key, result)
+            self._trace_result(span, result, cache_hit=False)
+            return result
+
+    def invoke_many(
+        self,
+        system_prompt: str,
+        user_prompts: Iterable[str],
+        concurrency: int = 4,
+        ordered: bool = True,
+        inference_params: Optional[InferenceParams] = None,
+    ) -> Iterator[BatchResult]:
+        """
+        Invoke the provider for many user prompts with at most `concurrency` calls in flight.
+
+        Yields one BatchResult per prompt (text, usage, latency, error) in input
+        order, or in completion order when ordered is False.
+        """
+        return run_batch(
+            lambda user_prompt: self.invoke(system_prompt, user_prompt, inference_params=inference_params),
+            user_prompts,
+            concurrency,
+            ordered,
+        )
+
+    @abstractmethod
+    def _invoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+    ):
+        """Call the provider API (provider-specific)."""
+        pass
+
+    async def _ainvoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """
+        Call the provider API without blocking the event loop.
+
+        Providers with a native async SDK override this. The default offloads the
+        blocking call to a worker thread, so concurrent callers still overlap.
+        """
+        return await asyncio.to_thread(self._invoke, system_prompt, user_prompt, tool_handler, inference_params=inference_params, **kwargs)
+
+    def inference_settings(self, inference_params: Optional[InferenceParams] = None) -> dict:
+        """Inference parameters for a call: the class defaults with any per-call overrides applied."""
+        settings = {
+            'max_tokens': self.DEFAULT_MAX_TOKENS,
+            'temperature': self.DEFAULT_TEMPERATURE,
+            'top_p': self.DEFAULT_TOP_P,
+            'stop_sequences': list(self.STOP_SEQUENCES),
+            'logprobs': False,
+        }
+        if inference_params is not None:
+            overrides = {
+                'max_tokens': inference_params.max_tokens,
+                'temperature': inference_params.temperature,
+                'top_p': inference_params.top_p,
+                'stop_sequences': list(inference_params.stop_sequences) if inference_params.stop_sequences is not None else None,
+                'logprobs': inference_params.logprobs,
+            }
+            settings.update({key: value for key, value in overrides.items() if value is not None})
+        return settings
+
+    def estimate_input_tokens(self, system_prompt: str, user_prompt: str) -> int:
+        """Local input token estimate used to pace and size-check requests before the call."""
+        return self.token_estimator.count(system_prompt) + self.token_estimator.count(user_prompt)
+
+    def _guard_context(self, system_prompt: str, user_prompt: str, inference_params: Optional[InferenceParams]) -> str:
+        """User prompt to send, after the context guard trimmed it or raised ContextWindowExceededError."""
+        if self.context_guard is None:
+            return user_prompt
+        max_output_tokens = self.inference_settings(inference_params)['max_tokens']
+        return self.context_guard.check(system_prompt, user_prompt, max_output_tokens)
+
+    def _acquire_rate_limit(self, system_prompt: str, user_prompt: str) -> int:
+        """Wait for the rate limiter, if any. Returns the token estimate charged to it."""
+        if self.rate_limiter is None or self.is_empty(user_prompt):
+            return 0
+
+        estimated_tokens = self.estimate_input_tokens(system_prompt, user_prompt)
+        with tracer.span('llm.rate_limit', provider=self.name, estimated_tokens=estimated_tokens) as span:
+            waited = self.rate_limiter.acquire(estimated_tokens)
+            span.set_attribute('waited', waited)
+        if waited > 0:
+            self.logger.debug('Waited %.3fs for the %s rate limiter', waited, self.name)
+        return estimated_tokens
+
+    def _settle_rate_limit(self, estimated_tokens: int, usage: Optional[TokenUsage]):
+        """Replace the pre-call estimate with the actual token usage."""
+        if self.rate_limiter is not None and usage is not None:
+            self.rate_limiter.record_usage(estimated_tokens, usage.total_tokens)
+
+    def _check_budget(self):
+        """Raise BudgetExceededError before the call when a spend cap of the usage ledger is reached."""
+        if self.usage_ledger is not None:
+            self.usage_ledger.check_budget()
+
+    def _record_usage(self, result, latency: Optional[float] = None):
+        """Add the call to the usage ledger. Cached responses are recorded without latency."""
+        usage = self._usage_of(result)
+        if self.usage_ledger is not None and usage is not None:
+            self.usage_ledger.record(usage, self.name, self.model_id, latency)
+
+    def _trace_result(self, span: Span, result, cache_hit: bool):
+        """Record the response cache outcome and token usage of a call on its span."""
+        span.set_attribute('cache_hit', cache_hit)
+        usage = self._usage_of(result)
+        if usage is not None:
+            span.set_attributes(
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_read_tokens=usage.cache_read_tokens,
+                cache_write_tokens=usage.cache_write_tokens,
+            )
+            if usage.tool_loop is not None:
+                span.set_attributes(tool_rounds=len(usage.tool_loop.rounds), tool_loop_stop_reason=usage.tool_loop.stop_reason)
+
+    @staticmethod
+    def _usage_of(result) -> Optional[TokenUsage]:
+        """TokenUsage of an invoke result (empty prompts return a bare string without usage)."""
+        return result[1] if isinstance(result, tuple) else None
+
+    def _call_resilient(self, call, tool_handler=None, extra_args=None, estimated_tokens: int = 0):
+        """Run the provider call through the retry/hedging policy, if any."""
+        if self.resilience is None:
+            return call()
+        repeatable = self._is_repeatable(tool_handler, extra_args)
+
+        def hedge():
+            # A hedge is one more request: it waits for the rate limiter like the first one
+            if self.rate_limiter is not None and estimated_tokens:
+                self.rate_limiter.acquire(estimated_tokens)
+            return call()
+
+        return self.resilience.call(
+            call,
+            retryable=repeatable,
+            hedgeable=repeatable,
+            hedge_fn=hedge,
+            on_discarded=lambda result: self._record_discarded(result, estimated_tokens),
+        )
+
+    async def _acall_resilient(self, call, tool_handler=None, extra_args=None, estimated_tokens: int = 0):
+        """Async counterpart of _call_resilient: `call` returns a fresh coroutine per attempt."""
+        if self.resilience is None:
+            return await call()
+        repeatable = self._is_repeatable(tool_handler, extra_args)
+
+        async def hedge():
+            if self.rate_limiter is not None and estimated_tokens:
+                await asyncio.to_thread(self.rate_limiter.acquire, estimated_tokens)
+            return await call()
+
+        return await self.resilience.acall(
+            call,
+            retryable=repeatable,
+            hedgeable=repeatable,
+            hedge_fn=hedge,
+            on_discarded=lambda result: self._record_discarded(result, estimated_tokens),
+        )
+
+    def _record_discarded(self, result, estimated_tokens: int):
+        """Account for the losing request of a hedge: it used tokens and is billed like the winner."""
+        self._settle_rate_limit(estimated_tokens, self._usage_of(result))
+        self._record_usage(result)
+
+    @staticmethod
+    def _is_repeatable(tool_handler, extra_args) -> bool:
+        # Repeating a call would run tools twice, and explicit conversations are extended in place
+        return tool_handler is None and not extra_args
+
+    def _response_cache_key(self, system_prompt, user_prompt, tool_handler, extra_args, inference_params=None) -> Optional[str]:
+        """Cache key for this call, or None when the call must not be cached."""
+        # Tool executions have side effects and explicit conversations are not part of the key
+        if self.response_cache is None or tool_handler is not None or extra_args or self.is_empty(user_prompt):
+            return None
+        settings = self.inference_settings(inference_params)
+        return ResponseCache.make_key(self.name, self.model_id, system_prompt, user_prompt, settings, self.tools)
+
+    def _cached_response(self, cache_key):
+        if cache_key is None:
+            return None
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug('Response cache hit for %s', self.model_id)
+        return cached
+
+    def _cache_response(self, cache_key, result):
+        # Empty prompts return a bare string instead of a (text, usage) tuple
+        if cache_key is not None and isinstance(result, tuple):
+            self.response_cache.put(cache_key, result)
+
+    def invoke_stream(
+        self, system_prompt: str, user_prompt: str, inference_params: Optional[InferenceParams] = None
+    ) -> Iterator[Union[str, TokenUsage]]:
+        """
+        Stream the completion for system and user prompts.
+
+        Yields text deltas as they arrive and finishes with the TokenUsage of the call,
+        including the time to first token. Tools are not executed in streaming mode.
+        """
+        if self.is_empty(user_prompt):
+            yield ' '
+            yield TokenUsage.empty()
+            return
+
+        # The generator is consumed by the caller, so the span is not made current across yields
+        span = tracer.start_span('llm.stream', provider=self.name, model=self.model_id)
+        try:
+            user_prompt = self._guard_context(system_prompt, user_prompt, inference_params)
+            self._check_budget()
+            estimated_tokens = self._acquire_rate_limit(system_prompt, user_prompt)
+            start = time.perf_counter()
+            time_to_first_token = None
+            usage = None
+            for chunk in self._stream(system_prompt, user_prompt, inference_params):
+                if isinstance(chunk, TokenUsage):
+                    usage = chunk
+                    continue
+                if not chunk:
+                    continue
+                if time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - start
+                    self.logger.debug('Time to first token: %.3fs', time_to_first_token)
+                yield chunk
+
+            usage = usage or TokenUsage.empty()
+            usage.time_to_first_token = time_to_first_token
+            self._settle_rate_limit(estimated_tokens, usage)
+            self._record_usage((None, usage), time.perf_counter() - start)
+            self.logger.debug('Stream completed in %.3fs - usage: %s', time.perf_counter() - start, usage)
+            span.set_attribute('time_to_first_token', time_to_first_token)
+            self._trace_result(span, (None, usage), cache_hit=False)
+            yield usage
+        except Exception as e:
+            span.record_error(e)
+            raise
+        finally:
+            tracer.end_span(span)
+
     @abstractmethod
-    def invoke(self, system_prompt: str, user_prompt: str, tool_handler: Optional[ToolHandler] = None):
-        """Invoke the provider with system and user prompts."""
+    def _stream(
+        self, system_prompt: str, user_prompt: str, inference_params: Optional[InferenceParams] = None
+    ) -> Iterator[Union[str, TokenUsage]]:
+        """Yield raw text deltas from the provider and the TokenUsage once it is reported."""
         pass
 
     @abstractmethod
@@ -70,27 +409,107 @@ class BaseProvider(ABC):
         self.logger.debug('Invocation completed.')
 
     def _execute_tools(self, response, tool_handler, messages, params):
-        """Common tool execution logic for all providers."""
+        """
+        Common tool loop for all providers: execute requested tools and follow up until the model
+        stops asking for tools or a limit of tool_loop_limits is reached.
+
+        Returns the final response and the usage of all rounds added up.
+        """
+        loop = ToolLoop(self.tool_loop_limits, self._extract_token_usage(response))
+        while (stop_reason := loop.limit_reached()) is None:
+            tool_start = time.perf_counter()
+            tool_calls = self._add_tool_results(response, tool_handler, messages)
+            if not tool_calls:
+                stop_reason = COMPLETED
+                break
+
+            params['messages'] = messages
+            call_start = time.perf_counter()
+            with tracer.span('llm.tool_followup', provider=self.name, model=self.model_id, round=len(loop.rounds) + 1):
+                response = self._make_tool_followup_call(params)
+            loop.record_round(tool_calls, call_start - tool_start, time.perf_counter() - call_start, self._extract_token_usage(response))
+
+        if stop_reason != COMPLETED:
+            self._decline_tool_calls(response, messages, stop_reason)
+        return response, self._finish_tool_loop(loop, stop_reason)
+
+    async def _aexecute_tools(self, response, tool_handler, messages, params):
+        """Async counterpart of _execute_tools. Tools run in a worker thread."""
+        loop = ToolLoop(self.tool_loop_limits, self._extract_token_usage(response))
+        while (stop_reason := loop.limit_reached()) is None:
+            tool_start = time.perf_counter()
+            tool_calls = await asyncio.to_thread(self._add_tool_results, response, tool_handler, messages)
+            if not tool_calls:
+                stop_reason = COMPLETED
+                break
+
+            params['messages'] = messages
+            call_start = time.perf_counter()
+            with tracer.span('llm.tool_followup', provider=self.name, model=self.model_id, round=len(loop.rounds) + 1):
+                response = await self._amake_tool_followup_call(params)
+            loop.record_round(tool_calls, call_start - tool_start, time.perf_counter() - call_start, self._extract_token_usage(response))
+
+        if stop_reason != COMPLETED:
+            self._decline_tool_calls(response, messages, stop_reason)
+        return response, self._finish_tool_loop(loop, stop_reason)
+
+    def _finish_tool_loop(self, loop: ToolLoop, stop_reason: str) -> TokenUsage:
+        for tool_round in loop.rounds:
+            self.logger.debug(
+                'Tool round %d: %d call(s), tools %.3fs, follow-up %.3fs',
+                tool_round.index,
+                tool_round.tool_calls,
+                tool_round.tool_time,
+                tool_round.latency,
+            )
+        if stop_reason != COMPLETED:
+            self.logger.warning('Tool loop stopped early (%s) after %d round(s)', stop_reason, len(loop.rounds))
+        return loop.finish(stop_reason)
+
+    def _decline_tool_calls(self, response, messages, stop_reason: str):
+        """
+        Answer the tool calls of the last response without running them.
+
+        When a limit stops the loop, the conversation still gets a result for every
+        tool use, so it stays valid for the provider if the caller continues it.
+        """
+        tool_calls = self.tool_adapter.extract_tool_calls(response)
+        if not tool_calls:
+            return
+        declined = [
+            ToolResult(tool_call['tool_use_id'], f'Not executed: the tool loop stopped ({stop_reason})', success=False, error=stop_reason)
+            for tool_call in tool_calls
+        ]
+        self._add_tool_conversation(messages, response, self.tool_adapter.format_tool_results(declined))
+
+    def _add_tool_results(self, response, tool_handler, messages) -> int:
+        """Execute requested tool calls and add their results to the conversation. Returns the number of calls (0 if none)."""
         tool_calls = self.tool_adapter.extract_tool_calls(response)
         if not tool_calls or not tool_handler:
-            return response
+            return 0
+
+        # Independent calls of one turn run concurrently; results keep the order of the tool calls
+        with tracer.span('tools.execute', tool_calls=len(tool_calls)) as span:
+            tool_results = self.tool_executor.execute(tool_handler, tool_calls)
+            span.set_attribute('failed', sum(not tool_result.success for tool_result in tool_results))
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            self.logger.debug(
+                'Tool %s finished in %.3fs (success=%s)', tool_call['tool_name'], tool_result.execution_time, tool_result.success
+            )
 
-        tool_results = []
-        for tool_call in tool_calls:
-            try:
-                result_content = tool_handler.execute_tool(tool_call['tool_name'], tool_call['tool_input'])
-                tool_result = ToolResult(tool_use_id=tool_call['tool_use_id'], content=str(result_content), success=True)
-            except Exception as e:
-                tool_result = ToolResult(tool_use_id=tool_call['tool_use_id'], content=f'Error: {str(e)}', success=False, error=str(e))
-            tool_results.append(tool_result)
+        if self.context_guard is not None:
+            for tool_call, tool_result in zip(tool_calls, tool_results):
+                max_tokens = tool_handler.max_result_tokens_for(tool_call['tool_name'])
+                tool_result.content = self.context_guard.check_tool_result(tool_result.content, max_tokens)
 
         # Format and add tool results to conversation
         formatted_results = self.tool_adapter.format_tool_results(tool_results)
         self._add_tool_conversation(messages, response, formatted_results)
+        return len(tool_calls)
 
-        # Make follow-up call
-        params['messages'] = messages
-        return self._make_tool_followup_call(params)
+    async def _amake_tool_followup_call(self, params):
+        """Make follow-up call with tool results without blocking the event loop."""
+        return await asyncio.to_thread(self._make_tool_followup_call, params)
 
     @abstractmethod
     def _add_tool_conversation(self, messages, response, formatted_results):
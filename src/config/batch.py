@@ -0,0 +1,95 @@
+"""Bounded-concurrency batch execution for provider and bot calls."""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+from .token_usage import TokenUsage
+
+# In ordered mode, results finished behind a slow earlier prompt are held back; the calls in flight
+# plus the results held back are capped at this many times the concurrency
+ORDERED_BUFFER_FACTOR = 4
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one item of a batch."""
+
+    index: int
+    prompt: str
+    text: Optional[str] = None
+    usage: Optional[TokenUsage] = None
+    latency: float = 0.0
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_batch(
+    call: Callable[[str], tuple],
+    prompts: Iterable[str],
+    concurrency: int = 4,
+    ordered: bool = True,
+) -> Iterator[BatchResult]:
+    """
+    Run call(prompt) for every prompt with at most `concurrency` calls in flight.
+
+    call returns a (text, TokenUsage) tuple. Results are yielded in input order,
+    or as soon as they complete when ordered is False. Prompts are consumed
+    lazily, so arbitrarily large iterables never pile up in memory; in ordered
+    mode, at most concurrency * ORDERED_BUFFER_FACTOR results wait behind a
+    slow prompt, after which no new prompts are started until it finishes.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+
+    prompts = iter(enumerate(prompts))
+    pending = {}
+    completed = {}
+    next_index = 0
+    buffer_limit = concurrency * ORDERED_BUFFER_FACTOR
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch') as executor:
+        while True:
+            # Keep the pool saturated without queueing the whole input
+            while len(pending) < concurrency and len(pending) + len(completed) < buffer_limit:
+                item = next(prompts, None)
+                if item is None:
+                    break
+                index, prompt = item
+                pending[executor.submit(_run_one, call, index, prompt)] = index
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                result = future.result()
+                if not ordered:
+                    yield result
+                    continue
+                completed[result.index] = result
+
+            while next_index in completed:
+                yield completed.pop(next_index)
+                next_index += 1
+
+
+def _run_one(call, index: int, prompt: str) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        response = call(prompt)
+    except Exception as e:
+        return BatchResult(index=index, prompt=prompt, latency=time.perf_counter() - start, error=e)
+
+    latency = time.perf_counter() - start
+    if not isinstance(response, tuple):
+        # Providers answer an empty prompt with a bare string and no usage
+        return BatchResult(index=index, prompt=prompt, text=response, latency=latency)
+
+    text, usage = response
+    return BatchResult(index=index, prompt=prompt, text=text, usage=usage, latency=latency)
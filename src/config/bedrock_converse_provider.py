@@ -1,43 +1,58 @@
-import boto3
-from botocore.config import Config
-
 from .base_provider import BaseProvider
+from .client_registry import ClientRegistry
 from .token_usage import TokenUsage
 from .tool_adapters import BedrockToolAdapter
-from .tool_system import ToolResult
 
 
 class BedrockConverseProvider(BaseProvider):
+    # Ends the cacheable prefix of the system prompt or tool list when prompt caching is enabled
+    CACHE_POINT = {'cachePoint': {'type': 'default'}}
+
     def __init__(self, model_id: str, debug: bool = False, tools=None):
         tool_specs = tools or []
         super().__init__('Bedrock-Claude-Converse', model_id, debug, tool_specs)
-        # Configure timeout to prevent hanging
-        config = Config(read_timeout=30, connect_timeout=10, retries={'max_attempts': 2})
-        self.client = boto3.client(service_name='bedrock-runtime', region_name='eu-central-1', config=config)
+        # Shared pooled client; timeouts (30s read, 10s connect) and SDK retries (3 attempts, unless a ResilientCaller
+        # retries the call) come from the registry pool settings
+        self.client = ClientRegistry.default().bedrock_runtime('eu-central-1')
 
     def _create_tool_adapter(self) -> BedrockToolAdapter:
         """Create Bedrock tool adapter."""
         return BedrockToolAdapter()
 
-    def invoke(self, system_prompt: str, user_prompt: str, tool_handler=None, messages=None):
+    def _invoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None, messages=None):
         if self.is_empty(user_prompt) and not messages:
             return ' '
 
         messages = self._prepare_messages(user_prompt, messages)
-        params = self._build_converse_params(system_prompt, messages)
+        params = self._build_converse_params(system_prompt, messages, inference_params)
 
         response = self.client.converse(**params)
-        response = self._handle_tool_execution(response, tool_handler, messages, params)
+        self.logger.debug('Initial response: %s', response)
+        response, usage = self._execute_tools(response, tool_handler, messages, params)
 
         completion_text = self._extract_completion_text(response)
-        usage = self._extract_token_usage(response)
 
-        input_tokens = response['usage']['inputTokens']
-        output_tokens = response['usage']['outputTokens']
-        self.trace_invocation_result_with_tokens(input_tokens, output_tokens, completion_text)
+        self.trace_invocation_result_with_tokens(usage.input_tokens, usage.output_tokens, completion_text)
 
         return completion_text, usage
 
+    def _stream(self, system_prompt: str, user_prompt: str, inference_params=None):
+        """Stream text deltas through the ConverseStream API, with usage from the metadata event."""
+        messages = self._prepare_messages(user_prompt, None)
+        params = self._build_converse_params(system_prompt, messages, inference_params)
+        # Tool calls are not executed while streaming, so let the model answer in text
+        params.pop('toolConfig', None)
+
+        response = self.client.converse_stream(**params)
+
+        for event in response['stream']:
+            if 'contentBlockDelta' in event:
+                text = event['contentBlockDelta']['delta'].get('text')
+                if text:
+                    yield text
+            elif 'metadata' in event:
+                yield self._extract_token_usage(event['metadata'])
+
     def _prepare_messages(self, user_prompt: str, messages: list) -> list:
         """Prepare messages for Converse API."""
         if messages is None:
@@ -50,26 +65,33 @@ class BedrockConverseProvider(BaseProvider):
         else:
             # When messages are provided, check if we need to add the current user_prompt
             if user_prompt and not self.is_empty(user_prompt):
-                messages.append({'role': 'user', 'content': [{'text': user_prompt}]})
+                if messages and messages[-1]['role'] == 'user':
+                    # Roles must alternate, e.g. after tool results declined by a stopped tool loop
+                    messages[-1]['content'].append({'text': user_prompt})
+                else:
+                    messages.append({'role': 'user', 'content': [{'text': user_prompt}]})
             return messages
 
-    def _build_converse_params(self, system_prompt: str, messages: list) -> dict:
+    def _build_converse_params(self, system_prompt: str, messages: list, inference_params=None) -> dict:
         """Build parameters for the Converse API call."""
         # System message configuration
         system_messages = []
         if system_prompt:
             system_messages = [{'text': system_prompt}]
+            if self.prompt_caching:
+                system_messages.append(self.CACHE_POINT)
 
         # Check if the conversation already has tool results that need processing
         has_tool_results = self._has_tool_results_in_conversation(messages)
         has_pending_tools = self._has_pending_tool_calls(messages)
 
-        # Configure inference parameters
+        # Configure inference parameters (the Converse API does not return logprobs)
+        settings = self.inference_settings(inference_params)
         inference_config = {
-            'maxTokens': self.DEFAULT_MAX_TOKENS,
-            'temperature': self.DEFAULT_TEMPERATURE,
-            'topP': self.DEFAULT_TOP_P,
-            'stopSequences': [seq.replace('\\', '') for seq in self.STOP_SEQUENCES],
+            'maxTokens': settings['max_tokens'],
+            'temperature': settings['temperature'],
+            'topP': settings['top_p'],
+            'stopSequences': [seq.replace('\\', '') for seq in settings['stop_sequences']],
         }
 
         # Configure tool config if tools are available OR if conversation has tool use/results
@@ -99,49 +121,17 @@ class BedrockConverseProvider(BaseProvider):
         tool_config = None
         if self.tools:
             bedrock_tools = self.tool_adapter.convert_tools(self.tools)
+            if self.prompt_caching and self._supports_tool_cache_point():
+                bedrock_tools.append(self.CACHE_POINT)
             tool_config = {'tools': bedrock_tools}
         elif has_tool_results or has_pending_tools:
             # If conversation has tool use/results but no tools configured, log warning
             self.logger.warning('Conversation contains tool usage but no tools configured')
         return tool_config
 
-    def _handle_tool_execution(self, response, tool_handler, messages: list, params: dict):
-        """Handle tool execution if tool calls are present in the response."""
-        self.logger.debug('Initial response: %s', response)
-
-        message_content = response['output']['message']['content']
-        self.logger.debug('Initial message_content: %s', message_content)
-
-        tool_calls = self.tool_adapter.extract_tool_calls(response)
-
-        if tool_calls and tool_handler:
-            # Process tool calls
-            tool_results = []
-            for tool_call in tool_calls:
-                try:
-                    result_content = tool_handler.execute_tool(tool_call['tool_name'], tool_call['tool_input'])
-                    tool_result = ToolResult(tool_use_id=tool_call['tool_use_id'], content=str(result_content), success=True)
-                except Exception as e:
-                    tool_result = ToolResult(tool_use_id=tool_call['tool_use_id'], content=f'Error: {str(e)}', success=False, error=str(e))
-                tool_results.append(tool_result)
-
-            # Format tool results for Bedrock
-            formatted_results = self.tool_adapter.format_tool_results(tool_results)
-
-            # Send tool results back to get final response
-            messages.append({'role': 'assistant', 'content': message_content})
-            messages.append({'role': 'user', 'content': formatted_results})
-
-            # Make another call with tool results
-            params['messages'] = messages
-
-            self.logger.debug('Sending follow-up converse_params: %s', params)
-
-            response = self.client.converse(**params)
-
-            self.logger.debug('Follow-up response: %s', response)
-
-        return response
+    def _supports_tool_cache_point(self) -> bool:
+        """Claude models accept a cache point after the tool list; Nova only caches system and messages."""
+        return 'anthropic.' in self.model_id
 
     def _extract_completion_text(self, response) -> str:
         """Extract text completion from the response."""
@@ -210,5 +200,11 @@ class BedrockConverseProvider(BaseProvider):
         return self.client.converse(**params)
 
     def _extract_token_usage(self, response) -> TokenUsage:
-        """Extract token usage from response."""
-        return TokenUsage(input_tokens=response['usage']['inputTokens'], output_tokens=response['usage']['outputTokens'])
+        """Extract token usage, including prompt cache reads and writes, from response."""
+        usage = response['usage']
+        return TokenUsage(
+            input_tokens=usage['inputTokens'],
+            output_tokens=usage['outputTokens'],
+            cache_read_tokens=usage.get('cacheReadInputTokens', 0),
+            cache_write_tokens=usage.get('cacheWriteInputTokens', 0),
+        )
@@ -1,6 +1,6 @@
 import json
-import boto3
 from .base_provider import BaseProvider
+from .client_registry import ClientRegistry
 from .token_usage import TokenUsage
 from .tool_adapters import NoOpToolAdapter
 
@@ -8,32 +8,17 @@ from .tool_adapters import NoOpToolAdapter
 class BedrockClaudeProvider(BaseProvider):
     def __init__(self, model_id: str, debug: bool = False):
         super().__init__('Bedrock-Claude', model_id, debug)
-        self.client = boto3.client(service_name='bedrock-runtime', region_name='eu-central-1')
+        self.client = ClientRegistry.default().bedrock_runtime('eu-central-1')
 
     def _create_tool_adapter(self) -> NoOpToolAdapter:
         """Create NoOp tool adapter since this Bedrock provider doesn't support tools."""
         return NoOpToolAdapter()
 
-    def invoke(self, system_prompt: str, user_prompt: str, tool_handler=None):
+    def _invoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None):
         if self.is_empty(user_prompt):
             return ' '
 
-        body = json.dumps(
-            {
-                'system': system_prompt,
-                'anthropic_version': 'bedrock-2023-05-31',
-                'max_tokens': self.DEFAULT_MAX_TOKENS,
-                'temperature': self.DEFAULT_TEMPERATURE,
-                'top_p': self.DEFAULT_TOP_P,
-                'messages': [
-                    {
-                        'role': 'user',
-                        'content': [{'type': 'text', 'text': user_prompt}],
-                    }
-                ],
-                'stop_sequences': self.STOP_SEQUENCES,
-            }
-        )
+        body = self._build_body(system_prompt, user_prompt, inference_params)
 
         self.trace_invocation_info(user_prompt, self.model_id, body)
 
@@ -54,6 +39,47 @@ class BedrockClaudeProvider(BaseProvider):
         usage = self._extract_token_usage(completion)
         return completion_text, usage
 
+    def _stream(self, system_prompt: str, user_prompt: str, inference_params=None):
+        """Stream Claude text deltas through invoke_model_with_response_stream."""
+        body = self._build_body(system_prompt, user_prompt, inference_params)
+
+        self.trace_invocation_info(user_prompt, self.model_id, body)
+
+        response = self.client.invoke_model_with_response_stream(modelId=self.model_id, body=body)
+
+        input_tokens = 0
+        output_tokens = 0
+        for event in response.get('body'):
+            chunk = json.loads(event['chunk']['bytes'])
+            if chunk['type'] == 'message_start':
+                input_tokens = chunk['message']['usage']['input_tokens']
+            elif chunk['type'] == 'content_block_delta' and chunk['delta'].get('type') == 'text_delta':
+                yield chunk['delta']['text']
+            elif chunk['type'] == 'message_delta':
+                output_tokens = chunk['usage']['output_tokens']
+
+        yield TokenUsage(input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def _build_body(self, system_prompt: str, user_prompt: str, inference_params=None) -> str:
+        """Build the Anthropic Messages body shared by invoke and stream."""
+        settings = self.inference_settings(inference_params)
+        return json.dumps(
+            {
+                'system': system_prompt,
+                'anthropic_version': 'bedrock-2023-05-31',
+                'max_tokens': settings['max_tokens'],
+                'temperature': settings['temperature'],
+                'top_p': settings['top_p'],
+                'messages': [
+                    {
+                        'role': 'user',
+                        'content': [{'type': 'text', 'text': user_prompt}],
+                    }
+                ],
+                'stop_sequences': settings['stop_sequences'],
+            }
+        )
+
     def _add_tool_conversation(self, messages, response, formatted_results):
         """No-op implementation since this provider doesn't support tools."""
         pass
@@ -0,0 +1,251 @@
+"""
+Process-wide registry of pooled SDK clients.
+
+Every LLMConfig used to build its own boto3/OpenAI/Groq/Anthropic clients,
+each with a private connection pool. The registry hands out one shared,
+thread-safe client per (provider, region, credentials) so connections and
+TLS sessions are reused across all bots and UIs.
+
+Every client is handed out as a RetrySwitchingClient: calls use the SDK's own
+retries, except inside without_sdk_retries(), which providers enter while a
+ResilientCaller retries the call itself, so the attempts do not multiply.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from .logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool and timeout settings applied to every client in a registry."""
+
+    max_connections: int = 50
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    # SDK retries, used for calls a ResilientCaller does not retry (tool loops, explicit conversations)
+    bedrock_max_attempts: int = 3
+    sdk_max_retries: int = 2
+
+
+_sdk_retries = contextvars.ContextVar('sdk_retries', default=True)
+
+
+@contextmanager
+def without_sdk_retries():
+    """Calls made in the block go to the variant of each client that does not retry on its own."""
+    token = _sdk_retries.set(False)
+    try:
+        yield
+    finally:
+        _sdk_retries.reset(token)
+
+
+class RetrySwitchingClient:
+    """A shared SDK client and its variant without SDK retries; attribute access picks one for the current context."""
+
+    def __init__(self, client, client_without_retries):
+        self._client = client
+        self._client_without_retries = client_without_retries
+
+    def __getattr__(self, name):
+        return getattr(self._client if _sdk_retries.get() else self._client_without_retries, name)
+
+
+class ClientRegistry:
+    """Hands out shared SDK clients keyed by provider, region and credentials."""
+
+    _default: Optional['ClientRegistry'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, pool: PoolSettings = None):
+        self.pool = pool or PoolSettings()
+        self.warmup_times: Dict[str, float] = {}
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+        # boto3 session behind each bedrock-runtime client; the session caches the credentials the client signs with
+        self._bedrock_sessions = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'ClientRegistry':
+        """The registry shared by the whole process."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @classmethod
+    def configure_default(cls, pool: PoolSettings) -> 'ClientRegistry':
+        """Replace the process-wide registry, e.g. to change pool sizes before any client is built."""
+        with cls._default_lock:
+            cls._default = cls(pool)
+            return cls._default
+
+    def bedrock_runtime(self, region: str = 'eu-central-1'):
+        """Shared boto3 bedrock-runtime client. boto3 clients are safe to share between threads."""
+        key = self._bedrock_key(region)
+        return self._get_or_create(key, lambda: self._build_bedrock(region, key))
+
+    def openai(self, async_client: bool = False):
+        """Shared OpenAI client. Async clients are shared per running event loop."""
+        key = ('openai', self._env_fingerprint('OPENAI_API_KEY'))
+        return self._get_or_create(key, lambda: self._build_openai(async_client), async_client)
+
+    def groq(self, async_client: bool = False):
+        """Shared Groq client. Async clients are shared per running event loop."""
+        key = ('groq', self._env_fingerprint('GROQ_API_KEY'))
+        return self._get_or_create(key, lambda: self._build_groq(async_client), async_client)
+
+    def anthropic(self, async_client: bool = False):
+        """Shared Anthropic client. Async clients are shared per running event loop."""
+        key = ('anthropic', self._env_fingerprint('ANTHROPIC_API_KEY'))
+        return self._get_or_create(key, lambda: self._build_anthropic(async_client), async_client)
+
+    def prewarm(self, targets: Iterable[str] = ('bedrock-runtime',), background: bool = True) -> Optional[threading.Thread]:
+        """
+        Build clients and open connections before the first user request.
+
+        Failures are logged and ignored: pre-warming is an optimisation, the
+        first real request simply pays the cost instead.
+        """
+        targets = list(targets)
+        if not background:
+            self._prewarm(targets)
+            return None
+
+        thread = threading.Thread(target=self._prewarm, args=(targets,), name='client-prewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """Drop all cached clients (mainly for tests)."""
+        with self._lock:
+            self._clients.clear()
+            self._async_clients.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _get_or_create(self, key, factory, async_client: bool = False):
+        with self._lock:
+            # Async connection pools are bound to the loop that opened them, so they cannot be shared across loops
+            clients = self._async_clients.setdefault(asyncio.get_running_loop(), {}) if async_client else self._clients
+            client = clients.get(key)
+            if client is None:
+                client = factory()
+                clients[key] = client
+                logger.debug('Created shared %s client', key[0])
+            return client
+
+    def _prewarm(self, targets):
+        for target in targets:
+            start = time.perf_counter()
+            try:
+                self._warm(target)
+            except Exception as e:
+                logger.warning('Pre-warm of %s failed: %s', target, e)
+                continue
+            self.warmup_times[target] = time.perf_counter() - start
+            logger.info('Pre-warmed %s client in %.2fs', target, self.warmup_times[target])
+
+    def _warm(self, target: str):
+        if target == 'bedrock-runtime':
+            # bedrock-runtime has no free read-only call: building the client loads the service
+            # model, and resolving credentials does the (possibly SSO) credential round trip.
+            self.bedrock_runtime()
+            credentials = self._bedrock_sessions[self._bedrock_key('eu-central-1')].get_credentials()
+            if credentials is not None:
+                credentials.get_frozen_credentials()
+        elif target in ('openai', 'groq', 'anthropic'):
+            # Listing models is free and leaves a kept-alive TLS connection in the pool
+            getattr(self, target)().models.list()
+        else:
+            raise ValueError(f'Unknown pre-warm target: {target}')
+
+    def _bedrock_key(self, region: str):
+        credentials = os.environ.get('AWS_ACCESS_KEY_ID') or os.environ.get('AWS_PROFILE') or os.environ.get('AWS_DEFAULT_PROFILE')
+        return 'bedrock-runtime', region, self._fingerprint(credentials)
+
+    def _build_bedrock(self, region: str, key):
+        import boto3
+        from botocore.config import Config
+
+        def config(max_attempts: int):
+            return Config(
+                read_timeout=self.pool.read_timeout,
+                connect_timeout=self.pool.connect_timeout,
+                retries={'total_max_attempts': max_attempts},
+                max_pool_connections=self.pool.max_connections,
+                tcp_keepalive=True,
+            )
+
+        # A dedicated session per key: boto3 sessions are not thread-safe, the clients they create are
+        session = boto3.session.Session()
+        self._bedrock_sessions[key] = session
+        return RetrySwitchingClient(
+            session.client(service_name='bedrock-runtime', region_name=region, config=config(self.pool.bedrock_max_attempts)),
+            session.client(service_name='bedrock-runtime', region_name=region, config=config(1)),
+        )
+
+    def _build_openai(self, async_client: bool):
+        import openai
+
+        if async_client:
+            return self._with_retry_switch(openai.AsyncOpenAI(http_client=openai.DefaultAsyncHttpxClient(**self._httpx_options())))
+        return self._with_retry_switch(openai.OpenAI(http_client=openai.DefaultHttpxClient(**self._httpx_options())))
+
+    def _build_groq(self, async_client: bool):
+        import groq
+
+        if async_client:
+            return self._with_retry_switch(groq.AsyncGroq(http_client=groq.DefaultAsyncHttpxClient(**self._httpx_options())))
+        return self._with_retry_switch(groq.Groq(http_client=groq.DefaultHttpxClient(**self._httpx_options())))
+
+    def _build_anthropic(self, async_client: bool):
+        import anthropic
+
+        if async_client:
+            return self._with_retry_switch(anthropic.AsyncAnthropic(http_client=anthropic.DefaultAsyncHttpxClient(**self._httpx_options())))
+        return self._with_retry_switch(anthropic.Anthropic(http_client=anthropic.DefaultHttpxClient(**self._httpx_options())))
+
+    def _with_retry_switch(self, client) -> RetrySwitchingClient:
+        # with_options copies the client but shares its HTTP connection pool
+        return RetrySwitchingClient(client.with_options(max_retries=self.pool.sdk_max_retries), client.with_options(max_retries=0))
+
+    def _httpx_options(self) -> dict:
+        import httpx
+
+        return {
+            'limits': httpx.Limits(
+                max_connections=self.pool.max_connections,
+                max_keepalive_connections=self.pool.max_keepalive_connections,
+                keepalive_expiry=self.pool.keepalive_expiry,
+            ),
+            'timeout': httpx.Timeout(self.pool.read_timeout, connect=self.pool.connect_timeout),
+        }
+
+    @classmethod
+    def _env_fingerprint(cls, variable: str) -> str:
+        return cls._fingerprint(os.environ.get(variable))
+
+    @staticmethod
+    def _fingerprint(secret: Optional[str]) -> str:
+        """Short hash so credentials distinguish clients without being kept in the key."""
+        if not secret:
+            return ''
+        return hashlib.sha256(secret.encode('utf-8')).hexdigest()[:12]
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class InferenceParams:
+    """
+    Per-call overrides of the provider's default inference settings.
+
+    Fields left as None keep the provider default. Classifier-style calls can
+    cap max_tokens and add stop sequences so they return after a few tokens.
+    logprobs is only honoured by providers that expose token log probabilities.
+    """
+
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    stop_sequences: Optional[Tuple[str, ...]] = None
+    logprobs: bool = False
+
+    @classmethod
+    def classifier(cls, max_tokens: int = 5, stop_sequences: Tuple[str, ...] = None) -> 'InferenceParams':
+        """Deterministic, short completion for calls that answer with a single label."""
+        return cls(max_tokens=max_tokens, temperature=0.0, stop_sequences=stop_sequences)
@@ -1,11 +1,16 @@
 """LLM provider configuration and bot factory methods."""
 
-from .anthropic_provider import AnthropicProvider
-from .bedrock_converse_provider import BedrockConverseProvider
-from .bedrock_provider import BedrockClaudeProvider
-from .groq_provider import GroqProvider
-from .openai_provider import OpenAIProvider
+import importlib
+import threading
+import time
+
+from .logger_config import setup_logger
+from .rate_limiter import get_shared_rate_limiter
+from .resilience import HedgePolicy, ResilientCaller, RetryPolicy
+from .response_cache import ResponseCache
 from .security_config import SecurityConfig
+from .token_estimator import ContextGuard
+from .usage_ledger import get_usage_ledger
 
 
 class LLMConfig:
@@ -27,59 +32,164 @@ class LLMConfig:
         """Check if security features are enabled. Delegates to SecurityConfig."""
         return SecurityConfig.is_security_enabled()
 
-    # Provider configurations: [ClassName, model_id]
+    # Provider configurations: [module.ClassName, model_id]
+    # Classes are imported on first use, so unused providers never load their SDK
     PROVIDERS = {
-        'groq': [GroqProvider, GROQ_MODEL_ID],
-        'openai': [OpenAIProvider, OPENAI_MODEL_ID],
-        'bedrock': [BedrockClaudeProvider, BEDROCK_MODEL_ID],
-        'bedrock_converse': [BedrockConverseProvider, BEDROCK_CONVERSE_MODEL_ID],
-        'bedrock_nova_lite': [BedrockConverseProvider, BEDROCK_CONVERSE_NOVA_LITE_ID],
-        'anthropic': [AnthropicProvider, ANTHROPIC_MODEL_ID],
+        'groq': ['groq_provider.GroqProvider', GROQ_MODEL_ID],
+        'openai': ['openai_provider.OpenAIProvider', OPENAI_MODEL_ID],
+        'bedrock': ['bedrock_provider.BedrockClaudeProvider', BEDROCK_MODEL_ID],
+        'bedrock_converse': ['bedrock_converse_provider.BedrockConverseProvider', BEDROCK_CONVERSE_MODEL_ID],
+        'bedrock_nova_lite': ['bedrock_converse_provider.BedrockConverseProvider', BEDROCK_CONVERSE_NOVA_LITE_ID],
+        'anthropic': ['anthropic_provider.AnthropicProvider', ANTHROPIC_MODEL_ID],
     }
 
-    def __init__(self, debug=False):
+    # Account rate limits per provider, shared by every LLMConfig in the process
+    RATE_LIMITS = {
+        # Groq free tier for llama-3.3-70b-versatile
+        'groq': {'requests_per_minute': 30, 'tokens_per_minute': 12000},
+        # OpenAI usage tier 1 for gpt-4o-mini
+        'openai': {'requests_per_minute': 500, 'tokens_per_minute': 200000},
+    }
+
+    # Retry and hedging policies per provider. Hedging doubles the cost of slow calls, so it is only
+    # enabled for Bedrock (long latency tail, no per-account RPM limit configured above)
+    RESILIENCE = {
+        'bedrock': {'retry': RetryPolicy(max_attempts=3)},
+        'bedrock_converse': {'retry': RetryPolicy(max_attempts=3), 'hedge': HedgePolicy(percentile=0.95)},
+        'bedrock_nova_lite': {'retry': RetryPolicy(max_attempts=3), 'hedge': HedgePolicy(percentile=0.95)},
+        'groq': {'retry': RetryPolicy(max_attempts=3, base_delay=1.0)},
+        'openai': {'retry': RetryPolicy(max_attempts=3)},
+        'anthropic': {'retry': RetryPolicy(max_attempts=3)},
+    }
+
+    # Providers whose static prompt prefix (system prompt, tool specs) is marked for provider-side prompt caching.
+    # Claude 3 Haiku on Bedrock rejects cache points, so only models that support them are listed.
+    PROMPT_CACHING = {'bedrock_nova_lite', 'anthropic'}
+
+    # Context window (input + output tokens) per model, used for the pre-flight size check of every request
+    CONTEXT_WINDOWS = {
+        BEDROCK_MODEL_ID: 200000,
+        BEDROCK_CONVERSE_NOVA_LITE_ID: 300000,
+        ANTHROPIC_MODEL_ID: 200000,
+        OPENAI_MODEL_ID: 128000,
+        GROQ_MODEL_ID: 131072,
+    }
+    DEFAULT_CONTEXT_WINDOW = 32000
+    # What to do with requests that do not fit: 'trim' the user prompt, 'reject' them or only 'warn'.
+    # Trimming rewrites prompts and tool output, so it is opt-in: set 'trim' here, or give a tool a
+    # max_result_tokens when registering it
+    CONTEXT_POLICY = 'warn'
+    # Optional input budget per request, below the model window (None: the window less the completion)
+    MAX_INPUT_TOKENS = None
+    # Cap of every tool result under the 'trim' policy
+    MAX_TOOL_RESULT_TOKENS = 8000
+
+    # Backends and policy of the 'router' provider, which spreads calls across several providers.
+    # Set a DEFAULT_*_PROVIDER below to 'router' to use it for a bot role.
+    ROUTER_NAME = 'router'
+    ROUTER_BACKENDS = ['bedrock_converse', 'groq', 'openai']
+    ROUTER_POLICY = 'fastest'
+    ROUTER_WEIGHTS = {}
+
+    # Default provider names per bot role
+    DEFAULT_UNPROTECTED_PROVIDER = 'bedrock_converse'
+    # Haiku has some known problems with tools
+    DEFAULT_TOOL_UNPROTECTED_BOT_PROVIDER = 'bedrock_nova_lite'
+    DEFAULT_SECURE_PROVIDER = 'bedrock_converse'
+
+    def __init__(self, debug=False, response_cache: ResponseCache = None):
         self.debug = debug
+        self.response_cache = response_cache
         self.providers = {}
-        self.default_unprotected_llm = None
-        self.default_secure_llm = None
-
-    def initialize(self):
-        self._initialize_providers()
-        self._set_defaults()
+        self.construction_times = {}
+        self.logger = setup_logger(__name__, debug)
+        self._providers_lock = threading.RLock()
+
+    def initialize(self, eager: bool = False):
+        """Prepare the configuration. Providers are built on first access unless eager is set."""
+        if eager:
+            for name in self.PROVIDERS:
+                self.get_provider(name)
         return self
 
-    def _initialize_providers(self):
-        for name, (provider_class, model_id) in self.PROVIDERS.items():
-            self.providers[name] = provider_class(model_id=model_id, debug=self.debug)
+    @property
+    def default_unprotected_llm(self):
+        return self.get_provider(self.DEFAULT_UNPROTECTED_PROVIDER)
+
+    @property
+    def default_secure_llm(self):
+        return self.get_provider(self.DEFAULT_SECURE_PROVIDER)
 
-    def _set_defaults(self):
-        self.default_unprotected_llm = self.providers['bedrock_converse']
-        # Haiku has some known problems with tools
-        self.default_tool_unprotected_bot_llm = self.providers['bedrock_nova_lite']
-        self.default_secure_llm = self.providers['bedrock_converse']
+    @property
+    def default_tool_unprotected_bot_llm(self):
+        return self.get_provider(self.DEFAULT_TOOL_UNPROTECTED_BOT_PROVIDER)
 
     def get_provider(self, name):
-        """Get provider by name. Easier to add new providers."""
-        return self.providers.get(name)
+        """Get provider by name, building it on first access. Easier to add new providers."""
+        if name not in self.PROVIDERS and name != self.ROUTER_NAME:
+            return None
+
+        with self._providers_lock:
+            if name not in self.providers:
+                self.providers[name] = self._create_router() if name == self.ROUTER_NAME else self._create_provider(name)
+            return self.providers[name]
+
+    def _create_provider(self, name):
+        class_path, model_id = self.PROVIDERS[name]
+        start = time.perf_counter()
+
+        module_name, class_name = class_path.rsplit('.', 1)
+        provider_class = getattr(importlib.import_module(f'.{module_name}', __package__), class_name)
+        provider = provider_class(model_id=model_id, debug=self.debug)
+        provider.response_cache = self.response_cache
+        if name in self.RATE_LIMITS:
+            provider.rate_limiter = get_shared_rate_limiter(name, **self.RATE_LIMITS[name])
+        provider.prompt_caching = name in self.PROMPT_CACHING
+        if name in self.RESILIENCE:
+            provider.resilience = ResilientCaller(**self.RESILIENCE[name])
+        provider.context_guard = ContextGuard(
+            provider.token_estimator,
+            self.CONTEXT_WINDOWS.get(model_id, self.DEFAULT_CONTEXT_WINDOW),
+            policy=self.CONTEXT_POLICY,
+            max_input_tokens=self.MAX_INPUT_TOKENS,
+            max_tool_result_tokens=self.MAX_TOOL_RESULT_TOKENS,
+        )
+        # Every provider reports to the process-wide ledger, which also enforces its spend caps
+        provider.usage_ledger = get_usage_ledger()
+
+        self.construction_times[name] = time.perf_counter() - start
+        self.logger.debug('Provider %s constructed in %.3fs', name, self.construction_times[name])
+        return provider
+
+    def _create_router(self):
+        from .router_provider import RouterProvider
+
+        # The router owns its backends, so the tools it hands them do not leak to other bots.
+        # They still share the SDK clients, rate limiters, response cache and ledger of the process.
+        backends = {name: self._create_provider(name) for name in self.ROUTER_BACKENDS}
+        return RouterProvider(backends, policy=self.ROUTER_POLICY, weights=self.ROUTER_WEIGHTS, debug=self.debug)
 
     # Backwards compatibility methods
     def get_groq_llm(self):
-        return self.providers['groq']
+        return self.get_provider('groq')
 
     def get_openai_llm(self):
-        return self.providers['openai']
+        return self.get_provider('openai')
 
     def get_bedrock_llm(self):
-        return self.providers['bedrock']
+        return self.get_provider('bedrock')
 
     def get_anthropic_llm(self):
-        return self.providers['anthropic']
+        return self.get_provider('anthropic')
 
     def get_bedrock_converse_llm(self):
-        return self.providers['bedrock_converse']
+        return self.get_provider('bedrock_converse')
 
     def get_bedrock_converse_nova_lite(self):
-        return self.providers['bedrock_nova_lite']
+        return self.get_provider('bedrock_nova_lite')
+
+    def get_router_llm(self):
+        return self.get_provider(self.ROUTER_NAME)
 
     def get_default_unprotected_llm(self):
         return self.default_unprotected_llm
@@ -99,7 +209,9 @@ class LLMConfig:
     def create_system_prompt_guardrail_setup(self):
         from chatbot.system_prompt_guardrail_bot import SystemPromptGuardrailBot
 
-        return SystemPromptGuardrailBot(self.get_default_secure_llm())
+        from .verdict_cache import get_verdict_cache
+
+        return SystemPromptGuardrailBot(self.get_default_secure_llm(), verdict_cache=get_verdict_cache())
 
     def create_input_guardrail_setup(self):
         from chatbot.input_guardrail_bot import InputGuardrailBot
@@ -0,0 +1,221 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms live in a MetricsRegistry. MetricsSpanExporter turns
+the spans emitted by config.tracing into metrics, so everything that is traced
+(provider calls, tools, guardrails, bots) is measured without extra
+instrumentation:
+
+    tracer.add_exporter(MetricsSpanExporter(registry))
+    registry.render()  # body of a /metrics response
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .tracing import ERROR, Span, SpanExporter, tracer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from a cached response to a long tool loop
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple('' if labels[name] is None else str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter(_Metric):
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError('Counters can only increase')
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{self._format_labels(key)} {_format_number(value)}' for key, value in items]
+
+
+class Histogram(_Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum and count
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._label_values(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            values = self._values.get(self._label_values(labels))
+        return values[2] if values else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{self._format_labels(key, ("le", _format_number(bound)))} {cumulative}')
+            lines.append(f'{self.name}_sum{self._format_labels(key)} {_format_number(total)}')
+            lines.append(f'{self.name}_count{self._format_labels(key)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric_class, name, documentation, labelnames, **kwargs):
+        """Metric of that name, created on first use, so modules can declare the same metric independently."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, documentation, labelnames, **kwargs)
+            metric = self._metrics[name]
+        if not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f'Metric {name} is already registered with a different type or labels')
+        return metric
+
+
+class MetricsSpanExporter(SpanExporter):
+    """Derives request, token, guardrail and tool metrics from finished spans."""
+
+    LLM_SPANS = ('llm.invoke', 'llm.ainvoke', 'llm.stream')
+
+    def __init__(self, registry: MetricsRegistry):
+        self.llm_latency = registry.histogram(
+            'llm_request_duration_seconds', 'Latency of provider calls, including tool loops', ['provider', 'model', 'cache_hit']
+        )
+        self.llm_requests = registry.counter('llm_requests_total', 'Provider calls by outcome', ['provider', 'model', 'status'])
+        self.time_to_first_token = registry.histogram(
+            'llm_time_to_first_token_seconds', 'Time to the first streamed text delta', ['provider', 'model']
+        )
+        self.tokens = registry.counter('llm_tokens_total', 'Tokens reported by providers', ['provider', 'model', 'direction'])
+        self.bot_latency = registry.histogram('bot_request_duration_seconds', 'End-to-end latency of a bot chat', ['bot'])
+        self.bot_requests = registry.counter(
+            'bot_requests_total', "Bot chats by the guardrail that blocked them ('none' when answered)", ['bot', 'blocked']
+        )
+        self.guardrail_latency = registry.histogram('guardrail_duration_seconds', 'Latency of guardrail checks', ['guardrail'])
+        self.tool_latency = registry.histogram('tool_execution_duration_seconds', 'Latency of a single tool call', ['tool', 'status'])
+
+    def export(self, span: Span):
+        attributes = span.attributes
+        if span.name in self.LLM_SPANS:
+            self._export_llm(span)
+        elif span.name == 'bot.chat':
+            self.bot_latency.observe(span.duration, bot=attributes.get('bot'))
+            self.bot_requests.inc(bot=attributes.get('bot'), blocked=attributes.get('blocked') or 'none')
+        elif span.name.startswith('guardrail.'):
+            self.guardrail_latency.observe(span.duration, guardrail=span.name.split('.', 1)[1])
+        elif span.name == 'tool.execute':
+            self.tool_latency.observe(span.duration, tool=attributes.get('tool'), status=span.status)
+
+    def _export_llm(self, span: Span):
+        attributes = span.attributes
+        provider, model = attributes.get('provider'), attributes.get('model')
+        self.llm_requests.inc(provider=provider, model=model, status=span.status)
+        if span.status == ERROR:
+            return
+        self.llm_latency.observe(span.duration, provider=provider, model=model, cache_hit=bool(attributes.get('cache_hit')))
+        if attributes.get('time_to_first_token') is not None:
+            self.time_to_first_token.observe(attributes['time_to_first_token'], provider=provider, model=model)
+        # Cached responses cost no tokens
+        if not attributes.get('cache_hit'):
+            self.tokens.inc(attributes.get('input_tokens', 0), provider=provider, model=model, direction='input')
+            self.tokens.inc(attributes.get('output_tokens', 0), provider=provider, model=model, direction='output')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+_exporter: Optional[MetricsSpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def enable_metrics() -> MetricsRegistry:
+    """Feed the spans of the process-wide tracer into the default registry. Safe to call more than once."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsSpanExporter(registry)
+            tracer.add_exporter(_exporter)
+    return registry
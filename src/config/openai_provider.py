@@ -1,5 +1,6 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from .base_provider import BaseProvider
+from .client_registry import ClientRegistry
 from .token_usage import TokenUsage
 from .tool_adapters import OpenAICompatibleToolAdapter
 
@@ -7,49 +8,104 @@ from .tool_adapters import OpenAICompatibleToolAdapter
 class OpenAIProvider(BaseProvider):
     def __init__(self, model_id: str, debug: bool = False, tools=None):
         super().__init__('GPT4o-OpenAI', model_id, debug, tools)
-        self.client = OpenAI()
+        self.client = ClientRegistry.default().openai()
+        # Fixed async client override; by default one is taken from the registry per event loop
+        self._async_client = None
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Async client shared by all providers running on the current event loop."""
+        return self._async_client or ClientRegistry.default().openai(async_client=True)
 
     def _create_tool_adapter(self) -> OpenAICompatibleToolAdapter:
         """Create OpenAI-compatible tool adapter."""
         return OpenAICompatibleToolAdapter()
 
-    def invoke(self, system_prompt: str, user_prompt: str, tool_handler=None):
+    def _invoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None):
         """Invoke OpenAI model with system and user prompts."""
         if self.is_empty(user_prompt):
             return ' '
 
         self.logger.debug('OpenAIProvider invoke...')
 
+        messages, params = self._prepare_request(system_prompt, user_prompt, inference_params)
+
+        response = self.client.chat.completions.create(**params)
+
+        # Handle tool calls if present
+        response, usage = self._execute_tools(response, tool_handler, messages, params)
+
+        return self._build_result(response, usage)
+
+    async def _ainvoke(self, system_prompt: str, user_prompt: str, tool_handler=None, inference_params=None):
+        """Invoke OpenAI model with the native async client."""
+        if self.is_empty(user_prompt):
+            return ' '
+
+        self.logger.debug('OpenAIProvider ainvoke...')
+
+        messages, params = self._prepare_request(system_prompt, user_prompt, inference_params)
+
+        response = await self.async_client.chat.completions.create(**params)
+        response, usage = await self._aexecute_tools(response, tool_handler, messages, params)
+
+        return self._build_result(response, usage)
+
+    def _prepare_request(self, system_prompt: str, user_prompt: str, inference_params=None):
+        """Build messages and parameters, including tools if available."""
         messages = [{'role': 'system', 'content': system_prompt}, {'role': 'user', 'content': user_prompt}]
 
         self.trace_invocation_info(user_prompt, self.model_id, messages)
 
-        # Prepare parameters
-        params = {
-            'model': self.model_id,
-            'messages': messages,
-            'max_tokens': self.DEFAULT_MAX_TOKENS,
-            'temperature': self.DEFAULT_TEMPERATURE,
-            'top_p': self.DEFAULT_TOP_P,
-            'stop': self.STOP_SEQUENCES,
-        }
+        params = self._build_params(messages, inference_params)
 
         # Add tools if available
         if self.tools:
             openai_tools = self.tool_adapter.convert_tools(self.tools)
             params['tools'] = openai_tools
 
-        response = self.client.chat.completions.create(**params)
-
-        # Handle tool calls if present
-        response = self._execute_tools(response, tool_handler, messages, params)
+        return messages, params
 
+    def _build_result(self, response, usage):
+        """Extract completion text from the final response; usage covers all tool rounds."""
         completion_text = response.choices[0].message.content
         self.trace_invocation_result_basic(completion_text, response.usage)
 
-        usage = self._extract_token_usage(response)
+        logprobs = getattr(response.choices[0], 'logprobs', None)
+        if logprobs is not None and logprobs.content:
+            usage.logprobs = [(token.token, token.logprob) for token in logprobs.content]
         return completion_text, usage
 
+    def _stream(self, system_prompt: str, user_prompt: str, inference_params=None):
+        """Stream OpenAI completion deltas, with usage reported in the final chunk."""
+        messages = [{'role': 'system', 'content': system_prompt}, {'role': 'user', 'content': user_prompt}]
+
+        self.trace_invocation_info(user_prompt, self.model_id, messages)
+
+        params = self._build_params(messages, inference_params)
+        stream = self.client.chat.completions.create(**params, stream=True, stream_options={'include_usage': True})
+
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.usage:
+                yield self._extract_token_usage(chunk)
+
+    def _build_params(self, messages, inference_params=None):
+        """Build the chat completion parameters shared by invoke and stream."""
+        settings = self.inference_settings(inference_params)
+        params = {
+            'model': self.model_id,
+            'messages': messages,
+            'max_tokens': settings['max_tokens'],
+            'temperature': settings['temperature'],
+            'top_p': settings['top_p'],
+            'stop': settings['stop_sequences'],
+        }
+        if settings['logprobs']:
+            params['logprobs'] = True
+        return params
+
     def _add_tool_conversation(self, messages, response, formatted_results):
         """Add tool conversation to messages (OpenAI format)."""
         messages.append(response.choices[0].message.model_dump())
@@ -59,5 +115,17 @@ class OpenAIProvider(BaseProvider):
         """Make follow-up call with tool results (OpenAI format)."""
         return self.client.chat.completions.create(**params)
 
+    async def _amake_tool_followup_call(self, params):
+        """Make follow-up call with tool results using the async client."""
+        return await self.async_client.chat.completions.create(**params)
+
     def _extract_token_usage(self, response):
-        return TokenUsage(input_tokens=response.usage.prompt_tokens, output_tokens=response.usage.completion_tokens)
+        # OpenAI caches long prompt prefixes automatically and reports the hits in prompt_tokens_details.
+        # prompt_tokens includes those hits; like Bedrock and Anthropic, input_tokens counts only the uncached rest.
+        details = getattr(response.usage, 'prompt_tokens_details', None)
+        cache_read_tokens = getattr(details, 'cached_tokens', None) or 0
+        return TokenUsage(
+            input_tokens=response.usage.prompt_tokens - cache_read_tokens,
+            output_tokens=response.usage.completion_tokens,
+            cache_read_tokens=cache_read_tokens,
+        )
@@ -0,0 +1,146 @@
+"""
+Requests-per-minute and tokens-per-minute rate limiting for providers.
+
+Providers throttle on both RPM and TPM. A RateLimiter holds one token bucket
+for each, admits callers strictly in arrival order, and reconciles the token
+estimate made before a call with the actual TokenUsage reported after it.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class RateLimitStats:
+    """How long callers waited for the limiter."""
+
+    requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    recent_waits: deque = field(default_factory=lambda: deque(maxlen=256))
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+class _Bucket:
+    """Token bucket refilled continuously at per_minute / 60 units per second."""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they already are)."""
+        missing = amount - self.level
+        return max(0.0, missing / self.rate)
+
+
+class RateLimiter:
+    """
+    Fair RPM/TPM limiter shared by every call to a provider.
+
+    Callers queue in FIFO order: only the head of the queue may take capacity,
+    so a large request cannot be starved by a stream of small ones.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        request_burst: Optional[float] = None,
+        token_burst: Optional[float] = None,
+    ):
+        self.requests = _Bucket(requests_per_minute, request_burst) if requests_per_minute else None
+        self.tokens = _Bucket(tokens_per_minute, token_burst) if tokens_per_minute else None
+        self.stats = RateLimitStats()
+        self._condition = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """Block until the call may proceed. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        if self.tokens is not None:
+            # A request larger than the bucket could never be admitted; let it drain the bucket instead
+            estimated_tokens = min(estimated_tokens, self.tokens.capacity)
+
+        with self._condition:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while True:
+                if ticket != self._serving:
+                    self._condition.wait()
+                    continue
+
+                delay = self._delay_for(estimated_tokens)
+                if delay <= 0:
+                    self._take(estimated_tokens)
+                    self._serving += 1
+                    self._condition.notify_all()
+                    break
+                self._condition.wait(delay)
+
+            waited = time.monotonic() - start
+            self._record_wait(waited)
+        return waited
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Charge (or refund) the difference between the pre-call estimate and the actual usage."""
+        if self.tokens is None:
+            return
+        with self._condition:
+            self.tokens.refill(time.monotonic())
+            # The level may go negative: that debt delays the next callers
+            self.tokens.level -= actual_tokens - min(estimated_tokens, self.tokens.capacity)
+            self._condition.notify_all()
+
+    def _delay_for(self, estimated_tokens: int) -> float:
+        now = time.monotonic()
+        delay = 0.0
+        if self.requests is not None:
+            self.requests.refill(now)
+            delay = max(delay, self.requests.delay_for(1))
+        if self.tokens is not None:
+            self.tokens.refill(now)
+            delay = max(delay, self.tokens.delay_for(estimated_tokens))
+        return delay
+
+    def _take(self, estimated_tokens: int):
+        if self.requests is not None:
+            self.requests.level -= 1
+        if self.tokens is not None:
+            self.tokens.level -= estimated_tokens
+
+    def _record_wait(self, waited: float):
+        self.stats.requests += 1
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+        self.stats.recent_waits.append(waited)
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(key: str, **limits) -> RateLimiter:
+    """
+    Process-wide limiter for a provider account.
+
+    Limits are enforced per API account, so every LLMConfig must share the
+    same limiter. The limits of the first caller for a key win.
+    """
+    with _shared_lock:
+        if key not in _shared_limiters:
+            _shared_limiters[key] = RateLimiter(**limits)
+        return _shared_limiters[key]
@@ -0,0 +1,318 @@
+"""
+Retries and hedged requests around provider calls.
+
+Retryable errors (throttling, timeouts, 5xx) are retried with exponential
+backoff and full jitter. Optionally, once a call has been running longer
+than a learned latency percentile, a duplicate "hedge" request is sent and
+whichever finishes first wins; the loser is cancelled when possible and
+otherwise ignored.
+
+Calls this module retries run without the SDK's own retries (see
+client_registry.without_sdk_retries); calls it does not retry, such as tool
+loops, keep them. A hedge is a second billable request: providers pass a hedge_fn that goes
+through their rate limiter, and an on_discarded callback that records the
+usage of the losing request once it finishes.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .client_registry import without_sdk_retries
+from .logger_config import setup_logger
+from .tracing import current_span
+
+logger = setup_logger(__name__)
+
+# Exception class names raised by boto3/botocore and the OpenAI-compatible SDKs for transient failures
+RETRYABLE_ERROR_NAMES = {
+    'ReadTimeoutError',
+    'ConnectTimeoutError',
+    'EndpointConnectionError',
+    'ConnectionClosedError',
+    'RateLimitError',
+    'APIConnectionError',
+    'APITimeoutError',
+    'InternalServerError',
+    'ServiceUnavailableError',
+    'OverloadedError',
+}
+
+# botocore ClientError codes worth retrying
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'InternalServerException',
+    'ModelNotReadyException',
+    'ModelTimeoutException',
+}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an error is transient and the call may succeed if repeated."""
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+
+    status_code = getattr(error, 'status_code', None)
+    if isinstance(status_code, int) and (status_code == 429 or status_code >= 500):
+        return True
+
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep uniform(0, min(max_delay, base_delay * 2**retry))."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+@dataclass
+class HedgePolicy:
+    """Send a duplicate request once a call runs longer than the given latency percentile."""
+
+    percentile: float = 0.95
+    min_samples: int = 20
+    min_delay: float = 0.5
+    window: int = 200
+
+
+@dataclass
+class ResilienceStats:
+    calls: int = 0
+    retries: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+
+    @property
+    def hedge_win_rate(self) -> float:
+        return self.hedges_won / self.hedges_fired if self.hedges_fired else 0.0
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class ResilientCaller:
+    """Runs provider calls with retries and optional hedging. One instance per provider."""
+
+    def __init__(self, retry: RetryPolicy = None, hedge: Optional[HedgePolicy] = None, max_workers: int = 16):
+        self.retry = retry or RetryPolicy()
+        self.hedge = hedge
+        self.stats = ResilienceStats()
+        self.latencies = LatencyTracker(hedge.window if hedge else 200)
+        self._max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        fn: Callable,
+        retryable: bool = True,
+        hedgeable: bool = True,
+        hedge_fn: Optional[Callable] = None,
+        on_discarded: Optional[Callable] = None,
+    ):
+        """
+        Call fn(), retrying transient errors and hedging slow attempts.
+
+        The hedge runs hedge_fn() (fn() by default). When both requests complete,
+        on_discarded(result) receives the result of the one that was not returned.
+        """
+        self._count('calls')
+        attempts = self.retry.max_attempts if retryable else 1
+        if retryable:
+            # This caller retries: SDK retries inside each attempt would multiply the attempts
+            fn, hedge_fn = _without_sdk_retries(fn), _without_sdk_retries(hedge_fn or fn)
+        for attempt in range(attempts):
+            try:
+                return self._call_once(fn, hedgeable, hedge_fn or fn, on_discarded)
+            except Exception as e:
+                if attempt == attempts - 1 or not is_retryable(e):
+                    raise
+                delay = self.retry.delay(attempt)
+                self._count('retries')
+                _annotate_span(retries=attempt + 1)
+                logger.warning('Retrying after %s (attempt %d/%d) in %.2fs', type(e).__name__, attempt + 1, attempts, delay)
+                time.sleep(delay)
+
+    async def acall(
+        self,
+        coro_fn: Callable,
+        retryable: bool = True,
+        hedgeable: bool = True,
+        hedge_fn: Optional[Callable] = None,
+        on_discarded: Optional[Callable] = None,
+    ):
+        """Async counterpart of call: coro_fn() returns a new coroutine per attempt and losers are truly cancelled."""
+        self._count('calls')
+        attempts = self.retry.max_attempts if retryable else 1
+        if retryable:
+            coro_fn, hedge_fn = _awithout_sdk_retries(coro_fn), _awithout_sdk_retries(hedge_fn or coro_fn)
+        for attempt in range(attempts):
+            try:
+                return await self._acall_once(coro_fn, hedgeable, hedge_fn or coro_fn, on_discarded)
+            except Exception as e:
+                if attempt == attempts - 1 or not is_retryable(e):
+                    raise
+                delay = self.retry.delay(attempt)
+                self._count('retries')
+                _annotate_span(retries=attempt + 1)
+                logger.warning('Retrying after %s (attempt %d/%d) in %.2fs', type(e).__name__, attempt + 1, attempts, delay)
+                await asyncio.sleep(delay)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while hedging is off or still learning."""
+        if self.hedge is None or len(self.latencies) < self.hedge.min_samples:
+            return None
+        return max(self.hedge.min_delay, self.latencies.percentile(self.hedge.percentile))
+
+    def _call_once(self, fn, hedgeable: bool, hedge_fn, on_discarded):
+        delay = self.hedge_delay() if hedgeable else None
+        if delay is None:
+            return self._timed(fn)
+
+        executor = self._get_executor()
+        primary = self._submit(executor, fn)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count('hedges_fired')
+        _annotate_span(hedged=True)
+        hedge = self._submit(executor, hedge_fn)
+        winner = self._first_success([primary, hedge])
+        if winner is hedge:
+            self._count('hedges_won')
+        # Blocking SDK calls cannot be interrupted once started: the loser is cancelled if still queued, otherwise ignored
+        loser = primary if winner is hedge else hedge
+        if not loser.cancel() and on_discarded is not None and winner.exception() is None:
+            loser.add_done_callback(lambda future: future.exception() is None and on_discarded(future.result()))
+        return winner.result()
+
+    async def _acall_once(self, coro_fn, hedgeable: bool, hedge_fn, on_discarded):
+        delay = self.hedge_delay() if hedgeable else None
+        primary = asyncio.ensure_future(self._atimed(coro_fn))
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count('hedges_fired')
+        _annotate_span(hedged=True)
+        hedge = asyncio.ensure_future(self._atimed(hedge_fn))
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winners = [task for task in done if task.exception() is None]
+            if winners:
+                for loser in pending:
+                    loser.cancel()
+                # Both requests may complete in the same iteration of the event loop
+                for loser in winners[1:]:
+                    if on_discarded is not None:
+                        on_discarded(loser.result())
+                if winners[0] is hedge:
+                    self._count('hedges_won')
+                return winners[0].result()
+            first_error = first_error or next(iter(done)).exception()
+        raise first_error
+
+    @staticmethod
+    def _first_success(futures):
+        """First future to finish successfully, or the first failure when all of them fail."""
+        pending = set(futures)
+        failed = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future
+                failed = failed or future
+        return failed
+
+    def _submit(self, executor: ThreadPoolExecutor, fn):
+        # Each request runs in a copy of the caller's context, so the current span and usage scope follow it
+        return executor.submit(contextvars.copy_context().run, self._timed, fn)
+
+    def _timed(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.latencies.record(time.perf_counter() - start)
+        return result
+
+    async def _atimed(self, coro_fn):
+        start = time.perf_counter()
+        result = await coro_fn()
+        self.latencies.record(time.perf_counter() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='hedge')
+            return self._executor
+
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+
+def _without_sdk_retries(fn: Callable) -> Callable:
+    def call():
+        with without_sdk_retries():
+            return fn()
+
+    return call
+
+
+def _awithout_sdk_retries(coro_fn: Callable) -> Callable:
+    async def call():
+        with without_sdk_retries():
+            return await coro_fn()
+
+    return call
+
+
+def _annotate_span(**attributes):
+    """Record retries and hedges on the span of the provider call, if tracing is on."""
+    span = current_span()
+    if span is not None:
+        span.set_attributes(**attributes)
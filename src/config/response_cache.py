@@ -0,0 +1,203 @@
+"""
+Response cache for provider invocations.
+
+Two tiers: an in-memory LRU with TTL in front of an optional SQLite store
+that survives restarts. Entries are keyed by everything that shapes the
+completion: provider, model, prompts, inference parameters and tool specs.
+"""
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .token_usage import TokenUsage
+from .tool_system import ToolSpec
+from .ttl_cache import TTLCache
+
+
+@dataclass
+class ResponseCacheStats:
+    """Hit/miss counters across both cache tiers."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SQLiteResponseStore:
+    """Persistent second tier backed by a single SQLite file."""
+
+    # Columns added after the first release, created on open in existing files
+    USAGE_COLUMNS = {
+        'cache_read_tokens': 'INTEGER NOT NULL DEFAULT 0',
+        'cache_write_tokens': 'INTEGER NOT NULL DEFAULT 0',
+        'logprobs': 'TEXT',
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'key TEXT PRIMARY KEY, text TEXT NOT NULL, input_tokens INTEGER NOT NULL, '
+                'output_tokens INTEGER NOT NULL, created_at REAL NOT NULL)'
+            )
+            columns = {row[1] for row in self._connection.execute('PRAGMA table_info(responses)')}
+            for column, definition in self.USAGE_COLUMNS.items():
+                if column not in columns:
+                    self._connection.execute(f'ALTER TABLE responses ADD COLUMN {column} {definition}')
+
+    def get(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[Tuple[str, TokenUsage]]:
+        entry = self.get_entry(key, ttl_seconds)
+        return None if entry is None else entry[:2]
+
+    def get_entry(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[Tuple[str, TokenUsage, float]]:
+        """Like get, with the time.time() at which the entry was stored."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT text, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens, logprobs, created_at '
+                'FROM responses WHERE key = ?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        text, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens, logprobs, created_at = row
+        if ttl_seconds is not None and time.time() - created_at >= ttl_seconds:
+            self.delete(key)
+            return None
+        usage = TokenUsage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            logprobs=None if logprobs is None else [tuple(pair) for pair in json.loads(logprobs)],
+        )
+        return text, usage, created_at
+
+    def put(self, key: str, text: str, usage: TokenUsage):
+        logprobs = None if usage.logprobs is None else json.dumps(usage.logprobs)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses '
+                '(key, text, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens, logprobs, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    text,
+                    usage.input_tokens,
+                    usage.output_tokens,
+                    usage.cache_read_tokens,
+                    usage.cache_write_tokens,
+                    logprobs,
+                    time.time(),
+                ),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class ResponseCache:
+    """Tiered cache of (text, TokenUsage) results returned by BaseProvider.invoke."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600, store: Optional[SQLiteResponseStore] = None):
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.stats = ResponseCacheStats()
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_id: str,
+        system_prompt: str,
+        user_prompt: str,
+        inference_params: Dict[str, Any],
+        tools: Optional[List[ToolSpec]] = None,
+    ) -> str:
+        """Build a stable key from everything that shapes the completion."""
+        payload = {
+            'provider': provider,
+            'model_id': model_id,
+            'system_prompt': system_prompt,
+            'user_prompt': user_prompt,
+            'inference_params': inference_params,
+            'tools': [dataclasses.asdict(tool) for tool in tools or []],
+        }
+        serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, TokenUsage]]:
+        """Return the cached result with usage marked as cached, or None on a miss."""
+        result = self._memory.get(key)
+        if result is not None:
+            self._count('memory_hits')
+            return self._as_cached(result)
+
+        if self.store is not None:
+            entry = self.store.get_entry(key, self.ttl_seconds)
+            if entry is not None:
+                text, usage, created_at = entry
+                # The entry expires from memory when it would on disk, not a full TTL after this hit
+                remaining = None if self.ttl_seconds is None else self.ttl_seconds - (time.time() - created_at)
+                self._memory.put(key, (text, usage), ttl_seconds=remaining)
+                self._count('disk_hits')
+                return self._as_cached((text, usage))
+
+        self._count('misses')
+        return None
+
+    def put(self, key: str, result: Tuple[str, TokenUsage]):
+        """Store an invocation result in both tiers."""
+        text, usage = result
+        # A copy with every field, so later changes by the caller do not reach the cache
+        usage = dataclasses.replace(usage)
+        self._memory.put(key, (text, usage))
+        if self.store is not None:
+            self.store.put(key, text, usage)
+        self._count('stores')
+
+    def clear(self):
+        self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+    @staticmethod
+    def _as_cached(result: Tuple[str, TokenUsage]) -> Tuple[str, TokenUsage]:
+        text, usage = result
+        return text, dataclasses.replace(usage, cached=True)
@@ -0,0 +1,311 @@
+"""
+Latency-aware routing across several providers.
+
+RouterProvider implements the BaseProvider interface on top of a set of
+backend providers. It tracks per-backend EWMA latency, recent error rate and
+token usage, and sends each call to the best healthy backend according to the
+routing policy, failing over to the next one when a call errors.
+
+The backends are full providers: they cache, rate-limit, meter and trace their
+own calls. The router therefore overrides invoke, ainvoke and invoke_stream
+and only records an 'llm.route' span, so a routed request is counted once.
+"""
+
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from .base_provider import BaseProvider
+from .inference_params import InferenceParams
+from .token_usage import TokenUsage
+from .tool_adapters import NoOpToolAdapter
+from .tool_system import ToolAdapter, ToolHandler
+from .tracing import tracer
+
+
+@dataclass
+class BackendStats:
+    """Running health and usage figures for one backend."""
+
+    ewma_latency: Optional[float] = None
+    calls: int = 0
+    errors: int = 0
+    outstanding: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    last_error_at: Optional[float] = None
+    recent_errors: deque = field(default_factory=lambda: deque(maxlen=20))
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failed calls among the most recent ones."""
+        return sum(self.recent_errors) / len(self.recent_errors) if self.recent_errors else 0.0
+
+
+class RouterProvider(BaseProvider):
+    """
+    Provider that routes every call to one of several backends.
+
+    Policies:
+    - 'fastest': lowest EWMA latency; backends without measurements are tried first.
+    - 'weighted': random choice proportional to the configured weights.
+    - 'least_outstanding': fewest calls in flight, ties broken by latency.
+
+    A backend whose recent error rate exceeds max_error_rate is skipped until
+    cooldown seconds have passed since its last error. Calls carrying tools
+    only go to backends that support them, and calls with provider-specific
+    arguments such as messages= only to backends whose _invoke accepts them.
+    """
+
+    POLICIES = ('fastest', 'weighted', 'least_outstanding')
+
+    def __init__(
+        self,
+        backends: Dict[str, BaseProvider],
+        policy: str = 'fastest',
+        weights: Dict[str, float] = None,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        explore_rate: float = 0.05,
+        debug: bool = False,
+        tools=None,
+    ):
+        if not backends:
+            raise ValueError('RouterProvider needs at least one backend')
+        if policy not in self.POLICIES:
+            raise ValueError(f'Unknown routing policy: {policy}. Expected one of {self.POLICIES}')
+
+        self.backends = dict(backends)
+        self.policy = policy
+        self.weights = weights or {}
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.explore_rate = explore_rate
+        self.stats = {name: BackendStats() for name in self.backends}
+        self._lock = threading.Lock()
+        super().__init__('Router', 'router:' + ','.join(self.backends), debug, tools)
+
+    @property
+    def tools(self):
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools):
+        # Bots configure tools on their llm: hand them to every backend able to use them
+        previous = getattr(self, '_tools', [])
+        self._tools = tools or []
+        if not self._tools and not previous:
+            return
+        for backend in self.backends.values():
+            if backend.supports_tools():
+                backend.tools = self._tools
+
+    def invoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Invoke the best backend. Caching, budgets, usage and tool loops are handled by the backend."""
+        with tracer.span('llm.route', provider=self.name, policy=self.policy):
+            return self._invoke(system_prompt, user_prompt, tool_handler, inference_params, **kwargs)
+
+    async def ainvoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Async counterpart of invoke."""
+        with tracer.span('llm.route', provider=self.name, policy=self.policy):
+            return await self._ainvoke(system_prompt, user_prompt, tool_handler, inference_params, **kwargs)
+
+    def invoke_stream(self, system_prompt: str, user_prompt: str, inference_params: Optional[InferenceParams] = None):
+        """Stream from the best backend, which traces and meters the stream itself."""
+        return self._stream(system_prompt, user_prompt, inference_params)
+
+    def _create_tool_adapter(self) -> ToolAdapter:
+        """Adapter of the first tool-capable backend, so bots can detect tool support."""
+        for backend in self.backends.values():
+            if backend.supports_tools():
+                return backend.tool_adapter
+        return NoOpToolAdapter()
+
+    def _invoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Invoke the best backend, failing over to the next candidates on errors."""
+        repeatable = self._is_repeatable(tool_handler, kwargs)
+        candidates = self.rank_backends(requires_tools=self._requires_tools(tool_handler), required_args=kwargs)
+        for position, name in enumerate(candidates):
+            try:
+                return self._tracked(
+                    name, lambda backend: backend.invoke(system_prompt, user_prompt, tool_handler, inference_params, **kwargs)
+                )
+            except Exception as e:
+                if not repeatable or position == len(candidates) - 1:
+                    raise
+                self.logger.warning('Backend %s failed (%s), failing over to %s', name, e, candidates[position + 1])
+
+    async def _ainvoke(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        tool_handler: Optional[ToolHandler] = None,
+        inference_params: Optional[InferenceParams] = None,
+        **kwargs,
+    ):
+        """Async counterpart of _invoke."""
+        repeatable = self._is_repeatable(tool_handler, kwargs)
+        candidates = self.rank_backends(requires_tools=self._requires_tools(tool_handler), required_args=kwargs)
+        for position, name in enumerate(candidates):
+            try:
+                return await self._atracked(
+                    name, lambda backend: backend.ainvoke(system_prompt, user_prompt, tool_handler, inference_params, **kwargs)
+                )
+            except Exception as e:
+                if not repeatable or position == len(candidates) - 1:
+                    raise
+                self.logger.warning('Backend %s failed (%s), failing over to %s', name, e, candidates[position + 1])
+
+    def _stream(self, system_prompt: str, user_prompt: str, inference_params: Optional[InferenceParams] = None):
+        """Stream from the best backend. Streams are not failed over once started."""
+        name = self.rank_backends()[0]
+        self._begin(name)
+        start = time.perf_counter()
+        usage = None
+        try:
+            for chunk in self.backends[name].invoke_stream(system_prompt, user_prompt, inference_params):
+                if isinstance(chunk, TokenUsage):
+                    usage = chunk
+                yield chunk
+        except Exception:
+            self._finish(name, time.perf_counter() - start, None, failed=True)
+            raise
+        self._finish(name, time.perf_counter() - start, usage)
+
+    def rank_backends(self, requires_tools: bool = False, required_args: Iterable[str] = ()) -> List[str]:
+        """Backend names in the order they should be tried for the next call."""
+        required_args = sorted(required_args)
+        with self._lock:
+            names = [name for name, backend in self.backends.items() if not requires_tools or backend.supports_tools()]
+            if not names:
+                raise ValueError('No backend supports tools')
+            if required_args:
+                names = [name for name in names if self._accepts(self.backends[name], required_args)]
+                if not names:
+                    raise ValueError(f'No backend accepts the arguments {", ".join(required_args)}')
+
+            healthy = [name for name in names if self._is_healthy(name)]
+            unhealthy = [name for name in names if name not in healthy]
+            # When every backend is failing, still try them rather than refusing the call
+            return self._order(healthy or unhealthy) + (unhealthy if healthy else [])
+
+    def _order(self, names: List[str]) -> List[str]:
+        if self.policy == 'weighted':
+            # Backends weighted 0 only serve as fallbacks
+            remaining = [name for name in names if self.weights.get(name, 1.0) > 0]
+            fallbacks = [name for name in names if name not in remaining]
+            ordered = []
+            while remaining:
+                choice = random.choices(remaining, weights=[self.weights.get(name, 1.0) for name in remaining])[0]
+                ordered.append(choice)
+                remaining.remove(choice)
+            return ordered + fallbacks
+
+        if self.policy == 'least_outstanding':
+            return sorted(names, key=lambda name: (self.stats[name].outstanding, self._latency_rank(name)))
+
+        ordered = sorted(names, key=self._latency_rank)
+        # Occasionally try another backend so a single slow call does not exclude it forever
+        if len(ordered) > 1 and random.random() < self.explore_rate:
+            ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+        return ordered
+
+    def _latency_rank(self, name: str) -> float:
+        latency = self.stats[name].ewma_latency
+        return -1.0 if latency is None else latency
+
+    def _is_healthy(self, name: str) -> bool:
+        stats = self.stats[name]
+        if stats.error_rate <= self.max_error_rate:
+            return True
+        return stats.last_error_at is not None and time.monotonic() - stats.last_error_at > self.cooldown
+
+    def _requires_tools(self, tool_handler: Optional[ToolHandler]) -> bool:
+        return tool_handler is not None and bool(self.tools)
+
+    @staticmethod
+    def _accepts(backend: BaseProvider, args: List[str]) -> bool:
+        parameters = inspect.signature(backend._invoke).parameters
+        if any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters.values()):
+            return True
+        return all(arg in parameters for arg in args)
+
+    def _tracked(self, name: str, call):
+        self._begin(name)
+        start = time.perf_counter()
+        try:
+            result = call(self.backends[name])
+        except Exception:
+            self._finish(name, time.perf_counter() - start, None, failed=True)
+            raise
+        self._finish(name, time.perf_counter() - start, self._usage_of(result))
+        return result
+
+    async def _atracked(self, name: str, call):
+        self._begin(name)
+        start = time.perf_counter()
+        try:
+            result = await call(self.backends[name])
+        except Exception:
+            self._finish(name, time.perf_counter() - start, None, failed=True)
+            raise
+        self._finish(name, time.perf_counter() - start, self._usage_of(result))
+        return result
+
+    def _begin(self, name: str):
+        with self._lock:
+            self.stats[name].outstanding += 1
+
+    def _finish(self, name: str, latency: float, usage: Optional[TokenUsage], failed: bool = False):
+        with self._lock:
+            stats = self.stats[name]
+            stats.outstanding -= 1
+            stats.calls += 1
+            stats.recent_errors.append(failed)
+            if failed:
+                stats.errors += 1
+                stats.last_error_at = time.monotonic()
+                return
+            if usage is not None and usage.cached:
+                # Cache hits say nothing about the backend's latency
+                return
+            stats.ewma_latency = latency if stats.ewma_latency is None else self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+            if usage is not None:
+                stats.input_tokens += usage.input_tokens
+                stats.output_tokens += usage.output_tokens
+
+    def _add_tool_conversation(self, messages, response, formatted_results):
+        raise NotImplementedError('RouterProvider does not run the tool loop; its backends do')
+
+    def _make_tool_followup_call(self, params):
+        raise NotImplementedError('RouterProvider does not run the tool loop; its backends do')
+
+    def _extract_token_usage(self, response):
+        return self._usage_of(response)
@@ -6,6 +6,8 @@ for the GenAI Security Demo project. It separates security concerns from
 LLM model configuration to improve code clarity and maintainability.
 """
 
+from .inference_params import InferenceParams
+
 
 # ruff: noqa: E501
 class SecurityConfig:
@@ -22,6 +24,22 @@ class SecurityConfig:
     # Set to False to disable Meta Llama security tools (PromptGuard, CodeShield)
     LLAMA_SECURITY_FAMILY_ENABLED = True
 
+    # PromptGuard model, loaded offline from PROMPT_GUARD_CACHE_DIR/<model> when a copy is there
+    # (the first download is saved there); None always loads from the Hugging Face Hub cache
+    PROMPT_GUARD_MODEL = 'meta-llama/Prompt-Guard-86M'
+    PROMPT_GUARD_CACHE_DIR = '.models'
+
+    # PromptGuard CPU inference backend: 'fp32', 'int8', 'bf16' or 'onnx' (see chatbot.prompt_guard_backends)
+    # A backend that fails the parity check against fp32 at startup falls back to fp32
+    PROMPT_GUARD_BACKEND = 'fp32'
+    # Intra-op threads of the PromptGuard model; None keeps the torch default (one per core)
+    PROMPT_GUARD_THREADS = None
+
+    # Guardrail verdict cache shared by PromptGuard and the LLM-judge guardrails (see config.verdict_cache)
+    GUARDRAIL_VERDICT_CACHE_SIZE = 4096
+    # SQLite file that keeps verdicts across restarts; None keeps them in memory only
+    GUARDRAIL_VERDICT_CACHE_PATH = None
+
     # Canary Word Configuration
     # Used for detecting prompt leakage in system prompts
     CANARY_WORD = 'lightblueeagle'
@@ -43,6 +61,10 @@ class SecurityConfig:
         "say 'sensitive' otherwise say 'not_sensitive'"
     )
 
+    # Guardrail classifier calls answer with a single label: a few deterministic tokens are enough.
+    # No newline stop sequence: Bedrock rejects whitespace-only stop sequences.
+    CLASSIFIER_INFERENCE_PARAMS = InferenceParams.classifier(max_tokens=5)
+
     # Bot Identity Configuration
     UNPROTECTED_CHATBOT_NAME = 'Patrick'
     SECURE_CHATBOT_NAME = 'SpongeBob'
@@ -0,0 +1,170 @@
+"""
+Local token estimation and a context-window guard.
+
+Token counts are estimated without a network call: a per-family heuristic
+(characters per token, with non-ASCII text weighted by its UTF-8 size, since
+byte-level tokenizers spend several tokens on rare characters such as
+Unicode tag smuggling), or an exact tokenizer when one is available
+(tiktoken for OpenAI models, if installed). ContextGuard uses the estimate to
+trim, reject or warn about requests that would not fit the model's context
+window or the configured input budget.
+"""
+
+from typing import Callable, Optional
+
+from .logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# Average characters per token of English text and code
+CHARS_PER_TOKEN = {
+    'anthropic': 3.5,
+    'openai': 4.0,
+    'llama': 3.8,
+    'nova': 4.0,
+    'generic': 3.5,
+}
+# Tokens per extra UTF-8 byte of non-ASCII characters (a 4-byte character costs about 3 tokens)
+TOKENS_PER_EXTRA_BYTE = 0.8
+
+TRIM = 'trim'
+REJECT = 'reject'
+WARN = 'warn'
+POLICIES = (TRIM, REJECT, WARN)
+TRIM_MARKER = '\n[... {tokens} tokens trimmed to fit the context window ...]\n'
+
+
+class ContextWindowExceededError(ValueError):
+    """The request does not fit the model context window or the input token budget; it was not sent."""
+
+
+def model_family(model_id: str) -> str:
+    model_id = model_id.lower()
+    if 'claude' in model_id or model_id.startswith('anthropic.'):
+        return 'anthropic'
+    if model_id.startswith(('gpt-', 'o1', 'o3', 'o4')):
+        return 'openai'
+    if 'llama' in model_id:
+        return 'llama'
+    if 'nova' in model_id:
+        return 'nova'
+    return 'generic'
+
+
+def _tiktoken_counter(model_id: str) -> Optional[Callable[[str], int]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        encoding = tiktoken.get_encoding('o200k_base')
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+class TokenEstimator:
+    """Counts tokens of a model family: exactly with `tokenizer` when given, otherwise with the heuristic."""
+
+    def __init__(self, family: str = 'generic', tokenizer: Optional[Callable[[str], int]] = None):
+        self.family = family if family in CHARS_PER_TOKEN else 'generic'
+        self.tokenizer = tokenizer
+
+    @classmethod
+    def for_model(cls, model_id: str, exact: bool = True) -> 'TokenEstimator':
+        family = model_family(model_id)
+        tokenizer = _tiktoken_counter(model_id) if exact and family == 'openai' else None
+        return cls(family, tokenizer)
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def count(self, text: Optional[str]) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return self.tokenizer(text)
+        extra_bytes = len(text.encode('utf-8', errors='replace')) - len(text)
+        return int(len(text) / CHARS_PER_TOKEN[self.family] + extra_bytes * TOKENS_PER_EXTRA_BYTE) + 1
+
+    def trim(self, text: str, max_tokens: int) -> str:
+        """
+        Shorten text to about max_tokens, keeping its beginning and end (where instructions
+        and the latest log lines usually are) around a marker that says how much was cut.
+        """
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        marker_tokens = self.count(TRIM_MARKER.format(tokens=total))
+        keep_tokens = max(0, max_tokens - marker_tokens)
+        keep_chars = int(len(text) * keep_tokens / total)
+        # The estimate is proportional only on average; shrink until the result fits
+        while True:
+            tail_chars = keep_chars // 2
+            tail = text[-tail_chars:] if tail_chars else ''
+            trimmed = text[: keep_chars - tail_chars] + TRIM_MARKER.format(tokens=total - keep_tokens) + tail
+            if keep_chars == 0 or self.count(trimmed) <= max_tokens:
+                return trimmed
+            keep_chars = int(keep_chars * 0.9)
+
+
+class ContextGuard:
+    """
+    Pre-flight size check of a request.
+
+    The input may use the context window minus the tokens reserved for the
+    completion, and at most max_input_tokens when a budget is configured.
+    Oversized user prompts and tool results are trimmed, rejected with
+    ContextWindowExceededError, or only logged, depending on the policy.
+    Trimming rewrites what the model sees, so it is opt-in: the trim policy,
+    or a per-tool limit passed to check_tool_result.
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator,
+        context_window: int,
+        policy: str = WARN,
+        max_input_tokens: Optional[int] = None,
+        max_tool_result_tokens: Optional[int] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown policy: {policy}. Expected one of {POLICIES}')
+        self.estimator = estimator
+        self.context_window = context_window
+        self.policy = policy
+        self.max_input_tokens = max_input_tokens
+        self.max_tool_result_tokens = max_tool_result_tokens
+
+    def input_limit(self, max_output_tokens: int) -> int:
+        limit = self.context_window - max_output_tokens
+        return min(limit, self.max_input_tokens) if self.max_input_tokens is not None else limit
+
+    def check(self, system_prompt: str, user_prompt: str, max_output_tokens: int) -> str:
+        """Return the user prompt to send: unchanged, or trimmed so system and user prompt fit the input limit."""
+        limit = self.input_limit(max_output_tokens)
+        system_tokens = self.estimator.count(system_prompt)
+        user_tokens = self.estimator.count(user_prompt)
+        if system_tokens + user_tokens <= limit:
+            return user_prompt
+
+        message = f'Request of ~{system_tokens + user_tokens} input tokens exceeds the limit of {limit} tokens'
+        if self.policy == REJECT or (self.policy == TRIM and system_tokens >= limit):
+            raise ContextWindowExceededError(message)
+        if self.policy == WARN:
+            logger.warning('%s; sending it anyway', message)
+            return user_prompt
+        logger.warning('%s; trimming the user prompt', message)
+        return self.estimator.trim(user_prompt, limit - system_tokens)
+
+    def check_tool_result(self, content: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Tool output to add to the conversation: trimmed to max_tokens, the limit the tool
+        was registered with, or else to max_tool_result_tokens under the trim policy.
+        """
+        if max_tokens is None and self.policy == TRIM:
+            max_tokens = self.max_tool_result_tokens
+        if max_tokens is None:
+            return content
+        return self.estimator.trim(content, max_tokens)
@@ -1,16 +1,38 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .tool_loop import ToolLoopSummary
 
 
 @dataclass
 class TokenUsage:
     input_tokens: int
     output_tokens: int
+    time_to_first_token: Optional[float] = None
+    cached: bool = False
+    # Provider-side prompt cache: tokens read from / written to the cache, reported next to input_tokens
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    # (token, logprob) pairs, when InferenceParams.logprobs was requested and the provider returns them
+    logprobs: Optional[List[Tuple[str, float]]] = None
+    # Rounds and stop reason of the tool loop, when the call executed tools
+    tool_loop: Optional['ToolLoopSummary'] = None
 
     @property
     def total_tokens(self) -> int:
         return self.input_tokens + self.output_tokens
 
+    def __add__(self, other: 'TokenUsage') -> 'TokenUsage':
+        """Token counts of two calls added up (e.g. the rounds of a tool loop)."""
+        return TokenUsage(
+            input_tokens=self.input_tokens + other.input_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            time_to_first_token=self.time_to_first_token,
+            cache_read_tokens=self.cache_read_tokens + other.cache_read_tokens,
+            cache_write_tokens=self.cache_write_tokens + other.cache_write_tokens,
+        )
+
     @classmethod
     def empty(cls) -> 'TokenUsage':
         return cls(input_tokens=0, output_tokens=0)
@@ -20,4 +42,7 @@ def format_token_usage(usage: Optional[TokenUsage]) -> str:
     if usage is None:
         return 'Tokens: unavailable'
 
-    return f'Tokens: {usage.input_tokens} + {usage.output_tokens} = {usage.total_tokens}'
+    formatted = f'Tokens: {usage.input_tokens} + {usage.output_tokens} = {usage.total_tokens}'
+    if usage.cache_read_tokens or usage.cache_write_tokens:
+        formatted += f' [prompt cache: {usage.cache_read_tokens} read, {usage.cache_write_tokens} written]'
+    return f'{formatted} (cached)' if usage.cached else formatted
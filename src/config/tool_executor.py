@@ -0,0 +1,103 @@
+"""
+Concurrent execution of the tool calls requested in one model turn.
+
+Tool calls of the same turn are independent, so they run on a bounded thread
+pool and the turn takes as long as the slowest call instead of the sum of
+all of them. Results are returned in request order, as providers expect.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from .logger_config import setup_logger
+from .tool_system import ToolHandler, ToolResult
+
+logger = setup_logger(__name__)
+
+
+class ToolExecutor:
+    """
+    Runs tool calls concurrently with per-tool timeouts.
+
+    A tool that exceeds its timeout is reported as a failed ToolResult. Python
+    threads cannot be interrupted: a call that has not started yet is
+    cancelled, one that is already running finishes in the background and its
+    result is discarded.
+
+    Tools without a timeout (per tool, or default_timeout) are not bounded, so a
+    single such call runs inline in the calling thread.
+    """
+
+    def __init__(self, max_workers: int = 8, default_timeout: Optional[float] = None):
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def execute(self, tool_handler: ToolHandler, tool_calls: List[Dict[str, Any]]) -> List[ToolResult]:
+        """Execute tool calls ({tool_use_id, tool_name, tool_input}) and return their results in the same order."""
+        if len(tool_calls) == 1 and self._timeout_for(tool_handler, tool_calls[0]['tool_name']) is None:
+            # Nothing to overlap and no timeout to enforce: skip the thread hand-off
+            return [self._run(tool_handler, tool_calls[0])]
+
+        executor = self._get_executor()
+        submitted_at = time.perf_counter()
+        # Each call runs in a copy of the caller's context, so its tool span nests under the current span
+        futures = [executor.submit(contextvars.copy_context().run, self._run, tool_handler, tool_call) for tool_call in tool_calls]
+
+        results = []
+        for tool_call, future in zip(tool_calls, futures):
+            timeout = self._timeout_for(tool_handler, tool_call['tool_name'])
+            # Timeouts count from submission, so waiting on earlier results does not extend later ones
+            remaining = None if timeout is None else max(0.0, submitted_at + timeout - time.perf_counter())
+            try:
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                future.cancel()
+                logger.warning('Tool %s timed out after %.1fs', tool_call['tool_name'], timeout)
+                error = f'Tool {tool_call["tool_name"]} timed out after {timeout:.1f}s'
+                results.append(
+                    ToolResult(
+                        tool_use_id=tool_call['tool_use_id'], content=f'Error: {error}', success=False, error=error, execution_time=timeout
+                    )
+                )
+        return results
+
+    def _timeout_for(self, tool_handler: ToolHandler, tool_name: str) -> Optional[float]:
+        timeout = tool_handler.timeout_for(tool_name)
+        return timeout if timeout is not None else self.default_timeout
+
+    @staticmethod
+    def _run(tool_handler: ToolHandler, tool_call: Dict[str, Any]) -> ToolResult:
+        start = time.perf_counter()
+        try:
+            result_content = tool_handler.execute_tool(tool_call['tool_name'], tool_call['tool_input'])
+            return ToolResult(
+                tool_use_id=tool_call['tool_use_id'], content=str(result_content), success=True, execution_time=time.perf_counter() - start
+            )
+        except Exception as e:
+            return ToolResult(
+                tool_use_id=tool_call['tool_use_id'],
+                content=f'Error: {str(e)}',
+                success=False,
+                error=str(e),
+                execution_time=time.perf_counter() - start,
+            )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tool')
+            return self._executor
+
+
+_default_executor = ToolExecutor()
+
+
+def get_default_tool_executor() -> ToolExecutor:
+    """Executor shared by every provider unless one is configured explicitly."""
+    return _default_executor
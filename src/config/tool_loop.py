@@ -0,0 +1,77 @@
+"""
+Budgets and bookkeeping for the multi-round tool loop.
+
+After a tool turn the model may request more tools. BaseProvider keeps
+executing tools and following up until the model answers without tool calls,
+or until one of the ToolLoopLimits is reached. ToolLoop adds up the token
+usage of every round and records per-round latency.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .token_usage import TokenUsage
+
+COMPLETED = 'completed'
+MAX_ROUNDS = 'max_rounds'
+TOKEN_BUDGET = 'token_budget'
+DEADLINE = 'deadline'
+
+
+@dataclass
+class ToolLoopLimits:
+    """Upper bounds for one tool loop. None disables the token or time budget."""
+
+    max_rounds: int = 5
+    max_total_tokens: Optional[int] = 50000
+    deadline_seconds: Optional[float] = 120.0
+
+
+@dataclass
+class ToolRound:
+    """One round: the tools executed and the follow-up call made with their results."""
+
+    index: int
+    tool_calls: int
+    tool_time: float
+    latency: float
+    usage: TokenUsage
+
+
+@dataclass
+class ToolLoopSummary:
+    rounds: List[ToolRound] = field(default_factory=list)
+    stop_reason: str = COMPLETED
+    elapsed: float = 0.0
+
+
+class ToolLoop:
+    """Tracks the rounds, cumulative usage and budgets of one tool loop."""
+
+    def __init__(self, limits: ToolLoopLimits, initial_usage: TokenUsage, clock=time.perf_counter):
+        self.limits = limits
+        self.usage = initial_usage
+        self.rounds: List[ToolRound] = []
+        self._clock = clock
+        self._started_at = clock()
+
+    def limit_reached(self) -> Optional[str]:
+        """Name of the limit that forbids another round, or None."""
+        if len(self.rounds) >= self.limits.max_rounds:
+            return MAX_ROUNDS
+        if self.limits.max_total_tokens is not None and self.usage.total_tokens >= self.limits.max_total_tokens:
+            return TOKEN_BUDGET
+        if self.limits.deadline_seconds is not None and self._clock() - self._started_at >= self.limits.deadline_seconds:
+            return DEADLINE
+        return None
+
+    def record_round(self, tool_calls: int, tool_time: float, latency: float, usage: TokenUsage):
+        self.rounds.append(ToolRound(len(self.rounds) + 1, tool_calls, tool_time, latency, usage))
+        self.usage = self.usage + usage
+
+    def finish(self, stop_reason: str) -> TokenUsage:
+        """Cumulative usage of all rounds, with the loop summary attached when tools were used."""
+        if self.rounds or stop_reason != COMPLETED:
+            self.usage.tool_loop = ToolLoopSummary(self.rounds, stop_reason, self._clock() - self._started_at)
+        return self.usage
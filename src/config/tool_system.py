@@ -1,7 +1,12 @@
+import json
+import os
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, Hashable, Iterable, List, Any, Callable, Optional
 from dataclasses import dataclass
 
+from .tracing import tracer
+from .ttl_cache import CacheStats, TTLCache
+
 
 @dataclass
 class ToolSpec:
@@ -25,6 +30,43 @@ class ToolResult:
     content: str
     success: bool = True
     error: Optional[str] = None
+    execution_time: Optional[float] = None
+
+
+class _ToolCache:
+    """Memoized results of one tool."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int, key: Optional[Callable], files: Optional[Callable]):
+        self.results = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._key = key or _canonical_input
+        self._files = files
+
+    def key_for(self, tool_input: Dict[str, Any]) -> Optional[Hashable]:
+        """Cache key of a call, or None when it must not be memoized."""
+        key = self._key(tool_input)
+        if self._files is None:
+            return key
+        # A modified file changes the key, so stale results are never served and age out of the LRU
+        modification_times = tuple(_modification_time(path) for path in self._files(tool_input))
+        # A path that is not a file (e.g. a shell expression passed as filename) gives no signal of change
+        if None in modification_times:
+            return None
+        return key, modification_times
+
+
+def _canonical_input(tool_input: Dict[str, Any]) -> str:
+    """Same key for inputs that only differ in key order or whitespace."""
+    return json.dumps(tool_input, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _modification_time(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+_NOT_CACHED = object()
 
 
 class ToolHandler:
@@ -32,17 +74,83 @@ class ToolHandler:
 
     def __init__(self):
         self._tools: Dict[str, Callable] = {}
-
-    def register_tool(self, name: str, handler: Callable):
-        """Register a tool handler function."""
+        self._timeouts: Dict[str, float] = {}
+        self._caches: Dict[str, _ToolCache] = {}
+        self._max_result_tokens: Dict[str, int] = {}
+
+    def register_tool(
+        self,
+        name: str,
+        handler: Callable,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        cache_key: Optional[Callable[[Dict[str, Any]], Hashable]] = None,
+        cache_files: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None,
+        cache_max_entries: int = 256,
+        max_result_tokens: Optional[int] = None,
+    ):
+        """
+        Register a tool handler function, optionally with its own execution timeout in seconds.
+
+        max_result_tokens trims the tool output to about that many tokens before it is
+        sent to the model, whatever the context policy of the provider.
+
+        Setting cache_ttl memoizes successful results for that many seconds in a
+        bounded LRU. Entries are keyed on the canonicalized tool_input, or on
+        cache_key(tool_input) when given. For file-backed tools, cache_files(tool_input)
+        returns the paths whose modification time invalidates a cached result; calls
+        naming a path that does not exist are not memoized.
+        """
         self._tools[name] = handler
+        if timeout is not None:
+            self._timeouts[name] = timeout
+        self._max_result_tokens.pop(name, None)
+        if max_result_tokens is not None:
+            self._max_result_tokens[name] = max_result_tokens
+        self._caches.pop(name, None)
+        if cache_ttl is not None:
+            self._caches[name] = _ToolCache(cache_ttl, cache_max_entries, cache_key, cache_files)
+
+    def timeout_for(self, tool_name: str) -> Optional[float]:
+        """Execution timeout of a tool, or None to use the executor default."""
+        return self._timeouts.get(tool_name)
+
+    def max_result_tokens_for(self, tool_name: str) -> Optional[int]:
+        """Token limit of the tool output sent to the model, or None to follow the context policy."""
+        return self._max_result_tokens.get(tool_name)
 
     def execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Any:
-        """Execute a tool by name with given input."""
+        """Execute a tool by name with given input, serving memoized results when the tool is cached."""
         if tool_name not in self._tools:
             raise ValueError(f'Unknown tool: {tool_name}')
 
-        return self._tools[tool_name](tool_input)
+        with tracer.span('tool.execute', tool=tool_name) as span:
+            cache = self._caches.get(tool_name)
+            if cache is None:
+                return self._tools[tool_name](tool_input)
+
+            key = cache.key_for(tool_input)
+            if key is None:
+                span.set_attribute('cache_hit', False)
+                return self._tools[tool_name](tool_input)
+            result = cache.results.get(key, _NOT_CACHED)
+            span.set_attribute('cache_hit', result is not _NOT_CACHED)
+            if result is _NOT_CACHED:
+                # Errors propagate and are never cached
+                result = self._tools[tool_name](tool_input)
+                cache.results.put(key, result)
+            return result
+
+    def cache_stats(self, tool_name: str) -> Optional[CacheStats]:
+        """Hit/miss counters of a memoized tool, or None if the tool is not cached."""
+        cache = self._caches.get(tool_name)
+        return cache.results.stats if cache else None
+
+    def clear_cache(self, tool_name: Optional[str] = None):
+        """Forget memoized results of one tool, or of all tools."""
+        for name, cache in self._caches.items():
+            if tool_name is None or name == tool_name:
+                cache.results.clear()
 
     def has_tool(self, tool_name: str) -> bool:
         """Check if a tool is registered."""
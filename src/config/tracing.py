@@ -0,0 +1,197 @@
+"""
+Lightweight span-based tracing.
+
+Spans nest through a context variable, so a provider call made inside a bot
+span becomes its child, also across asyncio tasks and asyncio.to_thread.
+Finished spans are handed to the configured exporters; with no exporter
+configured, tracing is a no-op.
+
+    with tracer.span('guardrail.prompt_guard', bot='InputGuardrailsBot') as span:
+        span.set_attribute('blocked', True)
+
+Setting the TRACE_FILE environment variable appends every span to that file
+as one JSON object per line.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+OK = 'ok'
+ERROR = 'error'
+
+
+@dataclass
+class Span:
+    """A timed operation with attributes, linked to its parent by span id."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0
+    duration: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = OK
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = ERROR
+        self.error = f'{type(error).__name__}: {error}'
+
+
+class _NoopSpan(Span):
+    """Returned while tracing is disabled; attributes are dropped."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan(name='', trace_id='', span_id='')
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span):
+        """Receive a finished span."""
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list, for tests."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def find(self, name: str) -> List[Span]:
+        return [span for span in self.spans if span.name == name]
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JSONLSpanExporter(SpanExporter):
+    """Appends each finished span to a file as one JSON line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(asdict(span), default=str)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as trace_file:
+            trace_file.write(line + '\n')
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    def __init__(self, exporters: Optional[List[SpanExporter]] = None):
+        self.exporters: List[SpanExporter] = list(exporters or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def add_exporter(self, exporter: SpanExporter):
+        self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter: SpanExporter):
+        self.exporters.remove(exporter)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Run the block in a new child of the current span. Exceptions mark the span as failed and propagate."""
+        span = self.start_span(name, **attributes)
+        if span is _NOOP_SPAN:
+            yield span
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """
+        Start a child of the current span without making it current.
+
+        For operations that do not fit a with-block, such as a generator that is
+        consumed elsewhere; end it with end_span.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+        # Durations use the monotonic clock; start_time is only for display
+        span._started = time.perf_counter()
+        return span
+
+    @contextmanager
+    def use_span(self, span: Span) -> Iterator[Span]:
+        """Make a span started with start_span current for the block, e.g. for one step of a generator."""
+        if span is _NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def end_span(self, span: Span):
+        if span is _NOOP_SPAN:
+            return
+        span.duration = time.perf_counter() - span._started
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _create_tracer() -> Tracer:
+    path = os.environ.get('TRACE_FILE')
+    return Tracer([JSONLSpanExporter(path)] if path else [])
+
+
+tracer = _create_tracer()
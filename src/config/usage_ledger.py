@@ -0,0 +1,216 @@
+"""
+Process-wide ledger of token usage and cost.
+
+Every provider call is appended as one row to column arrays (array module),
+about 30 bytes per call, so millions of calls fit in a few tens of MB. Rows
+are attributed to provider, model, bot and session; the bot and session come
+from the enclosing usage_scope. The ledger answers per-group totals,
+latency/token percentiles and cost from a per-model price table, and
+enforces optional global and per-session spend caps before a call is made.
+"""
+
+import contextvars
+import math
+import threading
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .logger_config import setup_logger
+from .token_usage import TokenUsage
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens."""
+
+    input: float
+    output: float
+    cache_read: Optional[float] = None
+    cache_write: Optional[float] = None
+
+    def cost(self, usage: TokenUsage) -> float:
+        # Providers report input_tokens without the cache reads and writes, so each token is billed once
+        cache_read = self.input if self.cache_read is None else self.cache_read
+        cache_write = self.input if self.cache_write is None else self.cache_write
+        return (
+            usage.input_tokens * self.input
+            + usage.output_tokens * self.output
+            + usage.cache_read_tokens * cache_read
+            + usage.cache_write_tokens * cache_write
+        ) / 1_000_000
+
+
+# On-demand list prices of the models configured in LLMConfig
+PRICES = {
+    'anthropic.claude-3-haiku-20240307-v1:0': ModelPrice(input=0.25, output=1.25),
+    'claude-3-haiku-20240307': ModelPrice(input=0.25, output=1.25, cache_read=0.03, cache_write=0.30),
+    'eu.amazon.nova-lite-v1:0': ModelPrice(input=0.06, output=0.24, cache_read=0.015),
+    'gpt-4o-mini': ModelPrice(input=0.15, output=0.60, cache_read=0.075),
+    'llama-3.3-70b-versatile': ModelPrice(input=0.59, output=0.79),
+}
+
+DIMENSIONS = ('provider', 'model', 'bot', 'session')
+FIELDS = ('input_tokens', 'output_tokens', 'total_tokens', 'latency', 'cost')
+
+
+class BudgetExceededError(RuntimeError):
+    """A global or per-session spend cap was reached; the call was not made."""
+
+
+@dataclass
+class UsageSummary:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+_scope: contextvars.ContextVar[Tuple[Optional[str], Optional[str]]] = contextvars.ContextVar('usage_scope', default=(None, None))
+
+
+@contextmanager
+def usage_scope(bot: Optional[str] = None, session: Optional[str] = None):
+    """Attribute provider calls made inside the block to a bot and/or session. Unset values are inherited."""
+    current_bot, current_session = _scope.get()
+    token = _scope.set((bot or current_bot, session or current_session))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+class UsageLedger:
+    def __init__(
+        self, prices: Optional[Dict[str, ModelPrice]] = None, global_limit: Optional[float] = None, session_limit: Optional[float] = None
+    ):
+        self.prices = dict(PRICES if prices is None else prices)
+        self.global_limit = global_limit
+        self.session_limit = session_limit
+        self._lock = threading.Lock()
+        # Interned (provider, model, bot, session) tuples, referenced by index from each row
+        self._keys: List[Tuple[Optional[str], ...]] = []
+        self._key_index: Dict[Tuple[Optional[str], ...], int] = {}
+        self._rows_key = array('I')
+        self._input_tokens = array('I')
+        self._output_tokens = array('I')
+        self._cache_read_tokens = array('I')
+        self._latency = array('f')
+        self._cost = array('d')
+        self._total_spend = 0.0
+        self._session_spend: Dict[Optional[str], float] = {}
+        self._unpriced_models = set()
+
+    def __len__(self) -> int:
+        return len(self._rows_key)
+
+    def record(self, usage: TokenUsage, provider: str, model: str, latency: Optional[float] = None) -> float:
+        """Add one call, attributed to the current usage_scope. Returns its cost; responses served from a cache are free."""
+        bot, session = _scope.get()
+        cost = 0.0 if usage.cached else self.cost(model, usage)
+        key = (provider, model, bot, session)
+        with self._lock:
+            index = self._key_index.get(key)
+            if index is None:
+                index = self._key_index[key] = len(self._keys)
+                self._keys.append(key)
+            self._rows_key.append(index)
+            self._input_tokens.append(usage.input_tokens)
+            self._output_tokens.append(usage.output_tokens)
+            self._cache_read_tokens.append(usage.cache_read_tokens)
+            self._latency.append(float('nan') if latency is None else latency)
+            self._cost.append(cost)
+            self._total_spend += cost
+            self._session_spend[session] = self._session_spend.get(session, 0.0) + cost
+        return cost
+
+    def cost(self, model: str, usage: TokenUsage) -> float:
+        price = self.prices.get(model)
+        if price is None:
+            if model not in self._unpriced_models:
+                self._unpriced_models.add(model)
+                logger.warning('No price configured for model %s; its calls are counted as free', model)
+            return 0.0
+        return price.cost(usage)
+
+    def check_budget(self, session: Optional[str] = None):
+        """Raise BudgetExceededError when the global spend, or the spend of the current (or given) session, reached its cap."""
+        session = session if session is not None else _scope.get()[1]
+        with self._lock:
+            total, session_spend = self._total_spend, self._session_spend.get(session, 0.0)
+        if self.global_limit is not None and total >= self.global_limit:
+            raise BudgetExceededError(f'Global spend ${total:.4f} reached the ${self.global_limit:.2f} limit')
+        if self.session_limit is not None and session is not None and session_spend >= self.session_limit:
+            raise BudgetExceededError(f'Session {session} spent ${session_spend:.4f}, reaching the ${self.session_limit:.2f} limit')
+
+    def spend(self, session: Optional[str] = None) -> float:
+        """Total cost so far, of the whole process or of one session."""
+        with self._lock:
+            return self._total_spend if session is None else self._session_spend.get(session, 0.0)
+
+    def summary(self, by: Iterable[str] = ('provider', 'model'), **filters) -> Dict[Tuple, UsageSummary]:
+        """Totals grouped by some of provider, model, bot and session, over the rows matching filters (e.g. bot='UnprotectedBot')."""
+        positions = [DIMENSIONS.index(dimension) for dimension in by]
+        with self._lock:
+            groups = {index: tuple(key[p] for p in positions) for index, key in self._matching_keys(filters)}
+            result: Dict[Tuple, UsageSummary] = {}
+            for row, index in enumerate(self._rows_key):
+                group = groups.get(index)
+                if group is None:
+                    continue
+                totals = result.setdefault(group, UsageSummary())
+                totals.calls += 1
+                totals.input_tokens += self._input_tokens[row]
+                totals.output_tokens += self._output_tokens[row]
+                totals.cache_read_tokens += self._cache_read_tokens[row]
+                totals.cost += self._cost[row]
+        return result
+
+    def percentiles(self, field: str = 'latency', percentiles: Iterable[float] = (50, 95, 99), **filters) -> Dict[float, float]:
+        """Nearest-rank percentiles of a per-call field over the rows matching filters. Calls without a latency are skipped."""
+        if field not in FIELDS:
+            raise ValueError(f'Unknown field: {field}. Expected one of {FIELDS}')
+        with self._lock:
+            keys = {index for index, _key in self._matching_keys(filters)}
+            values = sorted(value for row, value in enumerate(self._column(field)) if self._rows_key[row] in keys and value == value)
+        if not values:
+            return {}
+        return {p: values[min(len(values) - 1, max(0, math.ceil(len(values) * p / 100) - 1))] for p in percentiles}
+
+    def clear(self):
+        with self._lock:
+            for column in (self._rows_key, self._input_tokens, self._output_tokens, self._cache_read_tokens, self._latency, self._cost):
+                del column[:]
+            self._total_spend = 0.0
+            self._session_spend.clear()
+
+    def _matching_keys(self, filters: Dict[str, str]):
+        unknown = set(filters) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f'Unknown dimensions: {sorted(unknown)}. Expected some of {DIMENSIONS}')
+        for index, key in enumerate(self._keys):
+            if all(key[DIMENSIONS.index(name)] == value for name, value in filters.items()):
+                yield index, key
+
+    def _column(self, field: str):
+        if field == 'total_tokens':
+            return (i + o for i, o in zip(self._input_tokens, self._output_tokens))
+        return {'input_tokens': self._input_tokens, 'output_tokens': self._output_tokens, 'latency': self._latency, 'cost': self._cost}[
+            field
+        ]
+
+
+_ledger = UsageLedger()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Ledger shared by every provider that LLMConfig builds."""
+    return _ledger
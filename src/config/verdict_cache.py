@@ -0,0 +1,145 @@
+"""
+Cache of guardrail verdicts, shared by the Prompt Guard and LLM-judge guardrails.
+
+The same texts reach the guardrails again and again: example prompts, retries
+and double submits. A verdict is keyed by the guardrail, a version fingerprint
+of everything that shapes its answer (model, classifier prompt, threshold) and
+a hash of the text with its whitespace normalized. Changing the model or the
+prompt changes the version, so stale verdicts are never served, even from the
+optional SQLite store that survives restarts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from .response_cache import ResponseCacheStats
+from .security_config import SecurityConfig
+from .ttl_cache import TTLCache
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace runs, which do not change a verdict; case and characters are kept, as classifiers see them."""
+    return ' '.join(text.split())
+
+
+def fingerprint(*parts: Any) -> str:
+    """Short stable hash of the settings a verdict depends on."""
+    serialized = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:16]
+
+
+class SQLiteVerdictStore:
+    """Persistent second tier backed by a single SQLite file; verdicts are stored as JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, verdict TEXT NOT NULL, created_at REAL NOT NULL)'
+            )
+
+    def get(self, key: str, ttl_seconds: Optional[float] = None) -> Optional[Any]:
+        with self._lock:
+            row = self._connection.execute('SELECT verdict, created_at FROM verdicts WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        verdict, created_at = row
+        if ttl_seconds is not None and time.time() - created_at >= ttl_seconds:
+            self.delete(key)
+            return None
+        return json.loads(verdict)
+
+    def put(self, key: str, verdict: Any):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO verdicts (key, verdict, created_at) VALUES (?, ?, ?)', (key, json.dumps(verdict), time.time())
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM verdicts WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM verdicts')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class VerdictCache:
+    """Tiered LRU of JSON-serializable guardrail verdicts."""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: Optional[float] = None, store: Optional[SQLiteVerdictStore] = None):
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.stats = ResponseCacheStats()
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(guardrail: str, version: str, text: str) -> str:
+        """Key of the verdict of guardrail (at version) on text."""
+        payload = json.dumps([guardrail, version, normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached verdict, or None on a miss."""
+        verdict = self._memory.get(key)
+        if verdict is not None:
+            self._count('memory_hits')
+            return verdict
+
+        if self.store is not None:
+            verdict = self.store.get(key, self.ttl_seconds)
+            if verdict is not None:
+                self._memory.put(key, verdict)
+                self._count('disk_hits')
+                return verdict
+
+        self._count('misses')
+        return None
+
+    def put(self, key: str, verdict: Any):
+        """Store a verdict in both tiers."""
+        self._memory.put(key, verdict)
+        if self.store is not None:
+            self.store.put(key, verdict)
+        self._count('stores')
+
+    def clear(self):
+        self._memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _count(self, field: str):
+        with self._stats_lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+
+
+_verdict_cache: Optional[VerdictCache] = None
+_verdict_cache_lock = threading.Lock()
+
+
+def get_verdict_cache() -> VerdictCache:
+    """Verdict cache shared by every guardrail of the process, configured by SecurityConfig."""
+    global _verdict_cache
+    with _verdict_cache_lock:
+        if _verdict_cache is None:
+            path = SecurityConfig.GUARDRAIL_VERDICT_CACHE_PATH
+            _verdict_cache = VerdictCache(
+                max_entries=SecurityConfig.GUARDRAIL_VERDICT_CACHE_SIZE,
+                store=SQLiteVerdictStore(path) if path else None,
+            )
+        return _verdict_cache
@@ -0,0 +1,202 @@
+"""
+Bounded log reader.
+
+Unlike vulnerable_tools.read_log, which shells out and loads the whole file,
+this reader memory-maps the file and returns at most max_bytes / max_lines
+per call. Every result carries an opaque offset token so a follow-up call can
+continue where the previous one stopped (or pick up lines appended since).
+"""
+
+import base64
+import mmap
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from config.tool_system import ToolSpec
+
+DEFAULT_MAX_BYTES = 64 * 1024
+DEFAULT_MAX_LINES = 500
+MODES = ('head', 'tail', 'range')
+
+
+@dataclass
+class LogChunk:
+    """A bounded slice of a log file."""
+
+    text: str
+    start: int
+    end: int
+    file_size: int
+    lines: int
+    truncated: bool
+    next_offset: str
+
+    def format(self, filename: str) -> str:
+        """Text for the LLM: a one-line header followed by the slice."""
+        status = 'truncated' if self.truncated else 'complete'
+        header = (
+            f'[{filename}: bytes {self.start}-{self.end} of {self.file_size}, {self.lines} lines, {status}; next_offset={self.next_offset}]'
+        )
+        return f'{header}\n{self.text}'
+
+
+class LogReaderError(ValueError):
+    """Invalid request for the log reader (bad mode, offset or path)."""
+
+
+def read_log_chunk(
+    path: str,
+    mode: str = 'head',
+    lines: Optional[int] = None,
+    offset: Optional[str] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    max_lines: int = DEFAULT_MAX_LINES,
+) -> LogChunk:
+    """
+    Read a bounded slice of a log file.
+
+    - head: lines from the start of the file, or from `offset` when continuing.
+    - tail: the last `lines` lines.
+    - range: the bytes [start, end).
+
+    At most max_bytes and max_lines are returned; `truncated` tells whether
+    more data was available in the requested window.
+    """
+    if mode not in MODES:
+        raise LogReaderError(f'Unknown mode: {mode}. Expected one of {MODES}')
+    max_lines = min(lines, max_lines) if lines else max_lines
+
+    with open(path, 'rb') as log_file:
+        stat = os.fstat(log_file.fileno())
+        size = stat.st_size
+        if offset is not None:
+            mode, start = 'head', _decode_offset(offset, stat)
+        if size == 0:
+            return LogChunk('', 0, 0, 0, 0, False, _encode_offset(stat, 0))
+
+        # Only the returned window is paged in, however large the file
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if mode == 'tail':
+                chunk_start, chunk_end, truncated = _tail_window(data, size, max_bytes, max_lines)
+            elif mode == 'range':
+                chunk_start, chunk_end, truncated = _range_window(size, start or 0, end, max_bytes)
+            else:
+                chunk_start, chunk_end, truncated = _head_window(data, size, min(start or 0, size), max_bytes, max_lines)
+            raw = data[chunk_start:chunk_end]
+
+    text = raw.decode('utf-8', errors='replace')
+    # A tail follow-up should return what is appended next, so it continues from the end of the file
+    next_position = size if mode == 'tail' else chunk_end
+    return LogChunk(text, chunk_start, chunk_end, size, raw.count(b'\n'), truncated, _encode_offset(stat, next_position))
+
+
+def _head_window(data: mmap.mmap, size: int, start: int, max_bytes: int, max_lines: int):
+    limit = min(size, start + max_bytes)
+    position = start
+    for _ in range(max_lines):
+        newline = data.find(b'\n', position, limit)
+        if newline == -1:
+            break
+        position = newline + 1
+    else:
+        return start, position, position < size
+
+    if limit == size:
+        # The last line of the file has no trailing newline
+        return start, size, False
+    if position == start:
+        # A single line longer than max_bytes: return its first max_bytes
+        return start, limit, True
+    return start, position, True
+
+
+def _tail_window(data: mmap.mmap, size: int, max_bytes: int, max_lines: int):
+    floor = max(0, size - max_bytes)
+    # Ignore the trailing newline so it does not count as an empty last line
+    end_of_text = size - 1 if data[size - 1 : size] == b'\n' else size
+    position = end_of_text
+    for _ in range(max_lines):
+        newline = data.rfind(b'\n', floor, position)
+        if newline == -1:
+            break
+        position = newline
+    else:
+        return position + 1, size, True
+
+    if floor == 0:
+        return 0, size, False
+    if position == end_of_text:
+        # A single line longer than max_bytes: return its last max_bytes
+        return floor, size, True
+    # Drop the partial line cut by the byte cap
+    return position + 1, size, True
+
+
+def _range_window(size: int, start: int, end: Optional[int], max_bytes: int):
+    if start < 0 or start > size:
+        raise LogReaderError(f'start {start} is outside the file (size {size})')
+    end = size if end is None else min(end, size)
+    if end < start:
+        raise LogReaderError(f'end {end} is before start {start}')
+    return start, min(end, start + max_bytes), end - start > max_bytes
+
+
+def _encode_offset(stat: os.stat_result, position: int) -> str:
+    token = f'{stat.st_dev}:{stat.st_ino}:{position}'.encode('ascii')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def _decode_offset(offset: str, stat: os.stat_result) -> int:
+    """Byte position of an offset token; 0 if the file was rotated or truncated since."""
+    try:
+        padded = offset + '=' * (-len(offset) % 4)
+        device, inode, position = (int(part) for part in base64.urlsafe_b64decode(padded).decode('ascii').split(':'))
+    except ValueError as e:
+        raise LogReaderError(f'Invalid offset: {offset}') from e
+
+    if (device, inode) != (stat.st_dev, stat.st_ino) or position > stat.st_size:
+        return 0
+    return position
+
+
+def resolve_log_path(filename: str, log_dir: str) -> str:
+    """Path of a log file inside log_dir. Absolute paths and '..' escapes are rejected."""
+    root = os.path.realpath(log_dir)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.commonpath([root, path]) != root:
+        raise LogReaderError(f'{filename} is outside the log directory')
+    return path
+
+
+def read_log_tool(tool_input: dict, log_dir: str = '.') -> str:
+    """ToolHandler entry point: read a bounded slice of a log file in log_dir."""
+    filename = tool_input.get('filename', '')
+    chunk = read_log_chunk(
+        resolve_log_path(filename, log_dir),
+        mode=tool_input.get('mode', 'head'),
+        lines=tool_input.get('lines'),
+        offset=tool_input.get('offset'),
+        start=tool_input.get('start'),
+        end=tool_input.get('end'),
+    )
+    return chunk.format(filename)
+
+
+LOG_READER_TOOL_SPEC = ToolSpec(
+    name='read_log_chunk',
+    description='Read part of a log file without loading all of it. '
+    "mode 'head' reads from the start, 'tail' the last lines, 'range' a byte range. "
+    'Pass the next_offset of a previous result as offset to continue reading.',
+    parameters={
+        'filename': {'type': 'string', 'description': 'Log file name, relative to the log directory'},
+        'mode': {'type': 'string', 'enum': list(MODES), 'description': 'Where to read from (default head)'},
+        'lines': {'type': 'integer', 'description': f'Maximum number of lines (at most {DEFAULT_MAX_LINES})'},
+        'offset': {'type': 'string', 'description': 'next_offset returned by a previous call'},
+        'start': {'type': 'integer', 'description': "First byte for mode 'range'"},
+        'end': {'type': 'integer', 'description': "End byte (exclusive) for mode 'range'"},
+    },
+    required=['filename'],
+)
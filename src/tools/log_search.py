@@ -0,0 +1,279 @@
+"""
+Indexed log search.
+
+Each log file gets an on-disk SQLite index of line offsets, level and
+timestamp, plus an inverted index of the tokens on every line. The index is
+brought up to date incrementally before each search: only bytes appended
+since the last search are parsed, and a rotated or truncated file is
+re-indexed from scratch. Level, time-window and keyword filters are answered
+from B-tree indexes, so a query does not scan the log.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config.tool_system import ToolSpec
+
+from .log_reader import LogReaderError, resolve_log_path
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+LEVEL_ALIASES = {'WARN': 'WARNING', 'FATAL': 'CRITICAL', 'ERR': 'ERROR'}
+
+_LEVEL_PATTERN = re.compile(r'\b(DEBUG|INFO|WARN(?:ING)?|ERR(?:OR)?|CRITICAL|FATAL)\b')
+_TIMESTAMP_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9_]{2,}')
+
+# Lines are indexed in batches to bound memory while indexing multi-GB files
+_BATCH_BYTES = 4 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS lines (
+    line_no INTEGER PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    level INTEGER,
+    ts TEXT
+);
+CREATE INDEX IF NOT EXISTS lines_level ON lines (level, line_no);
+CREATE INDEX IF NOT EXISTS lines_ts ON lines (ts);
+CREATE TABLE IF NOT EXISTS postings (token TEXT NOT NULL, line_no INTEGER NOT NULL, PRIMARY KEY (token, line_no)) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class LogMatch:
+    """A matching line with its surrounding context lines."""
+
+    line_no: int
+    text: str
+    before: List[str]
+    after: List[str]
+
+
+@dataclass
+class SearchResult:
+    total: int
+    matches: List[LogMatch]
+
+    def format(self, filename: str) -> str:
+        """Text for the LLM: a summary line, then each match with '>' and its context lines indented."""
+        output = [f'[{self.total} matching lines in {filename}, showing {len(self.matches)}]']
+        for match in self.matches:
+            first = match.line_no - len(match.before)
+            for number, text in enumerate(match.before, first):
+                output.append(f'  {number}: {text}')
+            output.append(f'> {match.line_no}: {match.text}')
+            for number, text in enumerate(match.after, match.line_no + 1):
+                output.append(f'  {number}: {text}')
+        return '\n'.join(output)
+
+
+def parse_level(line: str) -> Optional[int]:
+    match = _LEVEL_PATTERN.search(line)
+    if not match:
+        return None
+    name = match.group(1)
+    return LEVELS[LEVEL_ALIASES.get(name, name)]
+
+
+def parse_timestamp(line: str) -> Optional[str]:
+    """ISO timestamp ('YYYY-MM-DDTHH:MM:SS') of a line, which sorts chronologically as text."""
+    match = _TIMESTAMP_PATTERN.search(line)
+    return f'{match.group(1)}T{match.group(2)}' if match else None
+
+
+def tokenize(text: str) -> List[str]:
+    return sorted(set(_TOKEN_PATTERN.findall(text.lower())))
+
+
+class LogIndex:
+    """Incrementally maintained index of one log file."""
+
+    def __init__(self, log_path: str, index_path: Optional[str] = None):
+        self.log_path = log_path
+        self.index_path = index_path or default_index_path(log_path)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def refresh(self) -> int:
+        """Index lines appended since the last refresh. Returns the number of new lines."""
+        with self._lock, open(self.log_path, 'rb') as log_file:
+            stat = os.fstat(log_file.fileno())
+            meta = dict(self._connection.execute('SELECT key, value FROM meta'))
+            rotated = (meta.get('device'), meta.get('inode')) != (stat.st_dev, stat.st_ino)
+            if rotated or stat.st_size < meta.get('indexed_bytes', 0):
+                self._reset(stat)
+                meta = {}
+
+            position = meta.get('indexed_bytes', 0)
+            line_no = meta.get('indexed_lines', 0)
+            log_file.seek(position)
+            added = 0
+            batch = b''
+            while True:
+                more = log_file.read(_BATCH_BYTES)
+                batch += more
+                # Only complete lines are indexed; a partial last line is picked up by the next refresh
+                complete = batch[: batch.rfind(b'\n') + 1]
+                if not complete:
+                    if not more:
+                        break
+                    # A line longer than the batch: keep reading until its newline or the end of the file
+                    continue
+                batch = b''
+                line_no = self._index_lines(complete, position, line_no)
+                added += complete.count(b'\n')
+                position += len(complete)
+                log_file.seek(position)
+
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', [('indexed_bytes', position), ('indexed_lines', line_no)]
+                )
+            return added
+
+    def search(
+        self,
+        keywords: Iterable[str] = (),
+        level: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+        context: int = 1,
+    ) -> SearchResult:
+        """
+        Most recent lines matching all filters, newest first.
+
+        level is a minimum ('WARNING' also returns ERROR and CRITICAL lines);
+        since/until are ISO timestamps compared as text; every keyword must occur.
+        """
+        self.refresh()
+        where, args = self._filters(keywords, level, since, until)
+        with self._lock:
+            total = self._connection.execute(f'SELECT COUNT(*) FROM lines WHERE {where}', args).fetchone()[0]
+            rows = self._connection.execute(
+                f'SELECT line_no FROM lines WHERE {where} ORDER BY line_no DESC LIMIT ?', [*args, limit]
+            ).fetchall()
+            matches = [self._match(line_no, context) for (line_no,) in rows]
+        return SearchResult(total, matches)
+
+    def close(self):
+        self._connection.close()
+
+    def _filters(self, keywords, level, since, until) -> Tuple[str, list]:
+        clauses, args = ['1'], []
+        for token in tokenize(' '.join(keywords)):
+            clauses.append('line_no IN (SELECT line_no FROM postings WHERE token = ?)')
+            args.append(token)
+        if level:
+            name = level.upper()
+            if LEVEL_ALIASES.get(name, name) not in LEVELS:
+                raise LogReaderError(f'Unknown level: {level}. Expected one of {sorted(LEVELS)}')
+            clauses.append('level >= ?')
+            args.append(LEVELS[LEVEL_ALIASES.get(name, name)])
+        if since:
+            clauses.append('ts >= ?')
+            args.append(since.replace(' ', 'T'))
+        if until:
+            clauses.append('ts <= ?')
+            args.append(until.replace(' ', 'T'))
+        return ' AND '.join(clauses), args
+
+    def _match(self, line_no: int, context: int) -> LogMatch:
+        rows = self._connection.execute(
+            'SELECT line_no, offset, length FROM lines WHERE line_no BETWEEN ? AND ? ORDER BY line_no',
+            (line_no - context, line_no + context),
+        ).fetchall()
+        texts: Dict[int, str] = {}
+        with open(self.log_path, 'rb') as log_file:
+            for number, offset, length in rows:
+                log_file.seek(offset)
+                texts[number] = log_file.read(length).decode('utf-8', errors='replace').rstrip('\r\n')
+        before = [texts[number] for number in range(line_no - context, line_no) if number in texts]
+        after = [texts[number] for number in range(line_no + 1, line_no + context + 1) if number in texts]
+        return LogMatch(line_no, texts.get(line_no, ''), before, after)
+
+    def _index_lines(self, data: bytes, offset: int, line_no: int) -> int:
+        line_rows, posting_rows = [], []
+        # Lines end at b'\n' only, like the offsets of the log reader; a stray '\r' stays part of its line
+        for raw in data[:-1].split(b'\n'):
+            raw += b'\n'
+            line_no += 1
+            text = raw.decode('utf-8', errors='replace')
+            line_rows.append((line_no, offset, len(raw), parse_level(text), parse_timestamp(text)))
+            posting_rows.extend((token, line_no) for token in tokenize(text))
+            offset += len(raw)
+        with self._connection:
+            self._connection.executemany('INSERT INTO lines (line_no, offset, length, level, ts) VALUES (?, ?, ?, ?, ?)', line_rows)
+            self._connection.executemany('INSERT OR IGNORE INTO postings (token, line_no) VALUES (?, ?)', posting_rows)
+        return line_no
+
+    def _reset(self, stat: os.stat_result):
+        with self._connection:
+            self._connection.execute('DELETE FROM lines')
+            self._connection.execute('DELETE FROM postings')
+            self._connection.execute('DELETE FROM meta')
+            self._connection.executemany(
+                'INSERT INTO meta (key, value) VALUES (?, ?)', [('device', stat.st_dev), ('inode', stat.st_ino), ('indexed_bytes', 0)]
+            )
+
+
+def default_index_path(log_path: str) -> str:
+    """Index file kept in a .log_index directory next to the log."""
+    directory, name = os.path.split(os.path.abspath(log_path))
+    return os.path.join(directory, '.log_index', f'{name}.sqlite')
+
+
+_indexes: Dict[str, LogIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_log_index(log_path: str) -> LogIndex:
+    """Process-wide index per log file, so every bot and user shares the same incremental index."""
+    log_path = os.path.abspath(log_path)
+    with _indexes_lock:
+        if log_path not in _indexes:
+            _indexes[log_path] = LogIndex(log_path)
+        return _indexes[log_path]
+
+
+def search_log_tool(tool_input: dict, log_dir: str = '.') -> str:
+    """ToolHandler entry point: search a log file in log_dir."""
+    filename = tool_input.get('filename', '')
+    keywords = tool_input.get('keywords') or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    limit, context = tool_input.get('limit'), tool_input.get('context')
+    result = get_log_index(resolve_log_path(filename, log_dir)).search(
+        keywords=keywords,
+        level=tool_input.get('level'),
+        since=tool_input.get('since'),
+        until=tool_input.get('until'),
+        limit=min(int(20 if limit is None else limit), 100),
+        context=min(int(1 if context is None else context), 5),
+    )
+    return result.format(filename)
+
+
+SEARCH_LOG_TOOL_SPEC = ToolSpec(
+    name='search_log',
+    description='Search a log file and return only the matching lines with some context. '
+    'Prefer this over reading the whole file, e.g. level ERROR to find errors.',
+    parameters={
+        'filename': {'type': 'string', 'description': 'Log file name, relative to the log directory'},
+        'keywords': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Words that must all occur on the line'},
+        'level': {'type': 'string', 'enum': sorted(LEVELS, key=LEVELS.get), 'description': 'Minimum log level'},
+        'since': {'type': 'string', 'description': 'Earliest timestamp, YYYY-MM-DD HH:MM:SS'},
+        'until': {'type': 'string', 'description': 'Latest timestamp, YYYY-MM-DD HH:MM:SS'},
+        'limit': {'type': 'integer', 'description': 'Maximum number of matching lines (default 20)'},
+        'context': {'type': 'integer', 'description': 'Context lines before and after each match (default 1)'},
+    },
+    required=['filename'],
+)
@@ -10,7 +10,6 @@ import asyncio
 import gradio as gr
 
 from config.llm_config import LLMConfig
-from ui.common import slow_echo
 
 
 class DirectInjectionUI:
@@ -30,8 +29,7 @@ class DirectInjectionUI:
 
     def _handle_unprotected_chat(self, message, _history):
         """Standard handler for unprotected bot chat."""
-        result = self.unprotected_bot.chat(user_prompt=message)
-        yield from slow_echo(result)
+        yield from self.unprotected_bot.chat_stream(user_prompt=message)
 
     async def _handle_secure_chat(self, message, _history):
         """Handle chat with instruction guardrails and sandwich defense."""
@@ -3,7 +3,7 @@ import gradio as gr
 from chatbot.input_guardrail_bot import InputGuardrailsBot
 from chatbot.unprotected_bot import UnprotectedBot
 from config.llm_config import LLMConfig
-from ui.common import slow_echo
+from config.verdict_cache import get_verdict_cache
 
 # Initialize LLMConfig
 llm_config = LLMConfig(debug=False)
@@ -11,17 +11,18 @@ llm_config.initialize()
 
 # Use methods to get default LLMs
 unprotected_bot = UnprotectedBot(llm_config.get_default_unprotected_llm())
-input_guardrail_bot = InputGuardrailsBot(llm_config.get_default_secure_llm())
+input_guardrail_bot = InputGuardrailsBot(llm_config.get_default_secure_llm(), verdict_cache=get_verdict_cache())
 
 
 def unprotected_chat(message, history):
-    result = unprotected_bot.chat(user_prompt=message)
-    yield from slow_echo(result)
+    yield from unprotected_bot.chat_stream(user_prompt=message)
 
 
 def secure_chat(message, history):
-    result = input_guardrail_bot.chat(user_prompt=message)
-    return result
+    # Only this chat waits while Prompt Guard is still loading; the rest of the UI is already usable
+    if not input_guardrail_bot.prompt_guard.ready:
+        yield '⏳ Loading the Prompt Guard model, your message will be checked as soon as it is ready...'
+    yield input_guardrail_bot.chat(user_prompt=message)
 
 
 with gr.Blocks(theme='ParityError/Interstellar') as input_guardrail_demo:  # theme="base"
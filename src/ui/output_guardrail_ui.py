@@ -3,7 +3,6 @@ import gradio as gr
 from chatbot.output_guardrail_bot import OutputGuardrailsBot
 from chatbot.unprotected_bot import UnprotectedBot
 from config.llm_config import LLMConfig
-from ui.common import slow_echo
 
 # Initialize LLMConfig
 llm_config = LLMConfig(debug=False)
@@ -15,8 +14,7 @@ output_guardrail_bot = OutputGuardrailsBot(llm_config.get_default_secure_llm())
 
 
 def unprotected_chat(message, history):
-    result = unprotected_bot.chat(user_prompt=message)
-    yield from slow_echo(result)
+    yield from unprotected_bot.chat_stream(user_prompt=message)
 
 
 def secure_chat(message, history):
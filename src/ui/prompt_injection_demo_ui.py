@@ -5,7 +5,7 @@ import gradio as gr
 from chatbot.system_prompt_guardrail_bot import SystemPromptGuardrailBot
 from chatbot.unprotected_bot import UnprotectedBot
 from config.llm_config import LLMConfig
-from ui.common import slow_echo
+from config.verdict_cache import get_verdict_cache
 
 # Initialize LLMConfig
 llm_config = LLMConfig(debug=False)
@@ -13,12 +13,11 @@ llm_config.initialize()
 
 # Use methods to get default LLMs
 unprotected_bot = UnprotectedBot(llm_config.get_default_unprotected_llm())
-secure_bot = SystemPromptGuardrailBot(llm_config.get_default_secure_llm())
+secure_bot = SystemPromptGuardrailBot(llm_config.get_default_secure_llm(), verdict_cache=get_verdict_cache())
 
 
 def unprotected_chat(message, history):
-    result = unprotected_bot.chat(user_prompt=message)
-    yield from slow_echo(result)
+    yield from unprotected_bot.chat_stream(user_prompt=message)
 
 
 async def secure_chat(message, history):
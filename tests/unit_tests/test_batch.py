@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.batch import ORDERED_BUFFER_FACTOR, run_batch
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.token_usage import TokenUsage
+
+
+def _echo_with_delay(prompt):
+    time.sleep(prompt / 1000)
+    return str(prompt), TokenUsage(prompt, 1)
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_ordered_results_follow_input_order(self):
+        results = list(run_batch(_echo_with_delay, [30, 1, 10], concurrency=3))
+
+        self.assertEqual([result.text for result in results], ['30', '1', '10'])
+        self.assertEqual([result.usage.input_tokens for result in results], [30, 1, 10])
+        self.assertTrue(all(result.latency > 0 for result in results))
+
+    def test_unordered_results_arrive_in_completion_order(self):
+        results = list(run_batch(_echo_with_delay, [60, 1], concurrency=2, ordered=False))
+
+        self.assertEqual([result.index for result in results], [1, 0])
+
+    def test_concurrency_limit_is_respected(self):
+        lock = threading.Lock()
+        in_flight = 0
+        max_in_flight = 0
+
+        def call(prompt):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            time.sleep(0.005)
+            with lock:
+                in_flight -= 1
+            return prompt, TokenUsage.empty()
+
+        results = list(run_batch(call, (str(i) for i in range(20)), concurrency=3))
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(max_in_flight, 3)
+
+    def test_results_held_behind_a_slow_first_prompt_are_bounded(self):
+        first_done = threading.Event()
+        started_while_first_runs = 0
+
+        def call(prompt):
+            nonlocal started_while_first_runs
+            if prompt == 0:
+                time.sleep(0.2)
+                first_done.set()
+            elif not first_done.is_set():
+                started_while_first_runs += 1
+            return str(prompt), TokenUsage.empty()
+
+        results = list(run_batch(call, range(100), concurrency=2))
+
+        self.assertEqual([result.index for result in results], list(range(100)))
+        self.assertLess(started_while_first_runs, 2 * ORDERED_BUFFER_FACTOR)
+
+    def test_errors_are_reported_per_item(self):
+        def call(prompt):
+            if prompt == 'bad':
+                raise RuntimeError('throttled')
+            return prompt, TokenUsage.empty()
+
+        results = list(run_batch(call, ['good', 'bad'], concurrency=2))
+
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(str(results[1].error), 'throttled')
+
+
+class TestProviderInvokeMany(unittest.TestCase):
+    @patch('boto3.client')
+    def test_invoke_many_returns_text_and_usage_per_prompt(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = lambda **params: {
+            'output': {'message': {'content': [{'text': params['messages'][0]['content'][0]['text'].upper()}]}},
+            'usage': {'inputTokens': 3, 'outputTokens': 2},
+        }
+
+        results = list(provider.invoke_many('system', ['a', 'b', 'c'], concurrency=2))
+
+        self.assertEqual([result.text for result in results], ['A', 'B', 'C'])
+        self.assertTrue(all(result.usage.total_tokens == 5 for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
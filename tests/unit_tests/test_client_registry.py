@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.bedrock_provider import BedrockClaudeProvider
+from config.client_registry import ClientRegistry, PoolSettings, without_sdk_retries
+
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ClientRegistry(PoolSettings(max_connections=7, read_timeout=12))
+
+    def test_same_region_and_credentials_share_one_client(self):
+        first = self.registry.bedrock_runtime('eu-central-1')
+        second = self.registry.bedrock_runtime('eu-central-1')
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_different_region_gets_its_own_client(self):
+        self.assertIsNot(self.registry.bedrock_runtime('eu-central-1'), self.registry.bedrock_runtime('us-east-1'))
+
+    def test_bedrock_client_uses_pool_settings(self):
+        config = self.registry.bedrock_runtime('eu-central-1').meta.config
+
+        self.assertEqual(config.max_pool_connections, 7)
+        self.assertEqual(config.read_timeout, 12)
+        self.assertTrue(config.tcp_keepalive)
+
+    def test_sdk_retries_are_off_only_inside_without_sdk_retries(self):
+        client = self.registry.bedrock_runtime('eu-central-1')
+
+        self.assertEqual(client.meta.config.retries['total_max_attempts'], 3)
+        with without_sdk_retries():
+            self.assertEqual(client.meta.config.retries['total_max_attempts'], 1)
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'key-a'})
+    def test_openai_client_switches_max_retries(self):
+        client = self.registry.openai()
+
+        self.assertEqual(client.max_retries, 2)
+        with without_sdk_retries():
+            self.assertEqual(client.max_retries, 0)
+
+    def test_api_key_is_part_of_the_client_key(self):
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'key-a'}):
+            client_a = self.registry.openai()
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'key-b'}):
+            client_b = self.registry.openai()
+
+        self.assertIsNot(client_a, client_b)
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'key-a'})
+    def test_async_clients_are_shared_per_event_loop(self):
+        async def two_lookups():
+            return self.registry.openai(async_client=True), self.registry.openai(async_client=True)
+
+        first_loop = asyncio.run(two_lookups())
+        second_loop = asyncio.run(two_lookups())
+
+        self.assertIs(first_loop[0], first_loop[1])
+        self.assertIsNot(first_loop[0], second_loop[0])
+
+    def test_prewarm_failures_are_ignored(self):
+        with patch.object(self.registry, '_warm', side_effect=RuntimeError('no credentials')):
+            self.registry.prewarm(['bedrock-runtime'], background=False)
+
+        self.assertEqual(self.registry.warmup_times, {})
+
+    @patch.dict('os.environ', {'AWS_ACCESS_KEY_ID': 'key', 'AWS_SECRET_ACCESS_KEY': 'secret'})
+    def test_prewarm_resolves_bedrock_credentials(self):
+        self.registry.prewarm(['bedrock-runtime'], background=False)
+
+        self.assertIn('bedrock-runtime', self.registry.warmup_times)
+
+    def test_bedrock_providers_share_the_default_registry_client(self):
+        self.assertIs(BedrockConverseProvider('model-a').client, BedrockClaudeProvider('model-b').client)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from config.anthropic_provider import AnthropicProvider
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.bedrock_provider import BedrockClaudeProvider
+from config.inference_params import InferenceParams
+from config.openai_provider import OpenAIProvider
+from config.response_cache import ResponseCache
+
+CLASSIFIER = InferenceParams(max_tokens=5, temperature=0.0, stop_sequences=('END',))
+
+
+@patch('boto3.client')
+class TestBedrockInferenceParams(unittest.TestCase):
+    def test_defaults_are_used_without_overrides(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+
+        config = provider._build_converse_params('system', [])['inferenceConfig']
+
+        self.assertEqual(config['maxTokens'], BedrockConverseProvider.DEFAULT_MAX_TOKENS)
+        self.assertEqual(config['temperature'], BedrockConverseProvider.DEFAULT_TEMPERATURE)
+
+    def test_converse_call_uses_per_invocation_params(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'allowed'}]}},
+            'usage': {'inputTokens': 20, 'outputTokens': 1},
+        }
+
+        provider.invoke('system', 'user', inference_params=CLASSIFIER)
+
+        config = provider.client.converse.call_args.kwargs['inferenceConfig']
+        self.assertEqual(config['maxTokens'], 5)
+        self.assertEqual(config['temperature'], 0.0)
+        self.assertEqual(config['topP'], BedrockConverseProvider.DEFAULT_TOP_P)
+        self.assertEqual(config['stopSequences'], ['END'])
+
+    def test_legacy_bedrock_body_uses_per_invocation_params(self, _mock_boto3):
+        provider = BedrockClaudeProvider('test-model')
+
+        body = json.loads(provider._build_body('system', 'user', CLASSIFIER))
+
+        self.assertEqual(body['max_tokens'], 5)
+        self.assertEqual(body['stop_sequences'], ['END'])
+
+    def test_params_are_part_of_the_response_cache_key(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.response_cache = ResponseCache()
+
+        default_key = provider._response_cache_key('system', 'user', None, {})
+        classifier_key = provider._response_cache_key('system', 'user', None, {}, CLASSIFIER)
+
+        self.assertNotEqual(default_key, classifier_key)
+
+
+class TestApiInferenceParams(unittest.TestCase):
+    @patch.dict('os.environ', {'ANTHROPIC_API_KEY': 'test-key'})
+    def test_anthropic_params(self):
+        provider = AnthropicProvider('test-model')
+
+        params = provider._build_params('system', [], CLASSIFIER)
+
+        self.assertEqual(params['max_tokens'], 5)
+        self.assertEqual(params['stop_sequences'], ['END'])
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_openai_returns_logprobs_when_requested(self):
+        provider = OpenAIProvider('test-model')
+        provider.client = Mock()
+        provider.client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content='allowed', tool_calls=None),
+                    logprobs=SimpleNamespace(content=[SimpleNamespace(token='allowed', logprob=-0.01)]),
+                )
+            ],
+            usage=SimpleNamespace(prompt_tokens=20, completion_tokens=1),
+        )
+
+        _text, usage = provider.invoke('system', 'user', inference_params=InferenceParams(max_tokens=1, logprobs=True))
+
+        params = provider.client.chat.completions.create.call_args.kwargs
+        self.assertTrue(params['logprobs'])
+        self.assertEqual(params['max_tokens'], 1)
+        self.assertEqual(usage.logprobs, [('allowed', -0.01)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.llm_config import LLMConfig
+from config.response_cache import ResponseCache
+
+
+class TestLLMConfigLazyProviders(unittest.TestCase):
+    def setUp(self):
+        self.config = LLMConfig().initialize()
+
+    def test_initialize_does_not_construct_providers(self):
+        self.assertEqual(self.config.providers, {})
+
+    def test_default_llm_builds_only_the_requested_provider(self):
+        llm = self.config.get_default_unprotected_llm()
+
+        self.assertIsInstance(llm, BedrockConverseProvider)
+        self.assertEqual(list(self.config.providers), ['bedrock_converse'])
+        self.assertIn('bedrock_converse', self.config.construction_times)
+
+    def test_provider_is_cached_after_first_access(self):
+        self.assertIs(self.config.get_bedrock_converse_llm(), self.config.get_provider('bedrock_converse'))
+        self.assertEqual(len(self.config.construction_times), 1)
+
+    def test_default_tool_bot_llm_uses_nova_lite(self):
+        llm = self.config.get_default_tool_unprotected_bot_llm()
+
+        self.assertEqual(llm.model_id, LLMConfig.BEDROCK_CONVERSE_NOVA_LITE_ID)
+
+    def test_unknown_provider_returns_none(self):
+        self.assertIsNone(self.config.get_provider('unknown'))
+
+    def test_response_cache_is_attached_to_lazily_built_providers(self):
+        cache = ResponseCache()
+        config = LLMConfig(response_cache=cache)
+
+        self.assertIs(config.get_bedrock_llm().response_cache, cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
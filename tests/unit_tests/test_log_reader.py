@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+from chatbot.tools_injection_bot import ToolsInjectionBot
+from tools.log_reader import LogReaderError, read_log_chunk, read_log_tool, resolve_log_path
+
+
+class TestLogReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'system.log')
+        self.write_lines(range(100))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_lines(self, numbers, mode='w'):
+        with open(self.path, mode) as log_file:
+            log_file.writelines(f'line {number}\n' for number in numbers)
+
+    def test_head_is_capped_by_lines(self):
+        chunk = read_log_chunk(self.path, mode='head', lines=3)
+
+        self.assertEqual(chunk.text, 'line 0\nline 1\nline 2\n')
+        self.assertTrue(chunk.truncated)
+
+    def test_head_is_capped_by_bytes_on_a_line_boundary(self):
+        chunk = read_log_chunk(self.path, mode='head', max_bytes=24)
+
+        self.assertEqual(chunk.text, 'line 0\nline 1\nline 2\n')
+        self.assertEqual(chunk.end, 21)
+
+    def test_offset_continues_where_the_previous_call_stopped(self):
+        first = read_log_chunk(self.path, lines=2)
+        second = read_log_chunk(self.path, offset=first.next_offset, lines=2)
+
+        self.assertEqual(second.text, 'line 2\nline 3\n')
+
+    def test_tail_returns_last_lines(self):
+        chunk = read_log_chunk(self.path, mode='tail', lines=2)
+
+        self.assertEqual(chunk.text, 'line 98\nline 99\n')
+
+    def test_tail_offset_follows_appended_lines(self):
+        chunk = read_log_chunk(self.path, mode='tail', lines=1)
+        self.write_lines([100, 101], mode='a')
+
+        followed = read_log_chunk(self.path, offset=chunk.next_offset)
+
+        self.assertEqual(followed.text, 'line 100\nline 101\n')
+        self.assertFalse(followed.truncated)
+
+    def test_tail_drops_partial_line_cut_by_byte_cap(self):
+        chunk = read_log_chunk(self.path, mode='tail', max_bytes=12)
+
+        self.assertEqual(chunk.text, 'line 99\n')
+
+    def test_range_is_capped_by_bytes(self):
+        chunk = read_log_chunk(self.path, mode='range', start=7, end=1000, max_bytes=7)
+
+        self.assertEqual(chunk.text, 'line 1\n')
+        self.assertTrue(chunk.truncated)
+
+    def test_offset_restarts_after_truncation(self):
+        chunk = read_log_chunk(self.path, mode='tail', lines=1)
+        self.write_lines([0])
+
+        restarted = read_log_chunk(self.path, offset=chunk.next_offset)
+
+        self.assertEqual(restarted.text, 'line 0\n')
+
+    def test_empty_file(self):
+        open(self.path, 'w').close()
+
+        chunk = read_log_chunk(self.path, mode='tail')
+
+        self.assertEqual((chunk.text, chunk.file_size), ('', 0))
+
+    def test_invalid_offset_is_rejected(self):
+        with self.assertRaises(LogReaderError):
+            read_log_chunk(self.path, offset='not-a-token')
+
+    def test_paths_outside_log_dir_are_rejected(self):
+        with self.assertRaises(LogReaderError):
+            resolve_log_path('../etc/passwd', self.directory.name)
+
+    def test_tool_output_has_header_and_text(self):
+        output = read_log_tool({'filename': 'system.log', 'mode': 'tail', 'lines': 1}, log_dir=self.directory.name)
+
+        header, text = output.split('\n', 1)
+        self.assertTrue(header.startswith('[system.log: bytes'))
+        self.assertEqual(text, 'line 99\n')
+
+    def test_tools_bot_reads_logs_in_bounded_chunks(self):
+        llm = Mock(tools=[])
+        with patch.object(ToolsInjectionBot, 'LOG_DIR', self.directory.name):
+            bot = ToolsInjectionBot(llm, vulnerable=False)
+            output = bot.tool_handler.execute_tool('read_log_chunk', {'filename': 'system.log', 'lines': 2})
+
+        self.assertEqual([spec.name for spec in llm.tools], ['read_log_chunk', 'search_log'])
+        self.assertTrue(output.endswith('line 0\nline 1\n'))
+        self.assertEqual(ToolsInjectionBot(Mock(tools=[])).llm.tools[0].name, 'read_log')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from tools.log_reader import LogReaderError
+from tools.log_search import LogIndex, search_log_tool
+
+LINES = [
+    '2024-09-24 08:15:23 INFO [main] Application starting up',
+    '2024-09-24 08:15:24 DEBUG [db] Opening connection pool',
+    '2024-09-24 08:16:02 WARNING [db] Slow query on orders table',
+    '2024-09-24 08:17:45 ERROR [db] Connection refused by database',
+    '2024-09-24 08:18:10 INFO [api] Request served',
+    '2024-09-24 08:19:30 ERROR [api] Timeout calling payment service',
+]
+
+
+class TestLogSearch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'system.log')
+        self.write_lines(LINES)
+        self.index = LogIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        self.directory.cleanup()
+
+    def write_lines(self, lines, mode='w'):
+        with open(self.path, mode) as log_file:
+            log_file.writelines(f'{line}\n' for line in lines)
+
+    def test_level_is_a_minimum_and_newest_lines_come_first(self):
+        result = self.index.search(level='WARNING')
+
+        self.assertEqual(result.total, 3)
+        self.assertEqual([match.line_no for match in result.matches], [6, 4, 3])
+
+    def test_keywords_must_all_match(self):
+        result = self.index.search(keywords=['connection', 'DATABASE'])
+
+        self.assertEqual([match.line_no for match in result.matches], [4])
+
+    def test_time_window(self):
+        result = self.index.search(since='2024-09-24 08:16:00', until='2024-09-24 08:18:10')
+
+        self.assertEqual([match.line_no for match in result.matches], [5, 4, 3])
+
+    def test_matches_carry_context_lines(self):
+        match = self.index.search(keywords=['refused'], context=1).matches[0]
+
+        self.assertEqual(match.before, [LINES[2]])
+        self.assertEqual(match.text, LINES[3])
+        self.assertEqual(match.after, [LINES[4]])
+
+    def test_limit_keeps_total(self):
+        result = self.index.search(level='ERROR', limit=1)
+
+        self.assertEqual(result.total, 2)
+        self.assertEqual(len(result.matches), 1)
+
+    def test_only_appended_lines_are_indexed(self):
+        self.assertEqual(self.index.refresh(), 6)
+        self.write_lines(['2024-09-24 08:20:00 CRITICAL [main] Out of memory'], mode='a')
+
+        self.assertEqual(self.index.refresh(), 1)
+        self.assertEqual(self.index.search(level='CRITICAL').matches[0].line_no, 7)
+
+    def test_partial_last_line_waits_for_its_newline(self):
+        with open(self.path, 'a') as log_file:
+            log_file.write('2024-09-24 08:21:00 ERROR [api] half')
+
+        self.assertEqual(self.index.search(keywords=['half']).total, 0)
+        with open(self.path, 'a') as log_file:
+            log_file.write(' written\n')
+        self.assertEqual(self.index.search(keywords=['half', 'written']).total, 1)
+
+    def test_line_longer_than_a_batch_is_indexed(self):
+        long_line = '2024-09-24 08:22:00 ERROR [api] ' + 'x' * 100 + ' overflow'
+        self.write_lines([long_line, LINES[0]], mode='a')
+
+        with patch('tools.log_search._BATCH_BYTES', 16):
+            self.assertEqual(self.index.refresh(), 8)
+
+        self.assertEqual(self.index.search(keywords=['overflow']).matches[0].line_no, 7)
+
+    def test_lines_are_split_on_newlines_only(self):
+        with open(self.path, 'ab') as log_file:
+            log_file.write(b'2024-09-24 08:23:00 ERROR [api] carriage\rreturn\n' + LINES[0].encode() + b'\n')
+
+        self.assertEqual(self.index.refresh(), 8)
+        self.assertEqual(self.index.search(keywords=['carriage']).matches[0].line_no, 7)
+
+    def test_truncated_file_is_reindexed(self):
+        self.index.refresh()
+        self.write_lines(['2024-09-25 00:00:00 INFO [main] Fresh start'])
+
+        result = self.index.search()
+
+        self.assertEqual(result.total, 1)
+        self.assertEqual(result.matches[0].text, '2024-09-25 00:00:00 INFO [main] Fresh start')
+
+    def test_unknown_level_is_rejected(self):
+        with self.assertRaises(LogReaderError):
+            self.index.search(level='LOUD')
+
+    def test_tool_output_marks_matches(self):
+        output = search_log_tool({'filename': 'system.log', 'level': 'ERROR', 'limit': 1, 'context': 0}, log_dir=self.directory.name)
+
+        self.assertEqual(output, f'[2 matching lines in system.log, showing 1]\n> 6: {LINES[5]}')
+
+
+if __name__ == '__main__':
+    unittest.main()
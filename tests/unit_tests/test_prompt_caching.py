@@ -0,0 +1,110 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from config.anthropic_provider import AnthropicProvider
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.llm_config import LLMConfig
+from config.openai_provider import OpenAIProvider
+from config.token_usage import TokenUsage, format_token_usage
+from config.tool_system import ToolSpec
+
+READ_LOG = ToolSpec(name='read_log', description='Read a log file', parameters={'filename': {'type': 'string'}}, required=['filename'])
+
+
+@patch('boto3.client')
+class TestBedrockPromptCaching(unittest.TestCase):
+    def test_cache_points_are_opt_in(self, _mock_boto3):
+        provider = BedrockConverseProvider('anthropic.claude-3-5-haiku', tools=[READ_LOG])
+
+        params = provider._build_converse_params('system', [])
+
+        self.assertEqual(params['system'], [{'text': 'system'}])
+        self.assertNotIn(BedrockConverseProvider.CACHE_POINT, params['toolConfig']['tools'])
+
+    def test_cache_points_follow_system_prompt_and_tools(self, _mock_boto3):
+        provider = BedrockConverseProvider('anthropic.claude-3-5-haiku', tools=[READ_LOG])
+        provider.prompt_caching = True
+
+        params = provider._build_converse_params('system', [])
+
+        self.assertEqual(params['system'], [{'text': 'system'}, BedrockConverseProvider.CACHE_POINT])
+        self.assertEqual(params['toolConfig']['tools'][-1], BedrockConverseProvider.CACHE_POINT)
+
+    def test_nova_tools_get_no_cache_point(self, _mock_boto3):
+        provider = BedrockConverseProvider(LLMConfig.BEDROCK_CONVERSE_NOVA_LITE_ID, tools=[READ_LOG])
+        provider.prompt_caching = True
+
+        params = provider._build_converse_params('system', [])
+
+        self.assertEqual(len(params['toolConfig']['tools']), 1)
+
+    def test_cache_token_counts_are_extracted(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'ok'}]}},
+            'usage': {'inputTokens': 10, 'outputTokens': 5, 'cacheReadInputTokens': 1200, 'cacheWriteInputTokens': 0},
+        }
+
+        _text, usage = provider.invoke('system', 'user')
+
+        self.assertEqual(usage.cache_read_tokens, 1200)
+        self.assertEqual(usage.cache_write_tokens, 0)
+
+
+class TestAnthropicPromptCaching(unittest.TestCase):
+    @patch.dict('os.environ', {'ANTHROPIC_API_KEY': 'test-key'})
+    def test_system_prompt_gets_cache_control(self):
+        provider = AnthropicProvider('test-model')
+        provider.prompt_caching = True
+
+        params = provider._build_params('system', [])
+
+        self.assertEqual(params['system'], [{'type': 'text', 'text': 'system', 'cache_control': {'type': 'ephemeral'}}])
+
+    @patch.dict('os.environ', {'ANTHROPIC_API_KEY': 'test-key'})
+    def test_cache_token_counts_are_extracted(self):
+        provider = AnthropicProvider('test-model')
+        response = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=10, output_tokens=5, cache_read_input_tokens=None, cache_creation_input_tokens=1500)
+        )
+
+        usage = provider._extract_token_usage(response)
+
+        self.assertEqual(usage.cache_read_tokens, 0)
+        self.assertEqual(usage.cache_write_tokens, 1500)
+
+
+class TestOpenAIPromptCaching(unittest.TestCase):
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_cached_tokens_are_not_counted_as_input(self):
+        provider = OpenAIProvider('gpt-4o-mini')
+        response = SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=1500, completion_tokens=20, prompt_tokens_details=SimpleNamespace(cached_tokens=1280))
+        )
+
+        usage = provider._extract_token_usage(response)
+
+        self.assertEqual((usage.input_tokens, usage.cache_read_tokens, usage.output_tokens), (220, 1280, 20))
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_usage_without_details(self):
+        provider = OpenAIProvider('gpt-4o-mini')
+        response = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=15, completion_tokens=2, prompt_tokens_details=None))
+
+        self.assertEqual(provider._extract_token_usage(response), TokenUsage(input_tokens=15, output_tokens=2))
+
+
+class TestFormatTokenUsage(unittest.TestCase):
+    def test_prompt_cache_counts_are_shown_when_present(self):
+        usage = TokenUsage(input_tokens=10, output_tokens=5, cache_read_tokens=1200)
+
+        self.assertEqual(format_token_usage(usage), 'Tokens: 10 + 5 = 15 [prompt cache: 1200 read, 0 written]')
+
+    def test_plain_usage_is_unchanged(self):
+        self.assertEqual(format_token_usage(TokenUsage(input_tokens=10, output_tokens=5)), 'Tokens: 10 + 5 = 15')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import threading
+import unittest
+from types import SimpleNamespace
+
+import torch
+
+from chatbot.prompt_guard import PromptGuardScorer
+
+
+class FakeTokenizer:
+    """One token per word."""
+
+    pad_token_id = 0
+
+    def __call__(self, text, truncation=True, max_length=512, add_special_tokens=True):
+        input_ids = [len(word) for word in text.split()]
+        return {'input_ids': input_ids[:max_length] if truncation else input_ids}
+
+    def build_inputs_with_special_tokens(self, input_ids):
+        return [1] + input_ids + [2]
+
+
+class FakeModel:
+    """Logits that depend on the number of real tokens, so padding mistakes change the result."""
+
+    def __init__(self):
+        self.batch_shapes = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batch_shapes.append(tuple(input_ids.shape))
+        lengths = attention_mask.sum(dim=1).float()
+        return SimpleNamespace(logits=torch.stack([torch.zeros_like(lengths), lengths / 10, -lengths / 10], dim=1))
+
+
+class FlagModel:
+    """Jailbreak when a window contains a 9-letter word such as 'malicious'; records the windows it saw."""
+
+    def __init__(self):
+        self.windows = []
+
+    def __call__(self, input_ids, attention_mask):
+        rows = [ids[mask.bool()].tolist() for ids, mask in zip(input_ids, attention_mask)]
+        self.windows.extend(rows)
+        flagged = torch.tensor([10.0 if 9 in row else -10.0 for row in rows])
+        return SimpleNamespace(logits=torch.stack([torch.zeros_like(flagged), torch.zeros_like(flagged), flagged], dim=1))
+
+
+def expected(words, temperature=1.0):
+    logits = torch.tensor([0.0, words / 10, -words / 10]) / temperature
+    return torch.softmax(logits, dim=0).tolist()
+
+
+class TestPromptGuardScorer(unittest.TestCase):
+    def setUp(self):
+        self.model = FakeModel()
+        self.scorer = PromptGuardScorer(self.model, FakeTokenizer(), max_batch_size=8, max_wait=0.2)
+
+    def test_single_pass_gives_both_scores(self):
+        scores = self.scorer.score('one two three')
+
+        benign, injection, jailbreak = expected(3)
+        self.assertAlmostEqual(scores.jailbreak_score, jailbreak, places=5)
+        self.assertAlmostEqual(scores.indirect_injection_score, injection + jailbreak, places=5)
+        self.assertEqual(self.scorer.forward_passes, 1)
+
+    def test_concurrent_requests_share_a_forward_pass(self):
+        texts = ['a b', 'c d', 'e f g', 'h i']
+        results = {}
+        barrier = threading.Barrier(len(texts))
+
+        def score(text):
+            barrier.wait()
+            results[text] = self.scorer.score(text)
+
+        threads = [threading.Thread(target=score, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.scorer.forward_passes, 1)
+        for text, scores in results.items():
+            self.assertAlmostEqual(scores.benign, expected(len(text.split()))[0], places=5)
+
+    def test_lengths_are_bucketed_to_limit_padding(self):
+        texts = ['a', 'b c', 'word ' * 40, 'word ' * 50]
+
+        results = self.scorer.score_many(texts)
+
+        self.assertEqual(sorted(self.model.batch_shapes), [(2, 2), (2, 50)])
+        for text, scores in zip(texts, results):
+            self.assertAlmostEqual(scores.injection, expected(len(text.split()))[1], places=5)
+
+    def test_temperature_is_applied_per_request(self):
+        results = [self.scorer.submit('a b c d', temperature=t) for t in (1.0, 3.0)]
+
+        self.assertAlmostEqual(results[1].result().benign, expected(4, temperature=3.0)[0], places=5)
+        self.assertNotAlmostEqual(results[0].result().benign, results[1].result().benign, places=3)
+
+    def test_model_errors_reach_the_caller(self):
+        self.scorer.model = lambda **_inputs: (_ for _ in ()).throw(RuntimeError('out of memory'))
+
+        with self.assertRaises(RuntimeError):
+            self.scorer.score('hello')
+
+
+class TestWindowedScoring(unittest.TestCase):
+    def setUp(self):
+        self.model = FlagModel()
+        self.scorer = PromptGuardScorer(self.model, FakeTokenizer(), max_batch_size=4, max_wait=0.05, max_length=32, window_overlap=8)
+
+    def test_short_text_is_one_window(self):
+        scores = self.scorer.score_windows('one two three')
+
+        self.assertEqual(scores.windows, 1)
+        self.assertEqual(self.model.windows, [[1, 3, 3, 5, 2]])
+
+    def test_injection_after_the_first_window_is_found(self):
+        scores = self.scorer.score_windows('ok ' * 200 + 'malicious')
+
+        self.assertGreater(scores.jailbreak_score, 0.9)
+        self.assertGreater(scores.windows, 1)
+        self.assertLessEqual(max(len(window) for window in self.model.windows), 32)
+        # Every window is scored, but in batches rather than one forward pass each
+        self.assertLess(self.scorer.forward_passes, scores.windows)
+
+    def test_windows_overlap_and_cover_the_text(self):
+        text = ' '.join('abcdefgh'[: i % 8 + 1] for i in range(60))
+
+        windows = [window[1:-1] for window in self.scorer._windows(text)]
+
+        for first, second in zip(windows, windows[1:]):
+            self.assertEqual(first[-8:], second[:8])
+        self.assertEqual(windows[-1][-1], FakeTokenizer()(text)['input_ids'][-1])
+
+    def test_scoring_stops_once_a_window_is_above_the_threshold(self):
+        scores = self.scorer.score_windows('malicious ' + 'ok ' * 500, block_threshold=0.9)
+
+        self.assertGreater(scores.jailbreak_score, 0.9)
+        self.assertEqual(scores.windows, 4)
+
+    def test_reducers(self):
+        text = 'malicious ' + 'ok ' * 100
+
+        self.assertGreater(self.scorer.score_windows(text, reducer='max').jailbreak, 0.9)
+        self.assertLess(self.scorer.score_windows(text, reducer='mean').jailbreak, 0.5)
+        with self.assertRaises(ValueError):
+            self.scorer.score_windows(text, reducer='sum')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import torch
+
+from chatbot.prompt_guard import PromptGuardScorer
+from chatbot.prompt_guard_backends import BF16, FP32, INT8, ONNX, bf16_supported, benchmark, check_parity, prepare_model
+
+
+class TinyTokenizer:
+    pad_token_id = 0
+
+    def __call__(self, text, truncation=True, max_length=512, add_special_tokens=True):
+        return {'input_ids': [hash(word) % 99 + 1 for word in text.split()][:max_length]}
+
+
+class TinyClassifier(torch.nn.Module):
+    """Mean-pooled embeddings through Linear layers, with the call signature of a transformers classifier."""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embeddings = torch.nn.Embedding(100, 64)
+        self.hidden = torch.nn.Linear(64, 64)
+        self.classifier = torch.nn.Linear(64, 3)
+
+    def forward(self, input_ids, attention_mask, **_inputs):
+        mask = attention_mask.unsqueeze(-1).to(self.embeddings.weight.dtype)
+        pooled = (self.embeddings(input_ids) * mask).sum(dim=1) / mask.sum(dim=1)
+        return SimpleNamespace(logits=self.classifier(torch.relu(self.hidden(pooled))))
+
+
+class TestPromptGuardBackends(unittest.TestCase):
+    def setUp(self):
+        self.model = TinyClassifier().eval()
+        self.tokenizer = TinyTokenizer()
+        self.reference = PromptGuardScorer(self.model, self.tokenizer)
+
+    def test_fp32_is_the_model_itself(self):
+        self.assertIs(prepare_model(self.model, FP32), self.model)
+
+    def test_int8_quantizes_linear_layers_and_keeps_parity(self):
+        quantized = prepare_model(self.model, INT8)
+
+        self.assertIsInstance(self.model.hidden, torch.nn.Linear)
+        self.assertNotIsInstance(quantized.hidden, torch.nn.Linear)
+        self.assertTrue(check_parity(self.reference, PromptGuardScorer(quantized, self.tokenizer)).passed)
+
+    def test_bf16_keeps_parity_and_leaves_the_reference_in_fp32(self):
+        converted = prepare_model(self.model, BF16)
+
+        expected_dtype = torch.bfloat16 if bf16_supported() else torch.float32
+        self.assertEqual(converted.hidden.weight.dtype, expected_dtype)
+        self.assertEqual(self.model.hidden.weight.dtype, torch.float32)
+        self.assertTrue(check_parity(self.reference, PromptGuardScorer(converted, self.tokenizer)).passed)
+
+    def test_parity_check_fails_on_a_different_model(self):
+        other = TinyClassifier()
+        torch.nn.init.normal_(other.classifier.weight, std=5.0)
+
+        report = check_parity(self.reference, PromptGuardScorer(other, self.tokenizer))
+
+        self.assertFalse(report.passed)
+        self.assertGreater(report.max_abs_diff, report.tolerance)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            prepare_model(self.model, 'fp8')
+
+    def test_onnx_requires_onnxruntime(self):
+        with patch.dict('sys.modules', {'onnxruntime': None}), self.assertRaises(ImportError):
+            prepare_model(self.model, ONNX)
+
+    def test_benchmark_reports_each_backend(self):
+        with patch.dict('sys.modules', {'onnxruntime': None}):
+            results = benchmark(lambda: TinyClassifier().eval(), self.tokenizer, backends=(FP32, INT8, ONNX), repeats=2)
+
+        self.assertEqual([result.backend for result in results], [FP32, INT8])
+        for result in results:
+            self.assertGreater(result.throughput, 0)
+            self.assertGreater(result.rss_mb, 0)
+            self.assertLessEqual(result.p50_ms, result.p95_ms)
+        self.assertEqual(results[0].parity.max_abs_diff, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
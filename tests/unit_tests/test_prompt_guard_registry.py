@@ -0,0 +1,140 @@
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import torch
+
+from chatbot.input_guardrail_bot import InputGuardrailsBot
+from chatbot.prompt_guard_backends import BF16, INT8
+from chatbot.prompt_guard_registry import PromptGuardRegistry
+
+
+class TinyTokenizer:
+    pad_token_id = 0
+
+    def __call__(self, text, truncation=True, max_length=512, add_special_tokens=True):
+        return {'input_ids': [len(word) % 20 + 1 for word in text.split()][:max_length]}
+
+
+class TinyClassifier(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embeddings = torch.nn.EmbeddingBag(32, 16, mode='sum')
+        self.classifier = torch.nn.Linear(16, 3)
+
+    def forward(self, input_ids, attention_mask, **_inputs):
+        return SimpleNamespace(logits=self.classifier(self.embeddings(input_ids, per_sample_weights=attention_mask.float())))
+
+
+class TestPromptGuardRegistry(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.registry = PromptGuardRegistry('org/prompt-guard', cache_dir=self.cache_dir)
+        self.loads = []
+
+        def from_pretrained(source, offline):
+            self.loads.append((source, offline))
+            return TinyTokenizer(), TinyClassifier()
+
+        patcher = patch.object(PromptGuardRegistry, '_from_pretrained', side_effect=from_pretrained)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Saving needs a real transformers model; record the call instead
+        self.save = patch.object(PromptGuardRegistry, '_save').start()
+        self.addCleanup(patch.stopall)
+
+    def test_loads_once_for_all_callers(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry.get())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.loads), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertIn('load', self.registry.timings)
+
+    def test_bots_share_the_model_and_scorer(self):
+        first, second = InputGuardrailsBot(Mock(), self.registry), InputGuardrailsBot(Mock(), self.registry)
+
+        self.assertIs(first.model, second.model)
+        self.assertIs(first.scorer, second.scorer)
+        self.assertEqual(len(self.loads), 1)
+
+    def test_first_load_uses_the_hub_and_saves_to_the_cache(self):
+        self.registry.get()
+
+        self.assertEqual(self.loads, [('org/prompt-guard', False)])
+        self.save.assert_called_once()
+
+    def test_cached_copy_is_loaded_offline(self):
+        os.makedirs(self.registry.local_dir)
+        open(os.path.join(self.registry.local_dir, 'config.json'), 'w').close()
+
+        self.registry.get()
+
+        self.assertEqual(self.loads, [(self.registry.local_dir, True)])
+        self.save.assert_not_called()
+
+    def test_background_warm_up_loads_and_scores(self):
+        self.assertFalse(self.registry.ready)
+
+        self.registry.warm_up().join()
+
+        self.assertTrue(self.registry.ready)
+        self.assertGreaterEqual(self.registry.get().scorer.forward_passes, 1)
+        self.assertEqual(set(self.registry.timings), {'load', 'warmup'})
+
+    def test_failed_warm_up_is_logged_and_retried_on_use(self):
+        with patch.object(PromptGuardRegistry, '_from_pretrained', side_effect=OSError('offline')):
+            with self.assertLogs('chatbot.prompt_guard_registry', 'WARNING'):
+                self.registry.warm_up(background=False)
+        self.assertFalse(self.registry.ready)
+
+        self.registry.get()
+
+        self.assertTrue(self.registry.ready)
+
+
+class TestPromptGuardRegistryBackend(unittest.TestCase):
+    def setUp(self):
+        self.registry = PromptGuardRegistry(cache_dir=None, backend=INT8)
+
+    def test_backend_that_passes_parity_is_used(self):
+        model = TinyClassifier().eval()
+
+        self.assertIsNot(self.registry._prepare(model, TinyTokenizer()), model)
+        self.assertTrue(self.registry.version.endswith(':int8'))
+
+    def test_backend_that_fails_parity_falls_back_to_fp32(self):
+        model = TinyClassifier().eval()
+        broken = TinyClassifier()
+        torch.nn.init.normal_(broken.classifier.weight, std=5.0)
+
+        with (
+            patch('chatbot.prompt_guard_registry.prepare_model', return_value=broken),
+            self.assertLogs('chatbot.prompt_guard_registry', 'WARNING'),
+        ):
+            self.assertIs(self.registry._prepare(model, TinyTokenizer()), model)
+        self.assertTrue(self.registry.version.endswith(':fp32'))
+
+    def test_backend_unsupported_by_the_cpu_is_reported_as_fp32(self):
+        registry = PromptGuardRegistry(cache_dir=None, backend=BF16)
+        model = TinyClassifier().eval()
+
+        with (
+            patch('chatbot.prompt_guard_backends.bf16_supported', return_value=False),
+            patch('chatbot.prompt_guard_registry.check_parity') as check_parity,
+        ):
+            self.assertIs(registry._prepare(model, TinyTokenizer()), model)
+        check_parity.assert_not_called()
+        self.assertTrue(registry.version.endswith(':fp32'))
+
+
+if __name__ == '__main__':
+    unittest.main()
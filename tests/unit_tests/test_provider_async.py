@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.openai_provider import OpenAIProvider
+
+
+class TestProviderAsync(unittest.TestCase):
+    @patch('boto3.client')
+    def test_bedrock_ainvoke_runs_boto3_call_off_the_event_loop(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        call_threads = []
+
+        def converse(**_params):
+            call_threads.append(threading.current_thread())
+            return {'output': {'message': {'content': [{'text': 'ok'}]}}, 'usage': {'inputTokens': 1, 'outputTokens': 1}}
+
+        provider.client.converse.side_effect = converse
+
+        text, usage = asyncio.run(provider.ainvoke('system', 'user'))
+
+        self.assertEqual(text, 'ok')
+        self.assertEqual(usage.total_tokens, 2)
+        self.assertIsNot(call_threads[0], threading.main_thread())
+
+    @patch('boto3.client')
+    def test_ainvoke_passes_an_explicit_conversation_through(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'ok'}]}},
+            'usage': {'inputTokens': 1, 'outputTokens': 1},
+        }
+        messages = [{'role': 'user', 'content': [{'text': 'earlier question'}]}]
+
+        asyncio.run(provider.ainvoke('system', '', messages=messages))
+
+        self.assertEqual(provider.client.converse.call_args.kwargs['messages'][0]['content'][0]['text'], 'earlier question')
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_openai_ainvoke_uses_async_client(self):
+        provider = OpenAIProvider('test-model')
+        provider.client = Mock()
+        provider._async_client = Mock()
+        provider._async_client.chat.completions.create = AsyncMock(
+            return_value=SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content='4', tool_calls=None))],
+                usage=SimpleNamespace(prompt_tokens=5, completion_tokens=1),
+            )
+        )
+
+        text, usage = asyncio.run(provider.ainvoke('system', 'What is 2+2?'))
+
+        self.assertEqual(text, '4')
+        self.assertEqual(usage.input_tokens, 5)
+        provider.client.chat.completions.create.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.bedrock_provider import BedrockClaudeProvider
+from config.openai_provider import OpenAIProvider
+from config.token_usage import TokenUsage
+
+
+def _collect(stream):
+    chunks = list(stream)
+    return chunks[:-1], chunks[-1]
+
+
+class TestProviderStreaming(unittest.TestCase):
+    @patch('boto3.client')
+    def test_bedrock_converse_streams_text_and_usage(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse_stream.return_value = {
+            'stream': [
+                {'messageStart': {'role': 'assistant'}},
+                {'contentBlockDelta': {'delta': {'text': 'Hello'}}},
+                {'contentBlockDelta': {'delta': {'text': ' world'}}},
+                {'messageStop': {'stopReason': 'end_turn'}},
+                {'metadata': {'usage': {'inputTokens': 12, 'outputTokens': 3}}},
+            ]
+        }
+
+        deltas, usage = _collect(provider.invoke_stream('system', 'user'))
+
+        self.assertEqual(deltas, ['Hello', ' world'])
+        self.assertIsInstance(usage, TokenUsage)
+        self.assertEqual((usage.input_tokens, usage.output_tokens), (12, 3))
+        self.assertIsNotNone(usage.time_to_first_token)
+
+    @patch('boto3.client')
+    def test_bedrock_legacy_streams_text_and_usage(self, _mock_boto3):
+        events = [
+            {'type': 'message_start', 'message': {'usage': {'input_tokens': 7}}},
+            {'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': 'Hi'}},
+            {'type': 'message_delta', 'usage': {'output_tokens': 1}},
+        ]
+        provider = BedrockClaudeProvider('test-model')
+        provider.client = Mock()
+        provider.client.invoke_model_with_response_stream.return_value = {
+            'body': [{'chunk': {'bytes': json.dumps(event).encode()}} for event in events]
+        }
+
+        deltas, usage = _collect(provider.invoke_stream('system', 'user'))
+
+        self.assertEqual(deltas, ['Hi'])
+        self.assertEqual((usage.input_tokens, usage.output_tokens), (7, 1))
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_openai_streams_text_and_usage_from_last_chunk(self):
+        provider = OpenAIProvider('test-model')
+        provider.client = Mock()
+        provider.client.chat.completions.create.return_value = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='4'))], usage=None),
+            SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=9, completion_tokens=1)),
+        ]
+
+        deltas, usage = _collect(provider.invoke_stream('system', 'What is 2+2?'))
+
+        self.assertEqual(deltas, ['4'])
+        self.assertEqual((usage.input_tokens, usage.output_tokens), (9, 1))
+        _, kwargs = provider.client.chat.completions.create.call_args
+        self.assertTrue(kwargs['stream'])
+
+    @patch('boto3.client')
+    def test_empty_prompt_does_not_call_provider(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+
+        deltas, usage = _collect(provider.invoke_stream('system', '   '))
+
+        self.assertEqual(deltas, [' '])
+        self.assertEqual(usage.total_tokens, 0)
+        provider.client.converse_stream.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
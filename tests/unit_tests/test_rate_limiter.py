@@ -0,0 +1,83 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.rate_limiter import RateLimiter, get_shared_rate_limiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_requests_within_burst_do_not_wait(self):
+        limiter = RateLimiter(requests_per_minute=600)
+
+        waits = [limiter.acquire() for _ in range(5)]
+
+        self.assertTrue(all(wait < 0.01 for wait in waits))
+        self.assertEqual(limiter.stats.requests, 5)
+
+    def test_requests_are_paced_once_burst_is_spent(self):
+        # 1200 RPM = one request every 50ms
+        limiter = RateLimiter(requests_per_minute=1200, request_burst=1)
+
+        limiter.acquire()
+        waited = limiter.acquire()
+
+        self.assertGreaterEqual(waited, 0.04)
+        self.assertEqual(limiter.stats.max_wait, waited)
+
+    def test_actual_usage_above_estimate_delays_next_caller(self):
+        # 60000 TPM = 1000 tokens per second
+        limiter = RateLimiter(tokens_per_minute=60000, token_burst=100)
+
+        limiter.acquire(estimated_tokens=10)
+        limiter.record_usage(estimated_tokens=10, actual_tokens=150)
+        waited = limiter.acquire(estimated_tokens=10)
+
+        # The bucket owed 60 tokens and needed 10 more: about 70ms at 1000 tokens/s
+        self.assertGreaterEqual(waited, 0.05)
+
+    def test_callers_are_admitted_in_arrival_order(self):
+        limiter = RateLimiter(requests_per_minute=1200, request_burst=1)
+        limiter.acquire()
+        order = []
+
+        def caller(name):
+            limiter.acquire()
+            order.append(name)
+
+        threads = []
+        for name in ['first', 'second', 'third']:
+            thread = threading.Thread(target=caller, args=(name,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ['first', 'second', 'third'])
+
+    def test_shared_limiter_is_reused_per_key(self):
+        self.assertIs(get_shared_rate_limiter('test-key', requests_per_minute=10), get_shared_rate_limiter('test-key'))
+
+
+class TestProviderRateLimiting(unittest.TestCase):
+    @patch('boto3.client')
+    def test_invoke_reconciles_estimate_with_actual_usage(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'ok'}]}},
+            'usage': {'inputTokens': 40, 'outputTokens': 60},
+        }
+        provider.rate_limiter = Mock(wraps=RateLimiter(tokens_per_minute=100000))
+
+        provider.invoke('system', 'user prompt')
+
+        estimated = provider.estimate_input_tokens('system', 'user prompt')
+        provider.rate_limiter.acquire.assert_called_once_with(estimated)
+        provider.rate_limiter.record_usage.assert_called_once_with(estimated, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import asyncio
+import contextvars
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.client_registry import _sdk_retries
+from config.resilience import HedgePolicy, ResilientCaller, RetryPolicy, is_retryable
+from config.usage_ledger import UsageLedger
+
+
+class ThrottlingError(Exception):
+    def __init__(self):
+        super().__init__('throttled')
+        self.response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+
+
+def trained_caller(latency=0.01, hedge=None):
+    caller = ResilientCaller(RetryPolicy(base_delay=0.001), hedge or HedgePolicy(min_samples=5, min_delay=0.02))
+    for _ in range(5):
+        caller.latencies.record(latency)
+    return caller
+
+
+class TestIsRetryable(unittest.TestCase):
+    def test_throttling_and_server_errors_are_retryable(self):
+        self.assertTrue(is_retryable(ThrottlingError()))
+        self.assertTrue(is_retryable(StatusError(429)))
+        self.assertTrue(is_retryable(StatusError(503)))
+
+    def test_client_errors_are_not_retryable(self):
+        self.assertFalse(is_retryable(StatusError(400)))
+        self.assertFalse(is_retryable(ValueError('bad input')))
+
+
+class TestRetries(unittest.TestCase):
+    def test_transient_errors_are_retried(self):
+        caller = ResilientCaller(RetryPolicy(max_attempts=3, base_delay=0.001))
+        fn = Mock(side_effect=[ThrottlingError(), ThrottlingError(), 'ok'])
+
+        self.assertEqual(caller.call(fn), 'ok')
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(caller.stats.retries, 2)
+
+    def test_gives_up_after_max_attempts(self):
+        caller = ResilientCaller(RetryPolicy(max_attempts=2, base_delay=0.001))
+        fn = Mock(side_effect=ThrottlingError())
+
+        with self.assertRaises(ThrottlingError):
+            caller.call(fn)
+        self.assertEqual(fn.call_count, 2)
+
+    def test_permanent_errors_are_not_retried(self):
+        caller = ResilientCaller(RetryPolicy(base_delay=0.001))
+        fn = Mock(side_effect=ValueError('bad input'))
+
+        with self.assertRaises(ValueError):
+            caller.call(fn)
+        fn.assert_called_once()
+
+    def test_retried_calls_run_without_sdk_retries(self):
+        caller = ResilientCaller(RetryPolicy(base_delay=0.001))
+
+        self.assertFalse(caller.call(_sdk_retries.get))
+        self.assertTrue(caller.call(_sdk_retries.get, retryable=False))
+
+    def test_backoff_is_bounded_by_max_delay(self):
+        policy = RetryPolicy(base_delay=1.0, max_delay=2.0)
+
+        self.assertTrue(all(0 <= policy.delay(10) <= 2.0 for _ in range(100)))
+
+
+class TestHedging(unittest.TestCase):
+    def test_no_hedging_until_enough_samples(self):
+        caller = ResilientCaller(hedge=HedgePolicy(min_samples=5))
+
+        self.assertIsNone(caller.hedge_delay())
+
+    def test_fast_calls_are_not_hedged(self):
+        caller = trained_caller()
+        fn = Mock(return_value='ok')
+
+        self.assertEqual(caller.call(fn), 'ok')
+        fn.assert_called_once()
+        self.assertEqual(caller.stats.hedges_fired, 0)
+
+    def test_slow_call_is_hedged_and_hedge_wins(self):
+        caller = trained_caller()
+        calls = []
+        lock = threading.Lock()
+
+        def fn():
+            with lock:
+                calls.append(None)
+                first = len(calls) == 1
+            time.sleep(0.5 if first else 0.01)
+            return 'slow' if first else 'fast'
+
+        start = time.perf_counter()
+        self.assertEqual(caller.call(fn), 'fast')
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(caller.stats.hedges_fired, 1)
+        self.assertEqual(caller.stats.hedges_won, 1)
+
+    def test_hedge_uses_hedge_fn_and_reports_the_discarded_result(self):
+        caller = trained_caller()
+        discarded = threading.Event()
+        results = []
+
+        def slow():
+            time.sleep(0.2)
+            return 'slow'
+
+        def on_discarded(result):
+            results.append(result)
+            discarded.set()
+
+        self.assertEqual(caller.call(slow, hedge_fn=lambda: 'hedge', on_discarded=on_discarded), 'hedge')
+        self.assertTrue(discarded.wait(1.0))
+        self.assertEqual(results, ['slow'])
+
+    def test_requests_run_in_the_callers_context(self):
+        caller = trained_caller()
+        request_id = contextvars.ContextVar('request_id', default=None)
+        seen = []
+
+        def fn():
+            seen.append(request_id.get())
+            time.sleep(0.2 if len(seen) == 1 else 0.01)
+            return 'ok'
+
+        request_id.set('abc')
+        caller.call(fn)
+
+        self.assertEqual(seen, ['abc', 'abc'])
+
+    def test_async_hedge_cancels_loser(self):
+        caller = trained_caller()
+        cancelled = []
+        calls = []
+
+        async def fn():
+            calls.append(None)
+            try:
+                await asyncio.sleep(0.5 if len(calls) == 1 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return len(calls)
+
+        async def run():
+            result = await caller.acall(fn)
+            await asyncio.sleep(0)
+            return result
+
+        self.assertEqual(asyncio.run(run()), 2)
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(caller.stats.hedges_won, 1)
+
+
+class TestProviderResilience(unittest.TestCase):
+    @patch('boto3.client')
+    def test_invoke_retries_throttled_calls(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = [
+            ThrottlingError(),
+            {'output': {'message': {'content': [{'text': 'ok'}]}}, 'usage': {'inputTokens': 1, 'outputTokens': 1}},
+        ]
+        provider.resilience = ResilientCaller(RetryPolicy(base_delay=0.001))
+
+        text, _usage = provider.invoke('system', 'user')
+
+        self.assertEqual(text, 'ok')
+        self.assertEqual(provider.client.converse.call_count, 2)
+
+    @patch('boto3.client')
+    def test_tool_calls_are_not_retried(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = ThrottlingError()
+        provider.resilience = ResilientCaller(RetryPolicy(base_delay=0.001))
+
+        with self.assertRaises(ThrottlingError):
+            provider.invoke('system', 'user', tool_handler=Mock())
+        provider.client.converse.assert_called_once()
+
+    @patch('boto3.client')
+    def test_hedges_are_rate_limited_and_billed(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        calls = []
+
+        def converse(**_params):
+            calls.append(None)
+            time.sleep(0.2 if len(calls) == 1 else 0.01)
+            return {'output': {'message': {'content': [{'text': 'ok'}]}}, 'usage': {'inputTokens': 3, 'outputTokens': 2}}
+
+        provider.client.converse.side_effect = converse
+        provider.resilience = trained_caller()
+        provider.rate_limiter = Mock(**{'acquire.return_value': 0.0})
+        provider.usage_ledger = UsageLedger()
+
+        provider.invoke('system', 'user')
+        time.sleep(0.3)
+
+        self.assertEqual(provider.rate_limiter.acquire.call_count, 2)
+        self.assertEqual(provider.rate_limiter.record_usage.call_count, 2)
+        self.assertEqual(len(provider.usage_ledger), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.response_cache import ResponseCache, SQLiteResponseStore
+from config.token_usage import TokenUsage, format_token_usage
+from config.tool_system import ToolHandler
+from config.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_evicts_least_recently_used_entry(self):
+        cache = TTLCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+        cache.put('a', 1)
+
+        clock.now = 9.9
+        self.assertEqual(cache.get('a'), 1)
+        clock.now = 10
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+
+class TestResponseCache(unittest.TestCase):
+    def _key(self, user_prompt='hello', **overrides):
+        params = {'max_tokens': 10, 'temperature': 0.5}
+        params.update(overrides)
+        return ResponseCache.make_key('provider', 'model', 'system', user_prompt, params)
+
+    def test_key_depends_on_prompt_and_inference_params(self):
+        self.assertEqual(self._key(), self._key())
+        self.assertNotEqual(self._key(), self._key(user_prompt='bye'))
+        self.assertNotEqual(self._key(), self._key(temperature=0.0))
+
+    def test_hit_returns_usage_marked_as_cached(self):
+        cache = ResponseCache()
+        cache.put(self._key(), ('hi', TokenUsage(3, 4)))
+
+        text, usage = cache.get(self._key())
+
+        self.assertEqual(text, 'hi')
+        self.assertTrue(usage.cached)
+        self.assertEqual(usage.total_tokens, 7)
+        self.assertIn('(cached)', format_token_usage(usage))
+        self.assertEqual((cache.stats.memory_hits, cache.stats.misses), (1, 0))
+
+    def test_hit_keeps_prompt_cache_counts_and_logprobs(self):
+        cache = ResponseCache()
+        cache.put(self._key(), ('hi', TokenUsage(3, 4, cache_read_tokens=100, cache_write_tokens=20, logprobs=[('hi', -0.1)])))
+
+        _text, usage = cache.get(self._key())
+
+        self.assertEqual((usage.cache_read_tokens, usage.cache_write_tokens), (100, 20))
+        self.assertEqual(usage.logprobs, [('hi', -0.1)])
+
+    def test_sqlite_tier_survives_a_new_cache_instance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'responses.sqlite')
+            stored = TokenUsage(1, 2, cache_read_tokens=50, cache_write_tokens=5, logprobs=[('persisted', -0.5)])
+            ResponseCache(store=SQLiteResponseStore(path)).put(self._key(), ('persisted', stored))
+
+            restarted = ResponseCache(store=SQLiteResponseStore(path))
+            text, usage = restarted.get(self._key())
+
+            self.assertEqual(text, 'persisted')
+            self.assertTrue(usage.cached)
+            self.assertEqual((usage.cache_read_tokens, usage.cache_write_tokens), (50, 5))
+            self.assertEqual(usage.logprobs, [('persisted', -0.5)])
+            self.assertEqual(restarted.stats.disk_hits, 1)
+            restarted.store.close()
+
+    def test_disk_hit_keeps_the_stored_expiry_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(ttl_seconds=100, store=SQLiteResponseStore(os.path.join(tmp, 'responses.sqlite')))
+            cache.store.put(self._key(), 'stored', TokenUsage(1, 2))
+
+            # Read back 90 seconds after the entry was written
+            with patch('config.response_cache.time.time', return_value=time.time() + 90):
+                cache.get(self._key())
+
+            _value, expires_at = cache._memory._entries[self._key()]
+            self.assertLessEqual(expires_at - time.monotonic(), 10)
+            cache.store.close()
+
+
+class TestProviderResponseCache(unittest.TestCase):
+    def setUp(self):
+        with patch('boto3.client'):
+            self.provider = BedrockConverseProvider('test-model')
+        self.provider.client = Mock()
+        self.provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'cached answer'}]}},
+            'usage': {'inputTokens': 10, 'outputTokens': 5},
+        }
+        self.provider.response_cache = ResponseCache()
+
+    def test_repeated_invoke_is_served_from_cache(self):
+        first = self.provider.invoke('system', 'user')
+        second = self.provider.invoke('system', 'user')
+
+        self.assertEqual(self.provider.client.converse.call_count, 1)
+        self.assertFalse(first[1].cached)
+        self.assertEqual(second[0], 'cached answer')
+        self.assertTrue(second[1].cached)
+
+    def test_invoke_with_tool_handler_bypasses_cache(self):
+        self.provider.invoke('system', 'user', ToolHandler())
+        self.provider.invoke('system', 'user', ToolHandler())
+
+        self.assertEqual(self.provider.client.converse.call_count, 2)
+        self.assertEqual(len(self.provider.response_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.bedrock_provider import BedrockClaudeProvider
+from config.llm_config import LLMConfig
+from config.router_provider import RouterProvider
+from config.metrics import MetricsSpanExporter
+from config.tool_system import ToolSpec
+from config.tracing import InMemorySpanExporter, tracer
+from config.usage_ledger import UsageLedger
+
+
+def converse_backend(text='ok', delay=0.0, error=None):
+    provider = BedrockConverseProvider('test-model')
+    provider.client = Mock()
+
+    def converse(**_params):
+        time.sleep(delay)
+        if error:
+            raise error
+        return {'output': {'message': {'content': [{'text': text}]}}, 'usage': {'inputTokens': 3, 'outputTokens': 2}}
+
+    provider.client.converse.side_effect = converse
+    return provider
+
+
+@patch('boto3.client')
+class TestRouterProvider(unittest.TestCase):
+    def test_fastest_policy_prefers_lower_latency_backend(self, _mock_boto3):
+        router = RouterProvider({'slow': converse_backend('slow', delay=0.05), 'fast': converse_backend('fast')}, explore_rate=0)
+
+        # The first two calls measure each backend once
+        router.invoke('system', 'first')
+        router.invoke('system', 'second')
+        text, _usage = router.invoke('system', 'third')
+
+        self.assertEqual(text, 'fast')
+        self.assertLess(router.stats['fast'].ewma_latency, router.stats['slow'].ewma_latency)
+
+    def test_usage_is_tracked_per_backend(self, _mock_boto3):
+        router = RouterProvider({'only': converse_backend()})
+
+        router.invoke('system', 'user')
+
+        self.assertEqual(router.stats['only'].calls, 1)
+        self.assertEqual(router.stats['only'].input_tokens, 3)
+        self.assertEqual(router.stats['only'].output_tokens, 2)
+
+    def test_fails_over_and_marks_backend_unhealthy(self, _mock_boto3):
+        router = RouterProvider({'broken': converse_backend(error=RuntimeError('down')), 'healthy': converse_backend('ok')}, explore_rate=0)
+
+        text, _usage = router.invoke('system', 'user')
+
+        self.assertEqual(text, 'ok')
+        self.assertEqual(router.stats['broken'].errors, 1)
+        self.assertEqual(router.rank_backends(), ['healthy', 'broken'])
+
+    def test_least_outstanding_policy_avoids_busy_backend(self, _mock_boto3):
+        router = RouterProvider({'busy': converse_backend(), 'idle': converse_backend()}, policy='least_outstanding')
+        router.stats['busy'].outstanding = 3
+
+        self.assertEqual(router.rank_backends()[0], 'idle')
+
+    def test_weighted_policy_follows_weights(self, _mock_boto3):
+        router = RouterProvider({'a': converse_backend(), 'b': converse_backend()}, policy='weighted', weights={'a': 1.0, 'b': 0.0})
+
+        self.assertTrue(all(router.rank_backends()[0] == 'a' for _ in range(20)))
+
+    def test_tool_calls_only_go_to_tool_capable_backends(self, _mock_boto3):
+        legacy = BedrockClaudeProvider('test-model')
+        legacy.client = Mock()
+        converse = converse_backend('converse')
+        router = RouterProvider({'legacy': legacy, 'converse': converse})
+
+        router.tools = [ToolSpec(name='read_log', description='Read a log', parameters={}, required=[])]
+        text, _usage = router.invoke('system', 'user', tool_handler=Mock())
+
+        self.assertEqual(text, 'converse')
+        self.assertEqual(converse.tools, router.tools)
+        legacy.client.invoke_model.assert_not_called()
+
+    def test_provider_specific_arguments_only_go_to_backends_accepting_them(self, _mock_boto3):
+        legacy = BedrockClaudeProvider('test-model')
+        legacy.client = Mock()
+        converse = converse_backend('converse')
+        router = RouterProvider({'legacy': legacy, 'converse': converse}, explore_rate=0)
+        messages = [{'role': 'user', 'content': [{'text': 'hello'}]}]
+
+        text, _usage = router.invoke('system', '', messages=messages)
+
+        self.assertEqual(text, 'converse')
+        legacy.client.invoke_model.assert_not_called()
+        with self.assertRaises(ValueError):
+            RouterProvider({'legacy': legacy}).invoke('system', '', messages=messages)
+
+    def test_unknown_policy_is_rejected(self, _mock_boto3):
+        with self.assertRaises(ValueError):
+            RouterProvider({'a': converse_backend()}, policy='random')
+
+    def test_llm_config_builds_router_over_configured_backends(self, _mock_boto3):
+        config = LLMConfig()
+        config.ROUTER_BACKENDS = ['bedrock_converse', 'bedrock_nova_lite']
+
+        router = config.get_router_llm()
+
+        self.assertIsInstance(router, RouterProvider)
+        self.assertEqual(set(router.backends), {'bedrock_converse', 'bedrock_nova_lite'})
+        self.assertIs(config.get_provider('router'), router)
+
+    def test_router_tools_do_not_leak_to_shared_providers(self, _mock_boto3):
+        config = LLMConfig()
+        config.ROUTER_BACKENDS = ['bedrock_converse']
+        shared = config.get_bedrock_converse_llm()
+
+        router = config.get_router_llm()
+        router.tools = [ToolSpec(name='read_log', description='Read a log', parameters={}, required=[])]
+
+        self.assertIsNot(router.backends['bedrock_converse'], shared)
+        self.assertEqual(router.backends['bedrock_converse'].tools, router.tools)
+        self.assertEqual(shared.tools, [])
+
+    def test_routed_call_is_counted_once(self, _mock_boto3):
+        backend = converse_backend()
+        backend.usage_ledger = UsageLedger()
+        router = RouterProvider({'only': backend})
+        spans = InMemorySpanExporter()
+        tracer.add_exporter(spans)
+        self.addCleanup(tracer.remove_exporter, spans)
+
+        router.invoke('system', 'user')
+
+        self.assertEqual(len(backend.usage_ledger), 1)
+        self.assertEqual(len([span for span in spans.spans if span.name in MetricsSpanExporter.LLM_SPANS]), 1)
+        self.assertEqual(len(spans.find('llm.route')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
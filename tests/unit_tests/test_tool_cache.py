@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from config.tool_system import ToolHandler
+
+
+class TestToolMemoization(unittest.TestCase):
+    def setUp(self):
+        self.handler = ToolHandler()
+        self.tool = Mock(side_effect=lambda tool_input: f'result for {tool_input}')
+
+    def test_tools_are_not_cached_by_default(self):
+        self.handler.register_tool('lookup', self.tool)
+
+        self.handler.execute_tool('lookup', {'q': 'a'})
+        self.handler.execute_tool('lookup', {'q': 'a'})
+
+        self.assertEqual(self.tool.call_count, 2)
+        self.assertIsNone(self.handler.cache_stats('lookup'))
+
+    def test_repeated_input_is_served_from_cache(self):
+        self.handler.register_tool('lookup', self.tool, cache_ttl=60)
+
+        first = self.handler.execute_tool('lookup', {'q': 'a', 'limit': 1})
+        second = self.handler.execute_tool('lookup', {'limit': 1, 'q': 'a'})
+
+        self.assertEqual(first, second)
+        self.tool.assert_called_once()
+        stats = self.handler.cache_stats('lookup')
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+
+    def test_custom_cache_key(self):
+        self.handler.register_tool('lookup', self.tool, cache_ttl=60, cache_key=lambda tool_input: tool_input['q'].lower())
+
+        self.handler.execute_tool('lookup', {'q': 'A'})
+        self.handler.execute_tool('lookup', {'q': 'a'})
+
+        self.tool.assert_called_once()
+
+    def test_lru_is_bounded(self):
+        self.handler.register_tool('lookup', self.tool, cache_ttl=60, cache_max_entries=2)
+
+        for q in ['a', 'b', 'c', 'a']:
+            self.handler.execute_tool('lookup', {'q': q})
+
+        self.assertEqual(self.tool.call_count, 4)
+        self.assertEqual(self.handler.cache_stats('lookup').evictions, 2)
+
+    def test_errors_are_not_cached(self):
+        failing = Mock(side_effect=[RuntimeError('boom'), 'ok'])
+        self.handler.register_tool('flaky', failing, cache_ttl=60)
+
+        with self.assertRaises(RuntimeError):
+            self.handler.execute_tool('flaky', {})
+
+        self.assertEqual(self.handler.execute_tool('flaky', {}), 'ok')
+
+    def test_file_modification_invalidates_cached_result(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'system.log')
+            with open(path, 'w') as log_file:
+                log_file.write('first')
+
+            def read(tool_input):
+                with open(tool_input['filename']) as log_file:
+                    return log_file.read()
+
+            self.handler.register_tool('read_log', read, cache_ttl=60, cache_files=lambda tool_input: [tool_input['filename']])
+
+            self.assertEqual(self.handler.execute_tool('read_log', {'filename': path}), 'first')
+            with open(path, 'w') as log_file:
+                log_file.write('second')
+            os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+            self.assertEqual(self.handler.execute_tool('read_log', {'filename': path}), 'second')
+
+    def test_missing_file_is_not_memoized(self):
+        calls = []
+        self.handler.register_tool('read_log', calls.append, cache_ttl=60, cache_files=lambda tool_input: [tool_input['filename']])
+
+        for _ in range(2):
+            self.handler.execute_tool('read_log', {'filename': 'system.log; date'})
+
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
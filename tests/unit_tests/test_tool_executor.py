@@ -0,0 +1,85 @@
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.tool_executor import ToolExecutor
+from config.tool_system import ToolHandler
+
+
+def tool_call(tool_use_id, name='sleep', seconds=0.0):
+    return {'tool_use_id': tool_use_id, 'tool_name': name, 'tool_input': {'seconds': seconds}}
+
+
+def sleeping_tool(tool_input):
+    time.sleep(tool_input['seconds'])
+    return f'slept {tool_input["seconds"]}'
+
+
+class TestToolExecutor(unittest.TestCase):
+    def setUp(self):
+        self.handler = ToolHandler()
+        self.handler.register_tool('sleep', sleeping_tool)
+        self.executor = ToolExecutor(max_workers=4)
+
+    def test_calls_run_concurrently_and_keep_request_order(self):
+        calls = [tool_call('a', seconds=0.2), tool_call('b', seconds=0.05), tool_call('c', seconds=0.1)]
+
+        start = time.perf_counter()
+        results = self.executor.execute(self.handler, calls)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual([result.tool_use_id for result in results], ['a', 'b', 'c'])
+        self.assertLess(elapsed, 0.3)
+        self.assertGreaterEqual(results[0].execution_time, 0.2)
+        self.assertTrue(all(result.success for result in results))
+
+    def test_single_call_without_timeout_runs_inline(self):
+        with patch.object(self.executor, '_get_executor') as get_executor:
+            results = self.executor.execute(self.handler, [tool_call('a')])
+
+        get_executor.assert_not_called()
+        self.assertTrue(results[0].success)
+
+    def test_tool_exceeding_its_timeout_is_reported_as_failed(self):
+        self.handler.register_tool('slow', sleeping_tool, timeout=0.05)
+
+        results = self.executor.execute(self.handler, [tool_call('a', 'slow', seconds=0.5), tool_call('b', seconds=0.0)])
+
+        self.assertFalse(results[0].success)
+        self.assertIn('timed out', results[0].error)
+        self.assertTrue(results[1].success)
+
+    def test_tool_errors_become_failed_results(self):
+        results = self.executor.execute(self.handler, [tool_call('a', 'missing')])
+
+        self.assertFalse(results[0].success)
+        self.assertEqual(results[0].content, 'Error: Unknown tool: missing')
+        self.assertIsNotNone(results[0].execution_time)
+
+
+class TestConverseToolExecution(unittest.TestCase):
+    @patch('boto3.client')
+    def test_converse_runs_tool_calls_through_the_shared_executor(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        tool_use = [{'toolUse': {'toolUseId': f'id-{i}', 'name': 'sleep', 'input': {'seconds': 0.1}}} for i in range(3)]
+        provider.client.converse.side_effect = [
+            {'output': {'message': {'role': 'assistant', 'content': tool_use}}, 'usage': {'inputTokens': 10, 'outputTokens': 5}},
+            {'output': {'message': {'content': [{'text': 'done'}]}}, 'usage': {'inputTokens': 30, 'outputTokens': 2}},
+        ]
+        handler = ToolHandler()
+        handler.register_tool('sleep', sleeping_tool)
+
+        start = time.perf_counter()
+        text, _usage = provider.invoke('system', 'user', tool_handler=handler)
+
+        self.assertEqual(text, 'done')
+        self.assertLess(time.perf_counter() - start, 0.25)
+        followup_messages = provider.client.converse.call_args.kwargs['messages']
+        tool_results = followup_messages[-1]['content']
+        self.assertEqual([block['toolResult']['toolUseId'] for block in tool_results], ['id-0', 'id-1', 'id-2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
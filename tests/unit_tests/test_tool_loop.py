@@ -0,0 +1,142 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.openai_provider import OpenAIProvider
+from config.token_usage import TokenUsage
+from config.tool_loop import COMPLETED, DEADLINE, MAX_ROUNDS, TOKEN_BUDGET, ToolLoop, ToolLoopLimits
+from config.tool_system import ToolHandler
+
+
+def converse_tool_use(tool_use_id, input_tokens=10):
+    content = [{'toolUse': {'toolUseId': tool_use_id, 'name': 'echo', 'input': {'value': tool_use_id}}}]
+    return {'output': {'message': {'role': 'assistant', 'content': content}}, 'usage': {'inputTokens': input_tokens, 'outputTokens': 5}}
+
+
+def converse_text(text, input_tokens=10):
+    content = [{'text': text}]
+    return {'output': {'message': {'role': 'assistant', 'content': content}}, 'usage': {'inputTokens': input_tokens, 'outputTokens': 5}}
+
+
+def echo_handler():
+    handler = ToolHandler()
+    handler.register_tool('echo', lambda tool_input: tool_input['value'])
+    return handler
+
+
+class TestToolLoop(unittest.TestCase):
+    def test_limits_are_checked_in_order(self):
+        now = [0.0]
+        loop = ToolLoop(ToolLoopLimits(max_rounds=2, max_total_tokens=100, deadline_seconds=5.0), TokenUsage(10, 5), clock=lambda: now[0])
+
+        self.assertIsNone(loop.limit_reached())
+        now[0] = 6.0
+        self.assertEqual(loop.limit_reached(), DEADLINE)
+        loop.record_round(1, 0.1, 0.2, TokenUsage(80, 5))
+        self.assertEqual(loop.limit_reached(), TOKEN_BUDGET)
+        loop.record_round(1, 0.1, 0.2, TokenUsage(1, 1))
+        self.assertEqual(loop.limit_reached(), MAX_ROUNDS)
+
+    def test_usage_is_added_up_across_rounds(self):
+        loop = ToolLoop(ToolLoopLimits(), TokenUsage(10, 5, cache_read_tokens=3))
+        loop.record_round(2, 0.1, 0.2, TokenUsage(20, 7, cache_read_tokens=3))
+
+        usage = loop.finish(COMPLETED)
+
+        self.assertEqual((usage.input_tokens, usage.output_tokens, usage.cache_read_tokens), (30, 12, 6))
+        self.assertEqual(usage.tool_loop.rounds[0].tool_calls, 2)
+
+
+@patch('boto3.client')
+class TestConverseToolLoop(unittest.TestCase):
+    def test_chained_tool_calls_run_until_the_model_stops(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = [converse_tool_use('first'), converse_tool_use('second'), converse_text('done')]
+
+        text, usage = provider.invoke('system', 'user', tool_handler=echo_handler())
+
+        self.assertEqual(text, 'done')
+        self.assertEqual(provider.client.converse.call_count, 3)
+        self.assertEqual(usage.input_tokens, 30)
+        self.assertEqual(usage.output_tokens, 15)
+        self.assertEqual(usage.tool_loop.stop_reason, COMPLETED)
+        self.assertEqual([tool_round.index for tool_round in usage.tool_loop.rounds], [1, 2])
+        self.assertTrue(all(tool_round.latency >= 0 for tool_round in usage.tool_loop.rounds))
+
+    def test_loop_stops_at_max_rounds(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = [converse_tool_use(str(i)) for i in range(10)]
+        provider.tool_loop_limits = ToolLoopLimits(max_rounds=2)
+
+        _text, usage = provider.invoke('system', 'user', tool_handler=echo_handler())
+
+        self.assertEqual(provider.client.converse.call_count, 3)
+        self.assertEqual(usage.tool_loop.stop_reason, MAX_ROUNDS)
+
+    def test_stopped_loop_answers_every_tool_use(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = [converse_tool_use(str(i)) for i in range(10)]
+        provider.tool_loop_limits = ToolLoopLimits(max_rounds=1)
+        messages = []
+
+        provider.invoke('system', 'user', tool_handler=echo_handler(), messages=messages)
+
+        tool_uses = [block['toolUse']['toolUseId'] for message in messages for block in message['content'] if 'toolUse' in block]
+        tool_results = [block['toolResult']['toolUseId'] for message in messages for block in message['content'] if 'toolResult' in block]
+        self.assertEqual(tool_uses, ['0', '1'])
+        self.assertEqual(tool_results, ['0', '1'])
+        self.assertIn('Not executed', messages[-1]['content'][0]['toolResult']['content'][0]['text'])
+
+    def test_loop_stops_when_token_budget_is_spent(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.side_effect = [converse_tool_use('a', input_tokens=60), converse_tool_use('b', input_tokens=60)]
+        provider.tool_loop_limits = ToolLoopLimits(max_total_tokens=100)
+
+        _text, usage = provider.invoke('system', 'user', tool_handler=echo_handler())
+
+        self.assertEqual(provider.client.converse.call_count, 2)
+        self.assertEqual(usage.tool_loop.stop_reason, TOKEN_BUDGET)
+
+    def test_plain_answer_has_no_tool_loop_summary(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = converse_text('hello')
+
+        _text, usage = provider.invoke('system', 'user', tool_handler=echo_handler())
+
+        self.assertIsNone(usage.tool_loop)
+
+
+class TestOpenAIToolLoop(unittest.TestCase):
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_openai_usage_covers_every_round(self):
+        tool_call = SimpleNamespace(id='call-1', type='function', function=SimpleNamespace(name='echo', arguments='{"value": "x"}'))
+        tool_message = Mock(content=None, tool_calls=[tool_call])
+        tool_message.model_dump.return_value = {'role': 'assistant', 'content': None}
+        provider = OpenAIProvider('test-model')
+        provider.client = Mock()
+        provider.client.chat.completions.create.side_effect = [
+            SimpleNamespace(
+                choices=[SimpleNamespace(message=tool_message, logprobs=None)],
+                usage=SimpleNamespace(prompt_tokens=10, completion_tokens=3),
+            ),
+            SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content='x', tool_calls=None), logprobs=None)],
+                usage=SimpleNamespace(prompt_tokens=20, completion_tokens=2),
+            ),
+        ]
+
+        text, usage = provider.invoke('system', 'user', tool_handler=echo_handler())
+
+        self.assertEqual(text, 'x')
+        self.assertEqual(usage.total_tokens, 35)
+        self.assertEqual(len(usage.tool_loop.rounds), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from chatbot.system_prompt_guardrail_bot import SystemPromptGuardrailBot
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.response_cache import ResponseCache
+from config.token_usage import TokenUsage
+from config.tool_system import ToolHandler
+from config.tracing import ERROR, InMemorySpanExporter, JSONLSpanExporter, Tracer, tracer
+
+
+def converse_response(content):
+    return {'output': {'message': {'role': 'assistant', 'content': content}}, 'usage': {'inputTokens': 7, 'outputTokens': 3}}
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        tracer.add_exporter(self.exporter)
+
+    def tearDown(self):
+        tracer.remove_exporter(self.exporter)
+
+
+class TestTracer(TracingTestCase):
+    def test_spans_nest_and_share_the_trace(self):
+        with tracer.span('outer') as outer:
+            with tracer.span('inner', key='value'):
+                pass
+
+        inner = self.exporter.find('inner')[0]
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertEqual(inner.trace_id, outer.trace_id)
+        self.assertEqual(inner.attributes, {'key': 'value'})
+        self.assertEqual([span.name for span in self.exporter.spans], ['inner', 'outer'])
+
+    def test_exception_marks_span_as_failed(self):
+        with self.assertRaises(RuntimeError):
+            with tracer.span('failing'):
+                raise RuntimeError('boom')
+
+        span = self.exporter.find('failing')[0]
+        self.assertEqual((span.status, span.error), (ERROR, 'RuntimeError: boom'))
+
+    def test_concurrent_tasks_are_children_of_the_enclosing_span(self):
+        async def child(name):
+            with tracer.span(name):
+                await asyncio.sleep(0)
+
+        async def run():
+            with tracer.span('parent') as parent:
+                await asyncio.gather(child('a'), child('b'))
+            return parent
+
+        parent = asyncio.run(run())
+
+        self.assertEqual({span.parent_id for span in self.exporter.find('a') + self.exporter.find('b')}, {parent.span_id})
+
+    def test_disabled_tracer_exports_nothing(self):
+        disabled = Tracer()
+
+        with disabled.span('ignored') as span:
+            span.set_attribute('key', 'value')
+
+        self.assertEqual(span.attributes, {})
+
+    def test_jsonl_exporter_writes_one_line_per_span(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.jsonl')
+            local = Tracer([JSONLSpanExporter(path)])
+            with local.span('first', model='m'):
+                pass
+            with local.span('second'):
+                pass
+
+            with open(path) as trace_file:
+                records = [json.loads(line) for line in trace_file]
+
+        self.assertEqual([record['name'] for record in records], ['first', 'second'])
+        self.assertEqual(records[0]['attributes'], {'model': 'm'})
+        self.assertGreaterEqual(records[0]['duration'], 0)
+
+
+@patch('boto3.client')
+class TestProviderTracing(TracingTestCase):
+    def test_invoke_span_records_model_tokens_and_cache_hit(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = converse_response([{'text': 'hi'}])
+        provider.response_cache = ResponseCache()
+
+        provider.invoke('system', 'user')
+        provider.invoke('system', 'user')
+
+        first, second = self.exporter.find('llm.invoke')
+        self.assertEqual(first.attributes['model'], 'test-model')
+        self.assertEqual((first.attributes['input_tokens'], first.attributes['output_tokens']), (7, 3))
+        self.assertEqual((first.attributes['cache_hit'], second.attributes['cache_hit']), (False, True))
+
+    def test_tool_spans_nest_under_the_provider_call(self, _mock_boto3):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        tool_use = [{'toolUse': {'toolUseId': f'call-{i}', 'name': 'echo', 'input': {'value': i}}} for i in range(2)]
+        provider.client.converse.side_effect = [converse_response(tool_use), converse_response([{'text': 'done'}])]
+        handler = ToolHandler()
+        handler.register_tool('echo', lambda tool_input: tool_input['value'])
+
+        provider.invoke('system', 'user', tool_handler=handler)
+
+        invoke = self.exporter.find('llm.invoke')[0]
+        execute = self.exporter.find('tools.execute')[0]
+        self.assertEqual(execute.parent_id, invoke.span_id)
+        # Tools of one turn run on worker threads and still nest under the batch span
+        self.assertEqual([span.parent_id for span in self.exporter.find('tool.execute')], [execute.span_id] * 2)
+        self.assertEqual(self.exporter.find('llm.tool_followup')[0].parent_id, invoke.span_id)
+        self.assertEqual(invoke.attributes['tool_rounds'], 1)
+
+
+class TestBotTracing(TracingTestCase):
+    def test_guardrail_and_chat_are_separate_children_of_the_bot_span(self):
+        llm = Mock()
+        llm.ainvoke = AsyncMock(side_effect=[('allowed', TokenUsage(1, 1)), ('answer', TokenUsage(2, 2))])
+        bot = SystemPromptGuardrailBot(llm)
+
+        asyncio.run(bot.execute_chat_with_guardrail('hello'))
+
+        bot_span = self.exporter.find('bot.chat')[0]
+        guardrail = self.exporter.find('guardrail.instruction_change')[0]
+        self.assertEqual(guardrail.parent_id, bot_span.span_id)
+        self.assertEqual(guardrail.attributes['verdict'], 'allowed')
+        self.assertIsNone(bot_span.attributes['blocked'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ from unittest.mock import Mock
 from chatbot.unprotected_bot import UnprotectedBot
 from config.token_usage import TokenUsage
 from config.security_config import SecurityConfig
+from config.tracing import InMemorySpanExporter, current_span, tracer
+from config.usage_ledger import _scope
 
 
 class TestUnprotectedBot(unittest.TestCase):
@@ -46,6 +48,45 @@ class TestUnprotectedBot(unittest.TestCase):
         self.assertIn(expected_response, lines)
         self.assertTrue(any('Tokens:' in line for line in lines))
 
+    def test_chat_stream_yields_accumulated_output_and_final_usage(self):
+        self.mock_llm.invoke_stream.return_value = iter(['Hello', ' there!', TokenUsage(15, 2)])
+
+        outputs = list(self.bot.chat_stream('Hi'))
+
+        self.assertEqual(len(outputs), 3)
+        self.assertTrue(outputs[0].endswith('Hello'))
+        self.assertNotIn('Tokens:', outputs[1])
+        self.assertIn('Hello there!', outputs[-1])
+        self.assertIn('Tokens: 15 + 2 = 17', outputs[-1])
+
+    def test_chat_stream_is_attributed_to_the_bot(self):
+        seen = []
+
+        def invoke_stream(_system_prompt, _user_prompt):
+            for chunk in ['Hello', TokenUsage(15, 2)]:
+                seen.append((_scope.get()[0], current_span().name))
+                yield chunk
+
+        self.mock_llm.invoke_stream.side_effect = invoke_stream
+        spans = InMemorySpanExporter()
+        tracer.add_exporter(spans)
+        self.addCleanup(tracer.remove_exporter, spans)
+
+        for _output in self.bot.chat_stream('Hi'):
+            self.assertIsNone(_scope.get()[0])
+
+        self.assertEqual(seen, [('UnprotectedBot', 'bot.chat')] * 2)
+        self.assertEqual(len(spans.find('bot.chat')), 1)
+
+    def test_chat_many_returns_formatted_output_and_usage_per_prompt(self):
+        self.mock_llm.invoke.side_effect = lambda _system, user_prompt: (f'Echo: {user_prompt}', TokenUsage(1, 2))
+
+        results = list(self.bot.chat_many(['one', 'two'], concurrency=2))
+
+        self.assertEqual([result.prompt for result in results], ['one', 'two'])
+        self.assertIn('Echo: two', results[1].text)
+        self.assertEqual(results[1].usage.total_tokens, 3)
+
 
 if __name__ == '__main__':
     unittest.main()
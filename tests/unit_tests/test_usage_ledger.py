@@ -0,0 +1,123 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from chatbot.unprotected_bot import UnprotectedBot
+from config.bedrock_converse_provider import BedrockConverseProvider
+from config.openai_provider import OpenAIProvider
+from config.token_usage import TokenUsage
+from config.usage_ledger import PRICES as LIST_PRICES
+from config.usage_ledger import BudgetExceededError, ModelPrice, UsageLedger, usage_scope
+
+PRICES = {'model-a': ModelPrice(input=1.0, output=2.0, cache_read=0.1), 'model-b': ModelPrice(input=10.0, output=20.0)}
+
+
+class TestUsageLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = UsageLedger(prices=PRICES)
+
+    def test_cost_uses_the_price_table(self):
+        cost = self.ledger.record(TokenUsage(1_000_000, 500_000, cache_read_tokens=1_000_000), 'groq', 'model-a')
+
+        self.assertAlmostEqual(cost, 1.0 + 1.0 + 0.1)
+
+    def test_cached_responses_and_unknown_models_are_free(self):
+        self.assertEqual(self.ledger.record(TokenUsage(1000, 1000, cached=True), 'groq', 'model-a'), 0.0)
+        self.assertEqual(self.ledger.record(TokenUsage(1000, 1000), 'groq', 'unknown'), 0.0)
+
+    def test_summary_groups_by_scope(self):
+        with usage_scope(bot='UnprotectedBot', session='s1'):
+            self.ledger.record(TokenUsage(10, 5), 'groq', 'model-a')
+            self.ledger.record(TokenUsage(20, 5), 'groq', 'model-a')
+        with usage_scope(bot='SystemPromptGuardrailBot', session='s2'):
+            self.ledger.record(TokenUsage(100, 50), 'openai', 'model-b')
+
+        by_bot = self.ledger.summary(by=['bot'])
+        self.assertEqual(by_bot[('UnprotectedBot',)].calls, 2)
+        self.assertEqual(by_bot[('UnprotectedBot',)].input_tokens, 30)
+        self.assertEqual(list(self.ledger.summary(by=['provider'], session='s2')), [('openai',)])
+
+    def test_nested_scopes_inherit_unset_values(self):
+        with usage_scope(session='s1'), usage_scope(bot='UnprotectedBot'):
+            self.ledger.record(TokenUsage(1, 1), 'groq', 'model-a')
+
+        self.assertEqual(list(self.ledger.summary(by=['bot', 'session'])), [('UnprotectedBot', 's1')])
+
+    def test_percentiles_use_nearest_rank(self):
+        for latency in range(1, 101):
+            self.ledger.record(TokenUsage(1, 1), 'groq', 'model-a', latency=latency / 100)
+        self.ledger.record(TokenUsage(1, 1, cached=True), 'groq', 'model-a')
+
+        result = self.ledger.percentiles('latency', (50, 95, 100))
+
+        self.assertAlmostEqual(result[50], 0.50, places=5)
+        self.assertAlmostEqual(result[95], 0.95, places=5)
+        self.assertAlmostEqual(result[100], 1.00, places=5)
+
+    def test_session_budget_rejects_only_that_session(self):
+        self.ledger.session_limit = 1.0
+        with usage_scope(session='spender'):
+            self.ledger.record(TokenUsage(1_000_000, 0), 'groq', 'model-a')
+            with self.assertRaises(BudgetExceededError):
+                self.ledger.check_budget()
+
+        with usage_scope(session='other'):
+            self.ledger.check_budget()
+
+    def test_global_budget(self):
+        self.ledger.global_limit = 0.5
+        self.ledger.record(TokenUsage(1_000_000, 0), 'groq', 'model-a')
+
+        with self.assertRaises(BudgetExceededError):
+            self.ledger.check_budget()
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'})
+    def test_openai_cache_hits_are_billed_once_at_the_cache_read_price(self):
+        ledger = UsageLedger(prices=LIST_PRICES)
+        response = SimpleNamespace(
+            usage=SimpleNamespace(
+                prompt_tokens=1_000_000, completion_tokens=0, prompt_tokens_details=SimpleNamespace(cached_tokens=800_000)
+            )
+        )
+        usage = OpenAIProvider('gpt-4o-mini')._extract_token_usage(response)
+
+        cost = ledger.record(usage, 'openai', 'gpt-4o-mini')
+
+        # 200k uncached tokens at 0.15 $/M and 800k cached tokens at 0.075 $/M
+        self.assertAlmostEqual(cost, 0.2 * 0.15 + 0.8 * 0.075)
+
+
+@patch('boto3.client')
+class TestProviderLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = UsageLedger(prices={'test-model': ModelPrice(input=1.0, output=1.0)})
+
+    def provider(self):
+        provider = BedrockConverseProvider('test-model')
+        provider.client = Mock()
+        provider.client.converse.return_value = {
+            'output': {'message': {'content': [{'text': 'hi'}]}},
+            'usage': {'inputTokens': 7, 'outputTokens': 3},
+        }
+        provider.usage_ledger = self.ledger
+        return provider
+
+    def test_bot_calls_are_recorded_with_bot_and_latency(self, _mock_boto3):
+        UnprotectedBot(self.provider()).chat('hello')
+
+        summary = self.ledger.summary(by=['bot', 'model'])[('UnprotectedBot', 'test-model')]
+        self.assertEqual((summary.calls, summary.input_tokens, summary.output_tokens), (1, 7, 3))
+        self.assertIn(50, self.ledger.percentiles('latency'))
+
+    def test_call_is_rejected_once_the_budget_is_spent(self, _mock_boto3):
+        provider = self.provider()
+        self.ledger.global_limit = 0.0
+
+        with self.assertRaises(BudgetExceededError):
+            provider.invoke('system', 'user')
+
+        provider.client.converse.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()